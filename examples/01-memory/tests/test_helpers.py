@@ -0,0 +1,21 @@
+"""Tests for the general helpers."""
+
+from utils.helpers import format_currencies, format_currency
+
+
+def test_format_currency() -> None:
+    assert format_currency(12.5) == "$12.50"
+    assert format_currency(1234, "JPY") == "¥1234"
+    assert format_currency(3, "CHF") == "CHF 3.00"
+
+
+def test_negative_zero_formats_as_zero() -> None:
+    assert format_currency(-0.0) == "$0.00"
+    assert format_currency(0.0) == "$0.00"
+    assert format_currencies([-0.0, 0.0]) == ["$0.00", "$0.00"]
+
+
+def test_format_currencies_accepts_a_generator() -> None:
+    amounts = [1.5, 2.0, 1.5]
+    assert format_currencies(amount for amount in amounts) == ["$1.50", "$2.00", "$1.50"]
+    assert format_currencies(iter([]), "EUR") == []
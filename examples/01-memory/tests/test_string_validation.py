@@ -0,0 +1,78 @@
+"""Tests for the string validators."""
+
+import itertools
+import logging
+
+import pytest
+
+from utils.string_validation import (
+    Rule,
+    _chain,
+    alphanumeric,
+    compile_validator,
+    max_length,
+    non_empty,
+    validate_alphanumeric,
+    validate_max_length,
+    validate_non_empty,
+)
+
+VALUES = ["abc", "  abc  ", "", "   ", "a b", "abcdefghijk", "Straße", None, 5, ["abc"]]
+
+PAIRS = [
+    (non_empty(), validate_non_empty),
+    (max_length(8), lambda value: validate_max_length(value, 8)),
+    (alphanumeric(), validate_alphanumeric),
+]
+
+
+@pytest.mark.parametrize("rule, original", PAIRS)
+@pytest.mark.parametrize("value", VALUES)
+def test_rule_matches_its_validate_function(rule, original, value, caplog) -> None:
+    caplog.set_level(logging.DEBUG, logger="utils.string_validation")
+    expected = original(value)
+    expected_logs = [record.getMessage() for record in caplog.records]
+    caplog.clear()
+
+    assert compile_validator(rule)(value) == expected
+    assert [record.getMessage() for record in caplog.records] == expected_logs
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_chain_matches_chained_functions(value) -> None:
+    def chained(value):
+        for check in (validate_non_empty, lambda v: validate_max_length(v, 8), validate_alphanumeric):
+            value, error = check(value)
+            if error:
+                return (None, error)
+        return (value, None)
+
+    validate = compile_validator(non_empty(), max_length(8), alphanumeric())
+    assert validate(value) == chained(value)
+
+
+def test_batch() -> None:
+    validate = compile_validator(non_empty(), alphanumeric())
+    assert validate.batch(iter([" ab ", "", "a-b"])) == [
+        ("ab", None),
+        (None, "value must be a non-empty string"),
+        (None, "value must contain only alphanumeric characters"),
+    ]
+
+
+def test_no_rules() -> None:
+    validate = compile_validator()
+    assert validate("anything") == ("anything", None)
+    assert validate(None) == (None, "value must be a string")
+
+
+@pytest.mark.parametrize("rules", [
+    chain
+    for size in range(1, 4)
+    for chain in itertools.permutations([non_empty(), max_length(4), alphanumeric()], size)
+] + [(non_empty(), non_empty()), (alphanumeric(), Rule(str.islower, lambda: "lower", lambda v: ("lower",)))])
+def test_fused_chains_match_the_rule_by_rule_chain(rules) -> None:
+    values = VALUES + ["ab", " ab ", "abcd ", " abcde", "a-b", "ABC"]
+    one_by_one = _chain(rules)
+    assert compile_validator(*rules).batch(values) == [one_by_one(value) for value in values]
+
@@ -1,5 +1,39 @@
 """General utility helpers."""
 
+import logging
+from functools import lru_cache
 
-def format_currency(amount: float) -> str:
-    return f"${amount:.2f}"
+logger = logging.getLogger(__name__)
+
+# Currency code → (symbol, decimal places)
+CURRENCY_SYMBOLS = {
+    "USD": ("$", 2),
+    "EUR": ("€", 2),
+    "GBP": ("£", 2),
+    "JPY": ("¥", 0),
+}
+
+
+def format_currency(amount: float, currency: str = "USD") -> str:
+    """Format an amount with its currency symbol, caching each result.
+
+    Unknown currency codes are used as the prefix, e.g. "CHF 12.50".
+    Negative zero is formatted as zero ("$0.00").
+    """
+    # -0.0 == 0.0 shares a cache entry, so normalize it rather than let the
+    # first one cached decide the sign.
+    return _format_currency(0.0 if amount == 0 else amount, currency)
+
+
+@lru_cache(maxsize=65536)
+def _format_currency(amount: float, currency: str) -> str:
+    symbol, places = CURRENCY_SYMBOLS.get(currency, (f"{currency} ", 2))
+    return f"{symbol}{amount:.{places}f}"
+
+
+def format_currencies(amounts, currency: str = "USD") -> list:
+    """Format a sequence or iterator of amounts, rendering each distinct amount once."""
+    amounts = list(amounts)
+    rendered = {amount: format_currency(amount, currency) for amount in set(amounts)}
+    logger.debug("Formatted %d distinct amounts", len(rendered))
+    return [rendered[amount] for amount in amounts]
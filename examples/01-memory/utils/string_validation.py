@@ -29,3 +29,191 @@ def validate_alphanumeric(value: str):
         logger.debug("Validation failed: non-alphanumeric value")
         return (None, "value must contain only alphanumeric characters")
     return (value, None)
+
+
+class Rule:
+    """One step of a composed validator.
+
+    ``check`` is called with the value and returns true when it passes;
+    ``transform`` (optional) rewrites the value first, and later rules and
+    the caller see the rewritten value. ``message`` and ``describe`` are
+    only called when the check fails, so a passing value never builds an
+    error string or log arguments. ``type_message``, if set, is the error
+    for a non-string value when this is the first rule; otherwise such a
+    value fails this rule like any other. ``kind`` and ``limit`` identify
+    the built-in rules, which ``compile_validator`` can fuse.
+    """
+
+    __slots__ = ("check", "message", "describe", "transform", "type_message", "kind", "limit")
+
+    def __init__(
+        self, check, message, describe, transform=None, type_message: str | None = None, kind=None, limit=None
+    ) -> None:
+        self.check = check
+        self.message = message
+        self.describe = describe
+        self.transform = transform
+        self.type_message = type_message
+        self.kind = kind
+        self.limit = limit
+
+
+def non_empty() -> Rule:
+    """Rule: strip the string and require something to be left (as validate_non_empty)."""
+    return Rule(
+        bool,
+        lambda: "value must be a non-empty string",
+        lambda value: ("Validation failed: empty or non-string value",),
+        transform=str.strip,
+        kind="non_empty",
+    )
+
+
+def max_length(limit: int) -> Rule:
+    """Rule: require at most ``limit`` characters (as validate_max_length)."""
+    return Rule(
+        lambda value: len(value) <= limit,
+        lambda: f"value exceeds max length of {limit}",
+        lambda value: ("Validation failed: length %d exceeds max %d", len(value), limit),
+        type_message="value must be a string",
+        kind="max_length",
+        limit=limit,
+    )
+
+
+def alphanumeric() -> Rule:
+    """Rule: require only alphanumeric characters (as validate_alphanumeric)."""
+    return Rule(
+        str.isalnum,
+        lambda: "value must contain only alphanumeric characters",
+        lambda value: ("Validation failed: non-alphanumeric value",),
+        kind="alphanumeric",
+    )
+
+
+def _fail(rule: Rule, value):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(*rule.describe(value))
+    return (None, rule.message())
+
+
+def compile_validator(*rules: Rule):
+    """Combine rules into one validation function that checks them in order.
+
+    A value gets one type check, then each rule's transform and check; the
+    first failing rule's error is returned. A non-string value gets the
+    error the first rule's ``validate_*`` counterpart gives it. The
+    function's ``batch`` attribute validates a list of values.
+
+    Chains of the built-in rules (``non_empty`` first if present, then
+    ``max_length`` and/or ``alphanumeric``, each at most once) are fused:
+    a passing value is checked in one expression with no per-rule calls,
+    and only a failing value goes through the rules one by one to find its
+    error.
+
+        validate_username = compile_validator(non_empty(), max_length(32), alphanumeric())
+        username, error = validate_username(form["username"])
+        results = validate_username.batch(form["usernames"])
+
+    Returns:
+        Function taking a value and returning ``(value, None)`` or
+        ``(None, error_message)``.
+    """
+    slow = _chain(rules)
+    fused = _fused(rules, slow)
+    if fused is not None:
+        validate, batch = fused
+    else:
+        validate = slow
+
+        def batch(values) -> list:
+            return list(map(validate, values))
+
+    validate.batch = batch
+    return validate
+
+
+def _chain(rules: tuple[Rule, ...]):
+    """Return a validator that runs ``rules`` one at a time."""
+    steps = tuple((rule.transform, rule.check, rule) for rule in rules)
+    first = rules[0] if rules else None
+
+    def validate(value):
+        if not isinstance(value, str):
+            if first is None or first.type_message is not None:
+                return (None, first.type_message if first else "value must be a string")
+            return _fail(first, value)
+        for transform, check, rule in steps:
+            if transform is not None:
+                value = transform(value)
+            if not check(value):
+                return _fail(rule, value)
+        return (value, None)
+
+    return validate
+
+
+def _fused(rules: tuple[Rule, ...], slow):
+    """Return ``(validate, batch)`` checking built-in rule chains in one expression, or None.
+
+    Every built-in check is a pure predicate of the (possibly stripped)
+    value, so a value passes the chain exactly when it passes all of them
+    at once; anything else is handed to ``slow`` for its error. ``batch``
+    repeats the expression inline instead of calling ``validate``.
+    """
+    kinds = [rule.kind for rule in rules]
+    if not kinds or None in kinds or len(set(kinds)) != len(kinds):
+        return None
+    if "non_empty" in kinds[1:]:
+        return None
+    strip = kinds[0] == "non_empty"
+    limit = next((rule.limit for rule in rules if rule.kind == "max_length"), None)
+    alnum = "alphanumeric" in kinds
+
+    if strip and limit is not None and alnum:
+        def validate(value):
+            if isinstance(value, str):
+                stripped = value.strip()
+                if stripped and len(stripped) <= limit and stripped.isalnum():
+                    return (stripped, None)
+            return slow(value)
+
+        def batch(values) -> list:
+            return [
+                (stripped, None)
+                if isinstance(value, str) and (stripped := value.strip()) and len(stripped) <= limit
+                and stripped.isalnum()
+                else slow(value)
+                for value in values
+            ]
+    elif strip:
+        def validate(value):
+            if isinstance(value, str):
+                stripped = value.strip()
+                if stripped and (limit is None or len(stripped) <= limit) and (not alnum or stripped.isalnum()):
+                    return (stripped, None)
+            return slow(value)
+
+        def batch(values) -> list:
+            return [
+                (stripped, None)
+                if isinstance(value, str) and (stripped := value.strip())
+                and (limit is None or len(stripped) <= limit) and (not alnum or stripped.isalnum())
+                else slow(value)
+                for value in values
+            ]
+    else:
+        def validate(value):
+            if isinstance(value, str) and (limit is None or len(value) <= limit) and (not alnum or value.isalnum()):
+                return (value, None)
+            return slow(value)
+
+        def batch(values) -> list:
+            return [
+                (value, None)
+                if isinstance(value, str) and (limit is None or len(value) <= limit)
+                and (not alnum or value.isalnum())
+                else slow(value)
+                for value in values
+            ]
+    return validate, batch
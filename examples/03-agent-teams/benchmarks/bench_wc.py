@@ -0,0 +1,310 @@
+"""Throughput, peak-RSS and latency benchmarks for wc-tool and the counting API.
+
+Each case runs in a fresh subprocess so its peak RSS is its own. Results can
+be saved as a baseline and later compared against it:
+
+    python benchmarks/bench_wc.py --save benchmarks/baseline.json
+    python benchmarks/bench_wc.py --compare benchmarks/baseline.json
+
+``--compare`` exits with status 1 when any case is slower (lower MB/s or
+higher p99 latency) or uses more memory than the baseline by more than
+``--threshold``.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MB = 1 << 20
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+NON_ASCII_WORDS = ["naïve", "café", "Straße", "日本語", "текст", "🌍", "☕", "ελληνικά"]
+
+
+def _text(rng, size, words, words_per_line=12):
+    lines = []
+    written = 0
+    while written < size:
+        line = " ".join(rng.choices(words, k=words_per_line))
+        lines.append(line)
+        written += len(line.encode("utf-8")) + 1
+    return "\n".join(lines) + "\n"
+
+
+def make_corpora(root, scale):
+    """Write the synthetic inputs under ``root`` and return their paths."""
+    rng = random.Random(1234)
+    root = Path(root)
+
+    tiny = root / "tiny"
+    tiny.mkdir()
+    for i in range(int(2000 * scale) or 1):
+        (tiny / f"{i:05d}.txt").write_text(_text(rng, rng.randint(20, 400), WORDS))
+
+    huge = root / "huge.txt"
+    block = _text(rng, MB, WORDS).encode("utf-8")
+    with open(huge, "wb") as f:
+        for _ in range(max(int(64 * scale), 1)):
+            f.write(block)
+
+    long_line = root / "long_line.txt"
+    long_line.write_text(" ".join(rng.choices(WORDS, k=int(2 * MB * scale) or 1)))
+
+    non_ascii = root / "non_ascii.txt"
+    block = _text(rng, MB, NON_ASCII_WORDS).encode("utf-8")
+    with open(non_ascii, "wb") as f:
+        for _ in range(max(int(16 * scale), 1)):
+            f.write(block)
+
+    garbage = root / "garbage.bin"
+    with open(garbage, "wb") as f:
+        for _ in range(max(int(16 * scale), 1)):
+            f.write(rng.randbytes(MB))
+
+    return {
+        "tiny": sorted(str(p) for p in tiny.iterdir()),
+        "huge": [str(huge)],
+        "long_line": [str(long_line)],
+        "non_ascii": [str(non_ascii)],
+        "garbage": [str(garbage)],
+    }
+
+
+# -- cases (run inside the child process) -----------------------------------
+
+def _size(paths):
+    return sum(os.path.getsize(p) for p in paths)
+
+
+def case_count_content(paths):
+    from agent_teams.cli import count_content
+
+    contents = [Path(p).read_bytes().decode("utf-8", errors="replace") for p in paths]
+    start = time.perf_counter()
+    for content in contents:
+        count_content(content)
+    return {"seconds": time.perf_counter() - start, "bytes": _size(paths)}
+
+
+def _run_cli(args):
+    from click.testing import CliRunner
+
+    from agent_teams.cli import main
+
+    start = time.perf_counter()
+    result = CliRunner().invoke(main, args)
+    elapsed = time.perf_counter() - start
+    if result.exit_code != 0:
+        raise RuntimeError(result.output)
+    return elapsed
+
+
+def case_cli_default(paths):
+    return {"seconds": _run_cli(list(paths)), "bytes": _size(paths)}
+
+
+def case_cli_lines(paths):
+    return {"seconds": _run_cli(["-l", *paths]), "bytes": _size(paths)}
+
+
+def case_cli_jobs(paths):
+    return {"seconds": _run_cli(["-j", "4", *paths]), "bytes": _size(paths)}
+
+
+def _api_client(**kwargs):
+    from agent_teams.api import create_app
+
+    app = create_app(**kwargs)
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def case_api_count(paths, client=None):
+    client = client or _api_client()
+    bodies = [Path(p).read_bytes() for p in paths]
+    latencies = []
+    for body in bodies:
+        start = time.perf_counter()
+        resp = client.post("/api/count", data=body)
+        latencies.append(time.perf_counter() - start)
+        if resp.status_code != 200:
+            raise RuntimeError(resp.get_data(as_text=True))
+    return {"seconds": sum(latencies), "bytes": _size(paths), "latencies": latencies}
+
+
+def case_api_count_metrics(paths):
+    from agent_teams.metrics import Metrics
+
+    return case_api_count(paths, _api_client(metrics=Metrics()))
+
+
+def case_api_count_file(paths):
+    client = _api_client()
+    latencies = []
+    for path in paths:
+        data = {"file": (io.BytesIO(Path(path).read_bytes()), os.path.basename(path))}
+        start = time.perf_counter()
+        resp = client.post("/api/count/file", data=data, content_type="multipart/form-data")
+        latencies.append(time.perf_counter() - start)
+        if resp.status_code != 200:
+            raise RuntimeError(resp.get_data(as_text=True))
+    return {"seconds": sum(latencies), "bytes": _size(paths), "latencies": latencies}
+
+
+CASES = {
+    "count_content": case_count_content,
+    "cli_default": case_cli_default,
+    "cli_lines": case_cli_lines,
+    "cli_jobs": case_cli_jobs,
+    "api_count": case_api_count,
+    "api_count_metrics": case_api_count_metrics,
+    "api_count_file": case_api_count_file,
+}
+
+# (case, corpus) pairs that make up the suite. Binary garbage is not valid
+# UTF-8, so it only goes through paths that decode with errors="replace" or
+# never decode.
+SUITE = [
+    ("count_content", "huge"),
+    ("count_content", "long_line"),
+    ("count_content", "non_ascii"),
+    ("count_content", "garbage"),
+    ("cli_default", "tiny"),
+    ("cli_default", "huge"),
+    ("cli_default", "long_line"),
+    ("cli_default", "non_ascii"),
+    ("cli_lines", "huge"),
+    ("cli_lines", "garbage"),
+    ("cli_jobs", "tiny"),
+    ("cli_jobs", "huge"),
+    ("api_count", "tiny"),
+    ("api_count", "huge"),
+    ("api_count_metrics", "tiny"),
+    ("api_count_metrics", "huge"),
+    ("api_count_file", "tiny"),
+    ("api_count_file", "garbage"),
+]
+
+
+def _peak_rss_bytes():
+    # Linux keeps ru_maxrss across execve, so a child would report the
+    # parent's peak; VmHWM belongs to the new address space.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_child(case, paths_file):
+    paths = json.loads(Path(paths_file).read_text())
+    result = CASES[case](paths)
+    result["peak_rss"] = _peak_rss_bytes()
+    json.dump(result, sys.stdout)
+
+
+# -- orchestration ----------------------------------------------------------
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_case(case, paths, repeat):
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(paths, f)
+    try:
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", case, f.name],
+                check=True, capture_output=True, text=True,
+            )
+            runs.append(json.loads(out.stdout))
+    finally:
+        os.unlink(f.name)
+
+    best = min(runs, key=lambda r: r["seconds"])
+    summary = {
+        "mb_per_s": best["bytes"] / MB / best["seconds"] if best["seconds"] else 0.0,
+        "peak_rss_mb": max(r["peak_rss"] for r in runs) / MB,
+    }
+    latencies = [lat for r in runs for lat in r.get("latencies", [])]
+    if latencies:
+        summary["p50_ms"] = statistics.median(latencies) * 1000
+        summary["p99_ms"] = _percentile(latencies, 99) * 1000
+    return summary
+
+
+def compare(results, baseline, threshold):
+    """Return human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["mb_per_s"] < base["mb_per_s"] * (1 - threshold):
+            regressions.append(f"{name}: {current['mb_per_s']:.1f} MB/s < baseline {base['mb_per_s']:.1f}")
+        if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']:.1f} MB > baseline {base['peak_rss_mb']:.1f}")
+        if "p99_ms" in base and current.get("p99_ms", 0) > base["p99_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p99 {current['p99_ms']:.2f} ms > baseline {base['p99_ms']:.2f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply corpus sizes by this factor.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is kept.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string.")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a new baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Fail if results regress against this baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression ratio (default 0.25).")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "PATHS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        corpora = make_corpora(root, args.scale)
+        for case, corpus in SUITE:
+            name = f"{case}[{corpus}]"
+            if args.filter not in name:
+                continue
+            results[name] = summary = run_case(case, corpora[corpus], args.repeat)
+            latency = ""
+            if "p99_ms" in summary:
+                latency = f"  p50 {summary['p50_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms"
+            print(f"{name:32} {summary['mb_per_s']:9.1f} MB/s  rss {summary['peak_rss_mb']:7.1f} MB{latency}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({"scale": args.scale, "results": results}, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("scale") != args.scale:
+            print(f"warning: baseline was recorded with --scale {baseline.get('scale')}", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Load test: thousands of slow uploaders against the ASGI counting app.
+
+Every client trickles its body to ``POST /api/count`` in small pieces with a
+pause between them, the way a slow network link would. The app is driven
+in-process through the ASGI interface, so the numbers reflect the app and
+not a particular server.
+
+    python benchmarks/load_asgi.py --clients 5000 --pieces 20 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from agent_teams.asgi import create_asgi_app
+
+PIECE = b"lorem ipsum dolor sit amet consectetur\n"
+
+
+async def upload(app, pieces, delay, state):
+    remaining = pieces
+    response = {}
+
+    async def receive():
+        nonlocal remaining
+        await asyncio.sleep(delay)
+        remaining -= 1
+        return {"type": "http.request", "body": PIECE, "more_body": remaining > 0}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] = response.get("body", b"") + message.get("body", b"")
+
+    scope = {"type": "http", "method": "POST", "path": "/api/count", "query_string": b"", "headers": []}
+    start = time.perf_counter()
+    state["active"] += 1
+    state["peak"] = max(state["peak"], state["active"])
+    try:
+        await app(scope, receive, send)
+    finally:
+        state["active"] -= 1
+    if response.get("status") != 200 or json.loads(response["body"])["lines"] != pieces:
+        raise RuntimeError(f"bad response: {response}")
+    return time.perf_counter() - start
+
+
+async def run(clients, pieces, delay, workers):
+    app = create_asgi_app(max_workers=workers)
+    state = {"active": 0, "peak": 0}
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(upload(app, pieces, delay, state) for _ in range(clients)))
+    return time.perf_counter() - start, latencies, state["peak"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=2000, help="Concurrent uploaders.")
+    parser.add_argument("--pieces", type=int, default=10, help="Body pieces per upload.")
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds between pieces.")
+    parser.add_argument("--workers", type=int, default=4, help="Counting executor threads.")
+    args = parser.parse_args(argv)
+
+    elapsed, latencies, peak = asyncio.run(run(args.clients, args.pieces, args.delay, args.workers))
+    ideal = args.pieces * args.delay
+    ordered = sorted(latencies)
+    print(f"clients          {args.clients}")
+    print(f"peak concurrent  {peak}")
+    print(f"wall time        {elapsed:.2f} s (one upload alone takes >= {ideal:.2f} s)")
+    print(f"requests/s       {args.clients / elapsed:.0f}")
+    print(f"latency p50      {statistics.median(ordered) * 1000:.0f} ms")
+    print(f"latency p99      {ordered[int(0.99 * (len(ordered) - 1))] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
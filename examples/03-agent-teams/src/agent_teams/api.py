@@ -1,13 +1,96 @@
-from flask import Flask, jsonify, request
+import atexit
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from agent_teams.cache import CachedCounter
+from agent_teams.counter import CHUNK_SIZE, StreamCounter, count_text
+from agent_teams.metrics import StageTimer, TimedCounter, TimedReader
+
+COUNT_FIELDS = ("lines", "words", "chars", "bytes", "max_line_length")
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Documents sent to the worker pool per round trip; bounds how many texts a
+# batch request holds in memory at once.
+BATCH_WINDOW = 256
 
-from agent_teams.cli import count_content
+# Serialises creation of each app's batch worker pool
+_pool_lock = threading.Lock()
 
 
-def create_app():
+def create_app(max_body_size=None, batch_workers=0, cache=None, metrics=None):
+    """Create the counting API.
+
+    Request bodies are counted as they stream in, so memory per request is
+    constant. ``max_body_size`` (bytes, ``None`` for no limit) sets Flask's
+    ``MAX_CONTENT_LENGTH``; larger bodies are rejected with 413.
+    ``batch_workers`` > 0 counts NDJSON batch documents on a process pool of
+    that size instead of in the request thread; the pool is started by the
+    first batch request and shut down at interpreter exit. Passing a
+    ``agent_teams.cache.CountCache`` as ``cache`` serves repeated bodies and
+    uploads from the cache and adds ``GET /api/cache`` with its statistics.
+    Passing a ``agent_teams.metrics.Metrics`` as ``metrics`` times every
+    request and its stages and adds ``GET /api/metrics``; without it no
+    timing code runs.
+    """
     app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = max_body_size
+    app.config["BATCH_WORKERS"] = batch_workers
     CORS(app)
 
+    def new_counter():
+        if metrics is None:
+            return _new_counter()
+        return TimedCounter(g.stage_timer, errors="replace", universal_newlines=False)
+
+    def make_counter():
+        if cache is None:
+            return new_counter()
+        return CachedCounter(cache, new_counter)
+
+    def body_stream():
+        if metrics is None:
+            return request.stream
+        return TimedReader(request.stream, g.stage_timer)
+
+    def respond(payload):
+        if metrics is None:
+            return jsonify(payload)
+        start = perf_counter()
+        response = jsonify(payload)
+        g.stage_timer.add("encode", perf_counter() - start)
+        return response
+
+    if metrics is not None:
+        @app.before_request
+        def start_request_timer():
+            g.stage_timer = StageTimer()
+            g.request_start = perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            timer, start = g.stage_timer, g.request_start
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            method, status = request.method, response.status_code
+
+            def record():
+                metrics.observe_request(
+                    route, method, status, perf_counter() - start, timer.body_bytes, timer.stages,
+                )
+
+            # A streamed response is still being generated here, so record it
+            # once the server has finished sending the body.
+            if response.is_streamed:
+                response.call_on_close(record)
+            else:
+                record()
+            return response
+
     @app.errorhandler(400)
     def bad_request(e):
         return jsonify(error=str(e.description)), 400
@@ -20,6 +103,10 @@ def create_app():
     def method_not_allowed(e):
         return jsonify(error="Method not allowed"), 405
 
+    @app.errorhandler(413)
+    def payload_too_large(e):
+        return jsonify(error="Request body too large"), 413
+
     @app.errorhandler(500)
     def internal_error(e):
         return jsonify(error="Internal server error"), 500
@@ -30,45 +117,248 @@ def create_app():
 
     @app.post("/api/count")
     def count_text():
-        body = request.get_data(as_text=True)
-        if not body and not request.content_length:
+        counts = _feed(body_stream(), make_counter())
+        if not counts[3] and not request.content_length:
             return jsonify(error="Request body is empty"), 400
 
-        lines, words, chars, bytes_, max_line_length = count_content(body)
-        result = _filter_counts(lines, words, chars, bytes_, max_line_length)
-        return jsonify(result)
+        return respond(_filter_counts(counts, request.args))
 
     @app.post("/api/count/file")
     def count_file():
-        if "file" not in request.files:
+        boundary = request.mimetype_params.get("boundary")
+        if request.mimetype != "multipart/form-data" or not boundary:
             return jsonify(error="No file provided. Use multipart field 'file'."), 400
 
-        uploaded = request.files["file"]
-        if uploaded.filename == "":
+        try:
+            upload = next(
+                (
+                    (filename, counts)
+                    for name, filename, counts in _iter_uploads(body_stream(), boundary, make_counter)
+                    if name == "file"
+                ),
+                None,
+            )
+        except ValueError:
+            return jsonify(error="Malformed multipart body"), 400
+        if upload is None:
+            return jsonify(error="No file provided. Use multipart field 'file'."), 400
+
+        filename, counts = upload
+        if filename == "":
             return jsonify(error="No file selected"), 400
 
-        content = uploaded.read().decode("utf-8", errors="replace")
-        lines, words, chars, bytes_, max_line_length = count_content(content)
-        result = _filter_counts(lines, words, chars, bytes_, max_line_length)
-        result["filename"] = uploaded.filename
-        return jsonify(result)
+        result = _filter_counts(counts, request.args)
+        result["filename"] = filename
+        return respond(result)
 
-    def _filter_counts(lines, words, chars, bytes_, max_line_length):
-        all_counts = {
-            "lines": lines,
-            "words": words,
-            "chars": chars,
-            "bytes": bytes_,
-            "max_line_length": max_line_length,
-        }
+    @app.post("/api/count/batch")
+    def count_batch():
+        boundary = request.mimetype_params.get("boundary")
+        if request.mimetype == "multipart/form-data" and boundary:
+            items = _batch_uploads(body_stream(), boundary, request.args, make_counter)
+        elif request.mimetype in NDJSON_MIMETYPES:
+            items = _batch_ndjson(body_stream(), request.args, _batch_pool(app))
+        else:
+            return jsonify(
+                error="Send multipart/form-data files or an application/x-ndjson stream."
+            ), 415
 
-        requested = {
-            k for k in all_counts if request.args.get(k, "").lower() == "true"
-        }
+        lines = _encode_lines(items, g.stage_timer if metrics is not None else None)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
 
-        if not requested:
-            return all_counts
+    if cache is not None:
+        @app.get("/api/cache")
+        def cache_stats():
+            return jsonify(cache.stats())
 
-        return {k: v for k, v in all_counts.items() if k in requested}
+    if metrics is not None:
+        @app.get("/api/metrics")
+        def metrics_text():
+            return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
     return app
+
+
+def _new_counter():
+    return StreamCounter(errors="replace", universal_newlines=False)
+
+
+def _feed(stream, counter):
+    while chunk := stream.read(CHUNK_SIZE):
+        counter.feed_bytes(chunk)
+    return counter.result()
+
+
+def _filter_counts(counts, args):
+    """Map a counts tuple to a dict, keeping only fields set to "true" in ``args``.
+
+    With no field requested, every count is returned.
+    """
+    all_counts = dict(zip(COUNT_FIELDS, counts))
+
+    requested = {k for k in all_counts if args.get(k, "").lower() == "true"}
+
+    if not requested:
+        return all_counts
+
+    return {k: v for k, v in all_counts.items() if k in requested}
+
+
+class _UploadParser:
+    """Push-style multipart parser that counts file parts as data arrives.
+
+    ``feed`` takes the next chunk of the body (``None`` at the end) and
+    returns the ``(field, filename, counts)`` of every file part completed by
+    it. Non-file fields are parsed and discarded without being buffered.
+    Raises ValueError for malformed bodies.
+    """
+
+    def __init__(self, boundary, make_counter=None):
+        self._decoder = MultipartDecoder(boundary.encode("latin-1"))
+        self._make_counter = make_counter or _new_counter
+        self._counter = None
+        self._part = None
+        self.done = False
+
+    def feed(self, chunk):
+        finished = []
+        self._decoder.receive_data(chunk)
+        event = self._decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, File):
+                self._part = (event.name, event.filename)
+                self._counter = self._make_counter()
+            elif isinstance(event, Field):
+                self._counter = None
+            elif isinstance(event, Data) and self._counter is not None:
+                self._counter.feed_bytes(event.data)
+                if not event.more_data:
+                    finished.append((*self._part, self._counter.result()))
+                    self._counter = None
+            event = self._decoder.next_event()
+        if isinstance(event, Epilogue) or chunk is None:
+            self.done = True
+        return finished
+
+
+def _iter_uploads(stream, boundary, make_counter=None):
+    """Yield ``(field, filename, counts)`` per file part of a multipart stream."""
+    parser = _UploadParser(boundary, make_counter)
+    while not parser.done:
+        chunk = stream.read(CHUNK_SIZE)
+        yield from parser.feed(chunk or None)
+
+
+class _LineSplitter:
+    """Split a byte stream fed in arbitrary pieces into complete lines."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, chunk):
+        buf = self._buf
+        search_from = len(buf)
+        buf += chunk
+        lines = []
+        start = 0
+        while (end := buf.find(b"\n", search_from)) != -1:
+            lines.append(bytes(buf[start:end]))
+            start = search_from = end + 1
+        del buf[:start]
+        return lines
+
+    def close(self):
+        """Return the unterminated last line, if any."""
+        rest = bytes(self._buf)
+        self._buf.clear()
+        return [rest] if rest else []
+
+
+def _iter_ndjson_lines(stream):
+    splitter = _LineSplitter()
+    while chunk := stream.read(CHUNK_SIZE):
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def _parse_ndjson_document(line):
+    """Return ``(id, text)`` for one NDJSON line.
+
+    A line is either a JSON string or an object with a string ``"text"`` and
+    an optional ``"id"``. Raises ValueError for anything else.
+    """
+    doc = json.loads(line)
+    if isinstance(doc, str):
+        return None, doc
+    if isinstance(doc, dict) and isinstance(doc.get("text"), str):
+        return doc.get("id"), doc["text"]
+    raise ValueError("expected a JSON string or an object with a 'text' string")
+
+
+def _batch_uploads(stream, boundary, args, make_counter):
+    try:
+        uploads = _iter_uploads(stream, boundary, make_counter)
+        for index, (name, filename, counts) in enumerate(uploads):
+            yield {"index": index, "filename": filename, **_filter_counts(counts, args)}
+    except ValueError:
+        yield {"error": "Malformed multipart body"}
+
+
+def _batch_ndjson(stream, args, pool):
+    window = []
+    documents = (line for line in _iter_ndjson_lines(stream) if line.strip())
+    for index, line in enumerate(documents):
+        window.append((index, line))
+        if len(window) == BATCH_WINDOW:
+            yield from _count_window(window, args, pool)
+            window = []
+    yield from _count_window(window, args, pool)
+
+
+def _count_window(window, args, pool):
+    parsed = []
+    for index, line in window:
+        try:
+            doc_id, text = _parse_ndjson_document(line)
+        except ValueError as e:
+            parsed.append((index, None, None, f"Invalid document: {e}"))
+        else:
+            parsed.append((index, doc_id, text, None))
+
+    texts = [text for _, _, text, error in parsed if error is None]
+    results = iter(pool.map(count_text, texts, chunksize=16) if pool else map(count_text, texts))
+    for index, doc_id, _, error in parsed:
+        item = {"index": index}
+        if doc_id is not None:
+            item["id"] = doc_id
+        if error is not None:
+            item["error"] = error
+        else:
+            item.update(_filter_counts(next(results), args))
+        yield item
+
+
+def _encode_lines(items, timer=None):
+    if timer is None:
+        for item in items:
+            yield json.dumps(item) + "\n"
+        return
+    for item in items:
+        start = perf_counter()
+        line = json.dumps(item) + "\n"
+        timer.add("encode", perf_counter() - start)
+        yield line
+
+
+def _batch_pool(app):
+    workers = app.config["BATCH_WORKERS"]
+    if not workers:
+        return None
+    pool = app.extensions.get("count_batch_pool")
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get("count_batch_pool")
+            if pool is None:
+                pool = app.extensions["count_batch_pool"] = ProcessPoolExecutor(max_workers=workers)
+                atexit.register(pool.shutdown)
+    return pool
@@ -0,0 +1,287 @@
+"""ASGI variant of the counting API for many concurrent, slow uploads.
+
+Serves the same routes, JSON error bodies and field filters as
+``agent_teams.api.create_app``, but reads request bodies asynchronously so a
+slow client holds a coroutine rather than a worker thread. Counting runs on
+a bounded thread pool, except for small pieces that are cheaper to count
+inline than to hand off. Run it with any ASGI server, e.g.::
+
+    uvicorn --factory agent_teams.asgi:create_asgi_app
+"""
+
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from agent_teams.api import (
+    BATCH_WINDOW,
+    NDJSON_MIMETYPES,
+    _count_window,
+    _filter_counts,
+    _LineSplitter,
+    _new_counter,
+    _UploadParser,
+)
+from agent_teams.cache import CachedCounter
+
+# Body pieces up to this size are counted on the event loop; larger ones go
+# to the executor.
+INLINE_LIMIT = 4096
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def create_asgi_app(max_body_size=None, max_workers=4, batch_workers=0, cache=None):
+    """Create the ASGI counting app.
+
+    ``max_body_size``, ``batch_workers`` and ``cache`` behave as in
+    ``agent_teams.api.create_app``. ``max_workers`` bounds the thread pool
+    that counting is offloaded to.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="count")
+    batch_pool = ProcessPoolExecutor(max_workers=batch_workers) if batch_workers else None
+
+    def make_counter():
+        if cache is None:
+            return _new_counter()
+        return CachedCounter(cache, _new_counter)
+
+    async def offload(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def feed(target, chunk):
+        if len(chunk) <= INLINE_LIMIT:
+            return target(chunk)
+        return await offload(target, chunk)
+
+    async def health(request):
+        await request.json(200, {"status": "ok"})
+
+    async def count_text(request):
+        counter = make_counter()
+        async for chunk in request.body():
+            await feed(counter.feed_bytes, chunk)
+        counts = await offload(counter.result)
+        if not counts[3] and not request.content_length:
+            raise _HTTPError(400, "Request body is empty")
+        await request.json(200, _filter_counts(counts, request.args))
+
+    async def count_file(request):
+        boundary = request.mimetype_params.get("boundary")
+        if request.mimetype != "multipart/form-data" or not boundary:
+            raise _HTTPError(400, "No file provided. Use multipart field 'file'.")
+
+        parser = _UploadParser(boundary, make_counter)
+        upload = None
+        try:
+            async for chunk in request.body():
+                for name, filename, counts in await feed(parser.feed, chunk):
+                    if name == "file" and upload is None:
+                        upload = filename, counts
+                if upload is not None or parser.done:
+                    break
+            else:
+                for name, filename, counts in parser.feed(None):
+                    if name == "file" and upload is None:
+                        upload = filename, counts
+        except ValueError:
+            raise _HTTPError(400, "Malformed multipart body")
+        if upload is None:
+            raise _HTTPError(400, "No file provided. Use multipart field 'file'.")
+
+        filename, counts = upload
+        if filename == "":
+            raise _HTTPError(400, "No file selected")
+        result = _filter_counts(counts, request.args)
+        result["filename"] = filename
+        await request.json(200, result)
+
+    async def count_batch(request):
+        boundary = request.mimetype_params.get("boundary")
+        if request.mimetype == "multipart/form-data" and boundary:
+            items = batch_uploads(request, boundary)
+        elif request.mimetype in NDJSON_MIMETYPES:
+            items = batch_ndjson(request)
+        else:
+            raise _HTTPError(415, "Send multipart/form-data files or an application/x-ndjson stream.")
+
+        await request.start(200, "application/x-ndjson")
+        async for item in items:
+            await request.write((json.dumps(item) + "\n").encode("utf-8"))
+        await request.write(b"", more_body=False)
+
+    async def batch_uploads(request, boundary):
+        parser = _UploadParser(boundary, make_counter)
+        index = 0
+        try:
+            async for chunk in request.body():
+                for name, filename, counts in await feed(parser.feed, chunk):
+                    yield {"index": index, "filename": filename, **_filter_counts(counts, request.args)}
+                    index += 1
+            for name, filename, counts in parser.feed(None):
+                yield {"index": index, "filename": filename, **_filter_counts(counts, request.args)}
+                index += 1
+        except ValueError:
+            yield {"error": "Malformed multipart body"}
+
+    async def batch_ndjson(request):
+        splitter = _LineSplitter()
+        window = []
+        index = 0
+        chunks = request.body()
+        while True:
+            chunk = await anext(chunks, None)
+            lines = splitter.feed(chunk) if chunk is not None else splitter.close()
+            for line in lines:
+                if line.strip():
+                    window.append((index, line))
+                    index += 1
+            if chunk is None or len(window) >= BATCH_WINDOW:
+                for item in await offload(_count_items, window, request.args, batch_pool):
+                    yield item
+                window = []
+            if chunk is None:
+                return
+
+    async def cache_stats(request):
+        await request.json(200, cache.stats())
+
+    routes = {
+        "/api/health": ("GET", health),
+        "/api/count": ("POST", count_text),
+        "/api/count/file": ("POST", count_file),
+        "/api/count/batch": ("POST", count_batch),
+    }
+    if cache is not None:
+        routes["/api/cache"] = ("GET", cache_stats)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send, executor, batch_pool)
+            return
+        if scope["type"] != "http":
+            return
+
+        request = _Request(scope, receive, send, max_body_size)
+        route = routes.get(scope["path"])
+        try:
+            if scope["method"] == "OPTIONS" and route is not None:
+                await request.preflight(route[0])
+                return
+            if route is None:
+                raise _HTTPError(404, "Not found")
+            method, handler = route
+            if scope["method"] != method:
+                raise _HTTPError(405, "Method not allowed")
+            request.check_length()
+            await handler(request)
+        except _HTTPError as e:
+            if request.started:
+                raise
+            await request.json(e.status, {"error": e.message})
+        except _ClientDisconnected:
+            pass
+        except Exception:
+            if request.started:
+                raise
+            await request.json(500, {"error": "Internal server error"})
+
+    return app
+
+
+def _count_items(window, args, pool):
+    return list(_count_window(window, args, pool))
+
+
+async def _lifespan(receive, send, executor, batch_pool):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            executor.shutdown(wait=False)
+            if batch_pool is not None:
+                batch_pool.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class _Request:
+    """The bits of an ASGI HTTP exchange the handlers need."""
+
+    def __init__(self, scope, receive, send, max_body_size):
+        self._receive = receive
+        self._send = send
+        self._max_body_size = max_body_size
+        self.started = False
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        length = self.headers.get("content-length")
+        self.content_length = int(length) if length and length.isdigit() else None
+        content_type, *params = self.headers.get("content-type", "").split(";")
+        self.mimetype = content_type.strip().lower()
+        self.mimetype_params = {}
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            self.mimetype_params[key.lower()] = value.strip('"')
+
+    def check_length(self):
+        limit = self._max_body_size
+        if limit is not None and self.content_length is not None and self.content_length > limit:
+            raise _HTTPError(413, "Request body too large")
+
+    async def body(self):
+        """Yield the request body as it arrives, enforcing the size limit."""
+        limit = self._max_body_size
+        received = 0
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                raise _ClientDisconnected()
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if limit is not None and received > limit:
+                raise _HTTPError(413, "Request body too large")
+            if chunk:
+                yield chunk
+            if not message.get("more_body", False):
+                return
+
+    def _cors_headers(self):
+        if "origin" in self.headers:
+            return [(b"access-control-allow-origin", b"*")]
+        return []
+
+    async def start(self, status, content_type, extra_headers=()):
+        self.started = True
+        headers = [(b"content-type", content_type.encode("latin-1")), *self._cors_headers(), *extra_headers]
+        await self._send({"type": "http.response.start", "status": status, "headers": headers})
+
+    async def write(self, data, more_body=True):
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        await self.start(status, "application/json", [(b"content-length", str(len(body)).encode())])
+        await self.write(body, more_body=False)
+
+    async def preflight(self, method):
+        self.started = True
+        headers = [
+            (b"access-control-allow-origin", b"*"),
+            (b"access-control-allow-methods", f"{method}, OPTIONS".encode("latin-1")),
+            (b"access-control-allow-headers", self.headers.get("access-control-request-headers", "*").encode("latin-1")),
+            (b"content-length", b"0"),
+        ]
+        await self._send({"type": "http.response.start", "status": 200, "headers": headers})
+        await self.write(b"", more_body=False)
@@ -0,0 +1,185 @@
+import hashlib
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from agent_teams.counter import CHUNK_SIZE
+
+DIGEST_SIZE = 16
+SPOOL_SIZE = 1 << 20
+# Disk-tier writes between purges of expired and excess rows
+PURGE_EVERY = 1000
+
+
+def _entry_size(key, counts):
+    return sys.getsizeof(key) + sys.getsizeof(counts) + sum(map(sys.getsizeof, counts))
+
+
+class CountCache:
+    """Content-addressed cache of count tuples.
+
+    An in-memory LRU tier bounded by ``max_bytes`` (and optionally
+    ``max_entries``), with entries expiring ``ttl`` seconds after they are
+    stored. When ``path`` is given, entries are also written to a SQLite
+    database there, which is consulted on memory misses and survives
+    restarts. On open and every ``PURGE_EVERY`` writes, expired rows are
+    deleted from it and, past ``max_disk_entries``, the oldest rows too.
+    Safe to share between request threads.
+    """
+
+    def __init__(
+        self, max_bytes=64 << 20, max_entries=None, ttl=None, path=None, max_disk_entries=1_000_000, clock=time.time
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0}
+        self._db = None
+        self._disk_writes = 0
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS counts ("
+                " digest BLOB PRIMARY KEY, lines INTEGER, words INTEGER, chars INTEGER,"
+                " bytes INTEGER, max_line_length INTEGER, stored_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS counts_stored_at ON counts (stored_at)")
+            self._purge_disk(clock())
+
+    def get(self, key):
+        """Return the counts stored under ``key``, or ``None``."""
+        now = self._clock()
+        with self._lock:
+            # One lookup counts one expiration, even if both tiers had expired.
+            expired = False
+            entry = self._entries.get(key)
+            if entry is not None:
+                counts, stored_at = entry
+                if not self._expired(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return counts
+                self._remove(key)
+                expired = True
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT lines, words, chars, bytes, max_line_length, stored_at"
+                    " FROM counts WHERE digest = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    counts, stored_at = tuple(row[:5]), row[5]
+                    if not self._expired(stored_at, now):
+                        self._insert(key, counts, stored_at)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return counts
+                    self._db.execute("DELETE FROM counts WHERE digest = ?", (key,))
+                    self._db.commit()
+                    expired = True
+
+            if expired:
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, counts):
+        now = self._clock()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, counts, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO counts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, *counts, now),
+                )
+                self._disk_writes += 1
+                if self._disk_writes >= PURGE_EVERY:
+                    self._purge_disk(now)
+                else:
+                    self._db.commit()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current memory tier size."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._size}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _purge_disk(self, now):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM counts WHERE stored_at <= ?", (now - self.ttl,))
+        if self.max_disk_entries is not None:
+            excess = self._db.execute("SELECT COUNT(*) FROM counts").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM counts WHERE digest IN"
+                    " (SELECT digest FROM counts ORDER BY stored_at LIMIT ?)",
+                    (excess,),
+                )
+        self._db.commit()
+        self._disk_writes = 0
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at >= self.ttl
+
+    def _insert(self, key, counts, stored_at):
+        self._entries[key] = (counts, stored_at)
+        self._size += _entry_size(key, counts)
+        while self._entries and (
+            self._size > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        counts, _ = self._entries.pop(key)
+        self._size -= _entry_size(key, counts)
+
+
+class CachedCounter:
+    """Counter-compatible sink that counts only on a cache miss.
+
+    ``feed_bytes`` hashes the data with BLAKE2b and spools it (in memory up
+    to ``spool_size``, then to a temporary file). ``result`` looks the digest
+    up in ``cache`` and only runs ``make_counter()`` over the spool when the
+    content has not been seen before.
+    """
+
+    def __init__(self, cache, make_counter, spool_size=SPOOL_SIZE):
+        self._cache = cache
+        self._make_counter = make_counter
+        self._hash = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        self._spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+
+    def feed_bytes(self, data):
+        self._hash.update(data)
+        self._spool.write(data)
+
+    def result(self):
+        key = self._hash.digest()
+        counts = self._cache.get(key)
+        if counts is None:
+            self._spool.seek(0)
+            counter = self._make_counter()
+            while chunk := self._spool.read(CHUNK_SIZE):
+                counter.feed_bytes(chunk)
+            counts = counter.result()
+            self._cache.put(key, counts)
+        self._spool.close()
+        return counts
@@ -1,15 +1,23 @@
-import sys
-
 import click
 
+from agent_teams.counter import count_bytes, count_file, count_newlines, count_stream, count_text
+from agent_teams.parallel import count_files_parallel
+
 
 def count_content(content):
-    lines = content.count("\n")
-    words = len(content.split())
-    chars = len(content)
-    byte_count = len(content.encode("utf-8"))
-    max_line_len = max((len(line) for line in content.splitlines()), default=0)
-    return lines, words, chars, byte_count, max_line_len
+    return count_text(content)
+
+
+def plan_counts(show_lines, show_words, show_chars, show_max_line_length):
+    """Pick the cheapest counter that still produces every requested column.
+
+    Counts that are not requested come back as 0 from the cheaper paths.
+    """
+    if show_words or show_chars or show_max_line_length:
+        return count_stream
+    if show_lines:
+        return count_newlines
+    return count_bytes
 
 
 def format_counts(
@@ -38,8 +46,12 @@ def format_counts(
 @click.option("--chars", "-c", is_flag=True, help="Count characters.")
 @click.option("--bytes", "-b", "bytes_", is_flag=True, help="Count bytes.")
 @click.option("--max-line-length", "-L", is_flag=True, help="Display the length of the longest line.")
+@click.option(
+    "--jobs", "-j", type=click.IntRange(min=1), default=1, show_default=True,
+    help="Number of worker processes for counting files in parallel.",
+)
 @click.version_option("0.1.0", "-V", "--version", prog_name="wc-tool")
-def main(files, lines, words, chars, bytes_, max_line_length):
+def main(files, lines, words, chars, bytes_, max_line_length, jobs):
     """A simple wc-like tool that counts lines, words, and characters."""
     show_all = not (lines or words or chars or bytes_ or max_line_length)
     show_lines = lines or show_all
@@ -51,6 +63,8 @@ def main(files, lines, words, chars, bytes_, max_line_length):
     if not files:
         files = ("-",)
 
+    count = plan_counts(show_lines, show_words, show_chars, show_max_line_length)
+
     total_lines = 0
     total_words = 0
     total_chars = 0
@@ -58,33 +72,34 @@ def main(files, lines, words, chars, bytes_, max_line_length):
     max_max_line_len = 0
     file_count = 0
 
-    for filepath in files:
-        try:
-            if filepath == "-":
-                content = click.get_text_stream("stdin").read()
-                name = "-"
-            else:
-                with open(filepath) as f:
-                    content = f.read()
-                name = filepath
-
-            l, w, c, b, mll = count_content(content)
-            total_lines += l
-            total_words += w
-            total_chars += c
-            total_bytes += b
-            max_max_line_len = max(max_max_line_len, mll)
-            file_count += 1
-
-            click.echo(
-                format_counts(
-                    l, w, c, b, mll,
-                    show_lines, show_words, show_chars, show_bytes, show_max_line_length,
-                    name,
-                )
+    stdin = click.get_binary_stream("stdin") if "-" in files else None
+    if jobs > 1:
+        results = count_files_parallel(files, count, jobs, stdin=stdin)
+    else:
+        results = (
+            (filepath, *count_file(filepath, count, stdin=stdin)) for filepath in files
+        )
+
+    for filepath, counts, error in results:
+        if error is not None:
+            click.echo(f"wc-tool: {filepath}: {error}", err=True)
+            continue
+
+        l, w, c, b, mll = counts
+        total_lines += l
+        total_words += w
+        total_chars += c
+        total_bytes += b
+        max_max_line_len = max(max_max_line_len, mll)
+        file_count += 1
+
+        click.echo(
+            format_counts(
+                l, w, c, b, mll,
+                show_lines, show_words, show_chars, show_bytes, show_max_line_length,
+                filepath,
             )
-        except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
-            click.echo(f"wc-tool: {filepath}: {e.strerror}", err=True)
+        )
 
     if file_count > 1:
         click.echo(
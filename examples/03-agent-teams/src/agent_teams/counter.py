@@ -0,0 +1,271 @@
+import codecs
+import io
+import os
+import stat
+
+CHUNK_SIZE = 1 << 16
+RAW_CHUNK_SIZE = 1 << 20
+
+# Every boundary str.splitlines() recognises; "\r\n" is covered by \r + \n.
+LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _ascii_classes():
+    table = bytearray(b"x" * 256)
+    for i in range(128):
+        if chr(i) in LINE_BREAKS:
+            table[i] = ord("\n")
+        elif chr(i).isspace():
+            table[i] = ord(" ")
+    return bytes(table)
+
+
+# Maps each ASCII byte to its class: b"\n" for a line break, b" " for other
+# whitespace and b"x" for a word character. One translate() call classifies a
+# whole chunk, after which every count is a C-level scan of the result.
+_ASCII_CLASSES = _ascii_classes()
+_WORD = ord("x")
+
+
+class StreamCounter:
+    """Incremental line/word/char/byte/max-line-length counter.
+
+    Feed it text with ``feed_text`` or raw UTF-8 with ``feed_bytes`` in
+    chunks of any size; word, line and multi-byte state is carried across
+    chunk boundaries so the totals match counting the whole input at once.
+
+    ASCII chunks (the common case) go through a batched kernel that never
+    decodes and never builds per-word or per-line objects; other chunks fall
+    back to ``str`` methods so Unicode whitespace and line breaks match
+    ``str.split`` and ``str.splitlines``.
+    """
+
+    def __init__(self, errors="strict", universal_newlines=True):
+        self.lines = 0
+        self.words = 0
+        self.chars = 0
+        self.bytes = 0
+        self.max_line_len = 0
+        self._line_len = 0
+        self._first_line_len = None
+        self._in_word = False
+        self._starts_in_word = None
+        self._translate = universal_newlines
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors)
+        if universal_newlines:
+            self._decoder = io.IncrementalNewlineDecoder(self._decoder, translate=True)
+
+    def feed_bytes(self, data, final=False):
+        self.bytes += len(data)
+        if (
+            data.isascii()
+            and not (self._translate and b"\r" in data)
+            and self._decoder.getstate() == (b"", 0)
+        ):
+            # Nothing for the decoder to translate or carry over.
+            if data:
+                self._count_ascii(data)
+            return
+        text = self._decoder.decode(data, final)
+        if text:
+            self._count_text(text)
+
+    def feed_text(self, text):
+        if text.isascii():
+            self.bytes += len(text)
+            if text:
+                self._count_ascii(text.encode("ascii"))
+            return
+        # surrogatepass: a lone surrogate (valid in JSON input) counts as its
+        # three UTF-8 bytes instead of failing the whole count.
+        self.bytes += len(text.encode("utf-8", "surrogatepass"))
+        self._count_text(text)
+
+    def _count_ascii(self, data):
+        classes = data.translate(_ASCII_CLASSES)
+        self.lines += data.count(b"\n")
+        self.chars += len(data)
+
+        starts_in_word = classes[0] == _WORD
+        if self._starts_in_word is None:
+            self._starts_in_word = starts_in_word
+        self.words += classes.count(b" x") + classes.count(b"\nx")
+        if starts_in_word and not self._in_word:
+            self.words += 1
+        self._in_word = classes[-1] == _WORD
+
+        segments = classes.split(b"\n")
+        if len(segments) == 1:
+            self._line_len += len(data)
+            return
+        first = self._line_len + len(segments[0])
+        if self._first_line_len is None:
+            self._first_line_len = first
+        self.max_line_len = max(self.max_line_len, first, max(map(len, segments)))
+        self._line_len = len(segments[-1])
+
+    def _count_text(self, text):
+        if text.isascii():
+            self._count_ascii(text.encode("ascii"))
+            return
+
+        self.lines += text.count("\n")
+        self.chars += len(text)
+
+        if self._starts_in_word is None:
+            self._starts_in_word = not text[0].isspace()
+        words = len(text.split())
+        if words and self._in_word and not text[0].isspace():
+            words -= 1
+        self.words += words
+        self._in_word = not text[-1].isspace()
+
+        line_len = self._line_len
+        max_line_len = self.max_line_len
+        for piece in text.splitlines(True):
+            body = len(piece.rstrip(LINE_BREAKS))
+            line_len += body
+            if body != len(piece):
+                if self._first_line_len is None:
+                    self._first_line_len = line_len
+                if line_len > max_line_len:
+                    max_line_len = line_len
+                line_len = 0
+        self._line_len = line_len
+        self.max_line_len = max_line_len
+
+    def result(self):
+        self.feed_bytes(b"", final=True)
+        return (
+            self.lines,
+            self.words,
+            self.chars,
+            self.bytes,
+            max(self.max_line_len, self._line_len),
+        )
+
+    def partial(self):
+        """Return the counts plus the edge state needed by ``merge_partials``.
+
+        The extra fields are the length of the first and last (possibly
+        unterminated) lines, whether any line break was seen, and whether the
+        input starts and ends inside a word.
+        """
+        counts = self.result()
+        return counts + (
+            self._line_len if self._first_line_len is None else self._first_line_len,
+            self._line_len,
+            self._first_line_len is not None,
+            bool(self._starts_in_word),
+            self._in_word,
+        )
+
+
+def count_stream(stream, chunk_size=CHUNK_SIZE, errors="strict", universal_newlines=True):
+    """Count a binary stream in fixed-size chunks using constant memory.
+
+    With ``universal_newlines`` (the CLI's text-mode behaviour) ``\r\n`` and
+    ``\r`` are read as ``\n``; without it the decoded text is counted as is.
+    """
+    counter = StreamCounter(errors=errors, universal_newlines=universal_newlines)
+    read = stream.read
+    while chunk := read(chunk_size):
+        counter.feed_bytes(chunk)
+    return counter.result()
+
+
+def count_stream_partial(stream, chunk_size=CHUNK_SIZE, errors="strict"):
+    """Like ``count_stream`` but returns a ``StreamCounter.partial`` tuple."""
+    counter = StreamCounter(errors=errors)
+    read = stream.read
+    while chunk := read(chunk_size):
+        counter.feed_bytes(chunk)
+    return counter.partial()
+
+
+def merge_partials(partials):
+    """Combine partials of consecutive slices of one input into counts.
+
+    Fixes up the word and line that straddle each slice boundary.
+    """
+    lines = words = chars = byte_count = max_line_len = 0
+    last_line_len = 0
+    ends_in_word = False
+    for part in partials:
+        (p_lines, p_words, p_chars, p_bytes, p_max, p_first, p_last,
+         p_has_break, p_starts_in_word, p_ends_in_word) = part
+        lines += p_lines
+        words += p_words
+        byte_count += p_bytes
+        if not p_chars:
+            continue
+        if ends_in_word and p_starts_in_word:
+            words -= 1
+        chars += p_chars
+        max_line_len = max(max_line_len, p_max, last_line_len + p_first)
+        last_line_len = p_last if p_has_break else last_line_len + p_last
+        ends_in_word = p_ends_in_word
+    return lines, words, chars, byte_count, max_line_len
+
+
+def count_file(path, count, stdin=None):
+    """Count one path (``-`` for ``stdin``) with the given counter.
+
+    Returns ``(counts, None)`` or ``(None, strerror)`` for the file errors
+    wc-tool reports and skips.
+    """
+    try:
+        if path == "-":
+            return count(stdin), None
+        with open(path, "rb") as f:
+            return count(f), None
+    except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
+        return None, e.strerror
+
+
+def count_text(content, chunk_size=CHUNK_SIZE):
+    """Count an in-memory string by feeding it through the same engine."""
+    counter = StreamCounter()
+    for start in range(0, len(content), chunk_size):
+        counter.feed_text(content[start:start + chunk_size])
+    return counter.result()
+
+
+def count_newlines(stream, chunk_size=RAW_CHUNK_SIZE):
+    """Count lines and bytes without decoding, reusing one read buffer.
+
+    Lines follow the universal-newline rules of ``count_stream``: ``\n``,
+    ``\r\n`` and a lone ``\r`` each end one line.
+    """
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    readinto = stream.readinto
+    lines = size = 0
+    after_cr = False
+    while n := readinto(view):
+        lines += buf.count(b"\n", 0, n)
+        crs = buf.count(b"\r", 0, n)
+        if crs:
+            lines += crs - buf.count(b"\r\n", 0, n)
+        if after_cr and buf[0] == 0x0A:
+            lines -= 1
+        after_cr = buf[n - 1] == 0x0D
+        size += n
+    return lines, 0, 0, size, 0
+
+
+def count_bytes(stream, chunk_size=RAW_CHUNK_SIZE):
+    """Count bytes, from fstat() alone when the stream is a regular file."""
+    try:
+        st = os.fstat(stream.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        st = None
+    if st is not None and stat.S_ISREG(st.st_mode):
+        return 0, 0, 0, max(st.st_size - stream.tell(), 0), 0
+
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    size = 0
+    while n := stream.readinto(view):
+        size += n
+    return 0, 0, 0, size, 0
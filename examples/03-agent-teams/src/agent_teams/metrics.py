@@ -0,0 +1,173 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from agent_teams.counter import StreamCounter
+
+# Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGES = ("read", "decode", "count", "encode")
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield ``(le, count)`` pairs, ending with ``("+Inf", total)``."""
+        total = 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            yield _format_float(bound), total
+        yield "+Inf", self.count
+
+
+class Metrics:
+    """Request, byte and per-stage timing metrics for the counting API.
+
+    Pass an instance as ``create_app(metrics=...)``. Each request records its
+    route, method, status and latency, the request body bytes it read, and
+    how long it spent in each of ``STAGES``: reading the body, decoding
+    UTF-8, counting, and encoding the JSON response. ``render`` produces the
+    Prometheus text exposition format. Safe to share between request threads.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="wc_api"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._latency = {}
+        self._bytes = {}
+        self._stages = {}
+
+    def observe_request(self, route, method, status, seconds, body_bytes, stages):
+        """Record one finished request; ``stages`` maps stage name to seconds."""
+        with self._lock:
+            key = (route, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(route)
+            if histogram is None:
+                histogram = self._latency[route] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._bytes[route] = self._bytes.get(route, 0) + body_bytes
+            for stage, elapsed in stages.items():
+                histogram = self._stages.get((route, stage))
+                if histogram is None:
+                    histogram = self._stages[(route, stage)] = Histogram(self.buckets)
+                histogram.observe(elapsed)
+
+    def render(self):
+        p = self.prefix
+        out = []
+        with self._lock:
+            out.append(f"# HELP {p}_requests_total Requests handled, by route, method and status.")
+            out.append(f"# TYPE {p}_requests_total counter")
+            for (route, method, status), n in sorted(self._requests.items()):
+                out.append(f"{p}_requests_total{_labels(route=route, method=method, status=status)} {n}")
+
+            out.append(f"# HELP {p}_request_duration_seconds Request latency, by route.")
+            out.append(f"# TYPE {p}_request_duration_seconds histogram")
+            for route, histogram in sorted(self._latency.items()):
+                _render_histogram(out, f"{p}_request_duration_seconds", histogram, route=route)
+
+            out.append(f"# HELP {p}_request_body_bytes_total Request body bytes read, by route.")
+            out.append(f"# TYPE {p}_request_body_bytes_total counter")
+            for route, n in sorted(self._bytes.items()):
+                out.append(f"{p}_request_body_bytes_total{_labels(route=route)} {n}")
+
+            out.append(f"# HELP {p}_stage_duration_seconds Time per request spent in each stage, by route.")
+            out.append(f"# TYPE {p}_stage_duration_seconds histogram")
+            for (route, stage), histogram in sorted(self._stages.items()):
+                _render_histogram(out, f"{p}_stage_duration_seconds", histogram, route=route, stage=stage)
+        return "\n".join(out) + "\n"
+
+
+def _format_float(value):
+    return repr(float(value))
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histogram(out, name, histogram, **labels):
+    for le, n in histogram.cumulative():
+        out.append(f"{name}_bucket{_labels(**labels, le=le)} {n}")
+    out.append(f"{name}_sum{_labels(**labels)} {_format_float(histogram.sum)}")
+    out.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+class StageTimer:
+    """Accumulates the time one request spends in each stage."""
+
+    def __init__(self):
+        self.stages = {}
+        self.body_bytes = 0
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+class TimedReader:
+    """Wraps a binary stream, charging ``read`` time and bytes to ``timer``."""
+
+    def __init__(self, stream, timer):
+        self._stream = stream
+        self._timer = timer
+
+    def read(self, n=-1):
+        start = perf_counter()
+        data = self._stream.read(n)
+        self._timer.add("read", perf_counter() - start)
+        self._timer.body_bytes += len(data)
+        return data
+
+
+class _TimedDecoder:
+    def __init__(self, decoder, timer):
+        self._decoder = decoder
+        self._timer = timer
+
+    def getstate(self):
+        return self._decoder.getstate()
+
+    def decode(self, data, final=False):
+        start = perf_counter()
+        text = self._decoder.decode(data, final)
+        self._timer.add("decode", perf_counter() - start)
+        return text
+
+
+class TimedCounter(StreamCounter):
+    """``StreamCounter`` that charges decoding and counting time to ``timer``.
+
+    ASCII chunks are never decoded, so their whole cost is counting.
+    """
+
+    def __init__(self, timer, errors="strict", universal_newlines=True):
+        super().__init__(errors=errors, universal_newlines=universal_newlines)
+        self._timer = timer
+        self._decoder = _TimedDecoder(self._decoder, timer)
+
+    def feed_bytes(self, data, final=False):
+        timer = self._timer
+        decoding = timer.stages.get("decode", 0.0)
+        start = perf_counter()
+        super().feed_bytes(data, final)
+        elapsed = perf_counter() - start
+        timer.add("count", elapsed - (timer.stages.get("decode", 0.0) - decoding))
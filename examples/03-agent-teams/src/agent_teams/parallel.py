@@ -0,0 +1,125 @@
+import os
+import stat
+from concurrent.futures import ProcessPoolExecutor
+
+from agent_teams.counter import (
+    count_file,
+    count_newlines,
+    count_stream,
+    count_stream_partial,
+    merge_partials,
+)
+
+# Regular files at least twice this size are split into byte ranges so one
+# huge file can use several workers.
+SPLIT_SIZE = 32 << 20
+
+
+class _RangeReader:
+    """Minimal binary reader limited to ``size`` bytes of ``f``."""
+
+    def __init__(self, f, size):
+        self._f = f
+        self._remaining = size
+
+    def read(self, n):
+        data = self._f.read(min(n, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    def readinto(self, view):
+        n = self._f.readinto(view[:self._remaining])
+        self._remaining -= n
+        return n
+
+
+def _count_range(count, path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        reader = _RangeReader(f, end - start)
+        if count is count_stream:
+            return count_stream_partial(reader)
+        return count(reader)
+
+
+def _merge_ranges(count, results):
+    if count is count_stream:
+        return merge_partials(results)
+    return tuple(map(sum, zip(*results)))
+
+
+def split_points(path, size, parts):
+    """Return byte offsets splitting ``path`` into ``parts`` decodable ranges.
+
+    Offsets are nudged forward so no range starts inside a UTF-8 sequence or
+    between the ``\\r`` and ``\\n`` of a CRLF pair.
+    """
+    points = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            offset = max(size * i // parts, points[-1])
+            f.seek(offset - 1)
+            window = f.read(8)
+            j = 1
+            while j < len(window) and (
+                0x80 <= window[j] < 0xC0
+                or (window[j - 1] == 0x0D and window[j] == 0x0A)
+            ):
+                j += 1
+            offset += j - 1
+            if points[-1] < offset < size:
+                points.append(offset)
+    points.append(size)
+    return points
+
+
+def _ranges_for(path, count, jobs):
+    if count not in (count_stream, count_newlines):
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    parts = min(jobs, st.st_size // SPLIT_SIZE)
+    if parts < 2:
+        return None
+    points = split_points(path, st.st_size, parts)
+    return list(zip(points, points[1:]))
+
+
+def count_files_parallel(files, count, jobs, stdin=None):
+    """Count ``files`` on a pool of ``jobs`` processes.
+
+    Yields ``(path, counts, strerror)`` in input order, exactly like
+    counting them one after another with ``count_file``. ``-`` is read from
+    ``stdin`` in this process.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = []
+        for path in files:
+            if path == "-":
+                pending.append((path, None))
+                continue
+            ranges = _ranges_for(path, count, jobs)
+            if ranges is None:
+                pending.append((path, pool.submit(count_file, path, count)))
+            else:
+                pending.append((path, [
+                    pool.submit(_count_range, count, path, start, end)
+                    for start, end in ranges
+                ]))
+
+        for path, job in pending:
+            if job is None:
+                counts, error = count_file(path, count, stdin=stdin)
+            elif isinstance(job, list):
+                try:
+                    counts = _merge_ranges(count, [f.result() for f in job])
+                    error = None
+                except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
+                    counts, error = None, e.strerror
+            else:
+                counts, error = job.result()
+            yield path, counts, error
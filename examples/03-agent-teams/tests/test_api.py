@@ -1,8 +1,13 @@
 import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
-from agent_teams.api import create_app
+from agent_teams.api import _batch_pool, create_app
+from agent_teams.cache import CountCache
+from agent_teams.metrics import Metrics
 
 
 @pytest.fixture
@@ -122,6 +127,236 @@ class TestCountFile:
         assert result == {"words": 3, "filename": "sample.txt"}
 
 
+class TestStreamingBodies:
+    def test_large_text_body(self, client):
+        body = b"lorem ipsum dolor\n" * 20000
+        resp = client.post("/api/count", data=body)
+        assert resp.get_json() == {
+            "lines": 20000, "words": 60000, "chars": len(body),
+            "bytes": len(body), "max_line_length": 17,
+        }
+
+    def test_crlf_not_translated(self, client):
+        resp = client.post("/api/count?chars=true&lines=true", data=b"a\r\nb\r\n")
+        assert resp.get_json() == {"lines": 2, "chars": 6}
+
+    def test_invalid_utf8_replaced(self, client):
+        resp = client.post("/api/count?chars=true&words=true", data=b"ok \xff\xfe")
+        assert resp.get_json() == {"words": 2, "chars": 5}
+
+    def test_upload_alongside_other_fields(self, client):
+        data = {
+            "note": "not counted",
+            "other": (io.BytesIO(b"ignored words here"), "other.txt"),
+            "file": (io.BytesIO("café ☕\n".encode("utf-8") * 50000), "big.txt"),
+        }
+        resp = client.post("/api/count/file?lines=true&words=true", data=data, content_type="multipart/form-data")
+        assert resp.get_json() == {"lines": 50000, "words": 100000, "filename": "big.txt"}
+
+    def test_not_multipart(self, client):
+        resp = client.post("/api/count/file", data="plain text")
+        assert resp.status_code == 400
+        assert "file" in resp.get_json()["error"].lower()
+
+    def test_malformed_multipart(self, client):
+        resp = client.post(
+            "/api/count/file",
+            data=b"--xyz\r\ngarbage without headers",
+            content_type="multipart/form-data; boundary=xyz",
+        )
+        assert resp.status_code == 400
+
+
+class TestMaxBodySize:
+    @pytest.fixture
+    def client(self):
+        app = create_app(max_body_size=1024)
+        app.config["TESTING"] = True
+        return app.test_client()
+
+    def test_within_limit(self, client):
+        resp = client.post("/api/count", data=b"x" * 1024)
+        assert resp.status_code == 200
+
+    def test_text_over_limit(self, client):
+        resp = client.post("/api/count", data=b"x" * 1025)
+        assert resp.status_code == 413
+        assert "too large" in resp.get_json()["error"].lower()
+
+    def test_upload_over_limit(self, client):
+        data = {"file": (io.BytesIO(b"x" * 2048), "big.txt")}
+        resp = client.post("/api/count/file", data=data, content_type="multipart/form-data")
+        assert resp.status_code == 413
+
+
+def ndjson(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+
+class TestCountBatch:
+    def test_ndjson_texts(self, client):
+        body = "\n".join([
+            json.dumps("hello world\n"),
+            json.dumps({"id": "doc-2", "text": "café ☕\nfoo"}),
+            "",
+            json.dumps({"id": 3, "text": ""}),
+        ])
+        resp = client.post("/api/count/batch", data=body, content_type="application/x-ndjson")
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/x-ndjson"
+        assert ndjson(resp) == [
+            {"index": 0, "lines": 1, "words": 2, "chars": 12, "bytes": 12, "max_line_length": 11},
+            {"index": 1, "id": "doc-2", "lines": 1, "words": 3, "chars": 10, "bytes": 13, "max_line_length": 6},
+            {"index": 2, "id": 3, "lines": 0, "words": 0, "chars": 0, "bytes": 0, "max_line_length": 0},
+        ]
+
+    def test_ndjson_with_filter(self, client):
+        body = "\n".join(json.dumps(f"{'w ' * i}\n") for i in range(600))
+        resp = client.post("/api/count/batch?words=true", data=body, content_type="application/x-ndjson")
+        items = ndjson(resp)
+        assert len(items) == 600
+        assert items[599] == {"index": 599, "words": 599}
+
+    def test_ndjson_invalid_document(self, client):
+        body = '"ok"\n{"nope": 1}\nnot json\n"fine"\n'
+        resp = client.post("/api/count/batch?chars=true", data=body, content_type="application/x-ndjson")
+        items = ndjson(resp)
+        assert items[0] == {"index": 0, "chars": 2}
+        assert "error" in items[1] and "error" in items[2]
+        assert items[3] == {"index": 3, "chars": 4}
+
+    def test_ndjson_lone_surrogate(self, client):
+        body = '"a\\ud800 b"\n"after"\n'
+        resp = client.post("/api/count/batch?words=true&bytes=true", data=body, content_type="application/x-ndjson")
+        assert ndjson(resp) == [{"index": 0, "words": 2, "bytes": 6}, {"index": 1, "words": 1, "bytes": 5}]
+
+    def test_ndjson_worker_pool(self):
+        app = create_app(batch_workers=2)
+        app.config["TESTING"] = True
+        body = "\n".join(json.dumps({"id": i, "text": "a b\n" * i}) for i in range(300))
+        resp = app.test_client().post("/api/count/batch?lines=true", data=body, content_type="application/x-ndjson")
+        assert ndjson(resp) == [{"index": i, "id": i, "lines": i} for i in range(300)]
+        app.extensions["count_batch_pool"].shutdown()
+
+    def test_worker_pool_created_once_under_concurrency(self):
+        app = create_app(batch_workers=1)
+        barrier = threading.Barrier(8)
+
+        def first_request():
+            barrier.wait()
+            return _batch_pool(app)
+
+        with ThreadPoolExecutor(8) as threads:
+            pools = set(threads.map(lambda _: first_request(), range(8)))
+        assert pools == {app.extensions["count_batch_pool"]}
+        app.extensions["count_batch_pool"].shutdown()
+
+    def test_multipart_files(self, client):
+        data = {
+            "a": (io.BytesIO(b"one two\n"), "a.txt"),
+            "b": (io.BytesIO(b"three\n"), "b.txt"),
+            "note": "skipped",
+        }
+        resp = client.post("/api/count/batch?words=true", data=data, content_type="multipart/form-data")
+        assert ndjson(resp) == [
+            {"index": 0, "filename": "a.txt", "words": 2},
+            {"index": 1, "filename": "b.txt", "words": 1},
+        ]
+
+    def test_unsupported_media_type(self, client):
+        resp = client.post("/api/count/batch", data="x", content_type="text/plain")
+        assert resp.status_code == 415
+        assert "error" in resp.get_json()
+
+
+class TestResultCache:
+    @pytest.fixture
+    def cache(self):
+        return CountCache()
+
+    @pytest.fixture
+    def client(self, cache):
+        app = create_app(cache=cache)
+        app.config["TESTING"] = True
+        return app.test_client()
+
+    def test_repeat_body_is_served_from_cache(self, client, cache):
+        first = client.post("/api/count", data="hello world\n").get_json()
+        second = client.post("/api/count?words=true", data="hello world\n").get_json()
+        assert first["words"] == second["words"] == 2
+        assert cache.stats()["hits"] == 1
+
+    def test_upload_shares_cache_with_text(self, client, cache):
+        client.post("/api/count", data="one two\nthree\n")
+        data = {"file": (io.BytesIO(b"one two\nthree\n"), "sample.txt")}
+        resp = client.post("/api/count/file", data=data, content_type="multipart/form-data")
+        assert resp.get_json()["words"] == 3
+        assert cache.stats()["hits"] == 1
+
+    def test_stats_endpoint(self, client):
+        client.post("/api/count", data="x")
+        client.post("/api/count", data="x")
+        stats = client.get("/api/cache").get_json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_no_stats_endpoint_without_cache(self):
+        resp = create_app().test_client().get("/api/cache")
+        assert resp.status_code == 404
+
+
+class TestMetrics:
+    @pytest.fixture
+    def metrics(self):
+        return Metrics()
+
+    @pytest.fixture
+    def client(self, metrics):
+        app = create_app(metrics=metrics)
+        app.config["TESTING"] = True
+        return app.test_client()
+
+    def test_request_counts_and_bytes(self, client):
+        client.post("/api/count", data="hello world\n")
+        client.post("/api/count", data="")
+        client.get("/api/nope")
+        text = client.get("/api/metrics").get_data(as_text=True)
+        assert 'wc_api_requests_total{route="/api/count",method="POST",status="200"} 1' in text
+        assert 'wc_api_requests_total{route="/api/count",method="POST",status="400"} 1' in text
+        assert 'wc_api_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+        assert 'wc_api_request_body_bytes_total{route="/api/count"} 12' in text
+        assert 'wc_api_request_duration_seconds_count{route="/api/count"} 2' in text
+
+    def test_stage_timings(self, client):
+        client.post("/api/count", data="café\n".encode("utf-8") * 100)
+        text = client.get("/api/metrics").get_data(as_text=True)
+        for stage in ("read", "decode", "count", "encode"):
+            assert f'wc_api_stage_duration_seconds_count{{route="/api/count",stage="{stage}"}} 1' in text
+
+    def test_streamed_batch_is_recorded(self, client):
+        body = '"a"\n"b c"\n'
+        with client.post("/api/count/batch", data=body, content_type="application/x-ndjson") as resp:
+            assert len(resp.get_data(as_text=True).splitlines()) == 2
+        text = client.get("/api/metrics").get_data(as_text=True)
+        assert 'wc_api_request_body_bytes_total{route="/api/count/batch"} 10' in text
+        assert 'stage="encode"} 1' in text
+
+    def test_upload_counts_are_timed(self, client):
+        data = {"file": (io.BytesIO(b"one two\n"), "a.txt")}
+        client.post("/api/count/file", data=data, content_type="multipart/form-data")
+        text = client.get("/api/metrics").get_data(as_text=True)
+        assert 'wc_api_stage_duration_seconds_count{route="/api/count/file",stage="count"} 1' in text
+
+    def test_content_type(self, client):
+        resp = client.get("/api/metrics")
+        assert resp.content_type.startswith("text/plain; version=0.0.4")
+
+    def test_no_metrics_endpoint_by_default(self):
+        resp = create_app().test_client().get("/api/metrics")
+        assert resp.status_code == 404
+
+
 class TestErrorHandling:
     def test_wrong_method_on_count(self, client):
         resp = client.get("/api/count")
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from agent_teams.asgi import create_asgi_app
+from agent_teams.cache import CountCache
+
+
+async def call(app, method, path, chunks=(), headers=(), query=b"", delay=0):
+    """Drive one HTTP exchange through the ASGI app, sending the body in ``chunks``."""
+    chunks = list(chunks)
+    pending = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ] or [{"type": "http.request", "body": b"", "more_body": False}]
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        if pending:
+            if delay:
+                await asyncio.sleep(delay)
+            return pending.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        else:
+            response["body"] += message.get("body", b"")
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    await app(scope, receive, send)
+    return response
+
+
+def post(app, path, chunks, **kwargs):
+    return asyncio.run(call(app, "POST", path, chunks, **kwargs))
+
+
+def multipart(parts, boundary="b0undary"):
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return body, [("content-type", f"multipart/form-data; boundary={boundary}")]
+
+
+@pytest.fixture
+def app():
+    return create_asgi_app()
+
+
+class TestRoutes:
+    def test_health(self, app):
+        resp = asyncio.run(call(app, "GET", "/api/health"))
+        assert resp["status"] == 200
+        assert json.loads(resp["body"]) == {"status": "ok"}
+
+    def test_count_chunked(self, app):
+        resp = post(app, "/api/count", [b"hello wo", b"rld\nfoo ", b"bar baz\n"])
+        assert json.loads(resp["body"]) == {
+            "lines": 2, "words": 5, "chars": 24, "bytes": 24, "max_line_length": 11,
+        }
+
+    def test_count_large_chunks_offloaded(self, app):
+        chunk = "café ☕ word\n".encode("utf-8") * 1000
+        resp = post(app, "/api/count", [chunk] * 4, query=b"lines=true&bytes=true")
+        assert json.loads(resp["body"]) == {"lines": 4000, "bytes": len(chunk) * 4}
+
+    def test_empty_body(self, app):
+        resp = post(app, "/api/count", [])
+        assert resp["status"] == 400
+        assert "empty" in json.loads(resp["body"])["error"].lower()
+
+    def test_count_file(self, app):
+        body, headers = multipart([("note", None, b"x"), ("file", "test.txt", b"one two\nthree\n")])
+        resp = post(app, "/api/count/file", [body[:50], body[50:]], headers=headers, query=b"words=true")
+        assert json.loads(resp["body"]) == {"words": 3, "filename": "test.txt"}
+
+    def test_count_file_missing(self, app):
+        body, headers = multipart([("other", "a.txt", b"x")])
+        resp = post(app, "/api/count/file", [body], headers=headers)
+        assert resp["status"] == 400
+
+    def test_batch_ndjson(self, app):
+        body = b'"a b"\n{"id": "x", "text": "c"}\n\nbad\n'
+        resp = post(app, "/api/count/batch", [body[:7], body[7:]],
+                    headers=[("content-type", "application/x-ndjson")], query=b"words=true")
+        assert resp["headers"]["content-type"] == "application/x-ndjson"
+        items = [json.loads(line) for line in resp["body"].splitlines()]
+        assert items[:2] == [{"index": 0, "words": 2}, {"index": 1, "id": "x", "words": 1}]
+        assert "error" in items[2]
+
+    def test_batch_multipart(self, app):
+        body, headers = multipart([("a", "a.txt", b"one\n"), ("b", "b.txt", b"two three\n")])
+        resp = post(app, "/api/count/batch", [body], headers=headers, query=b"words=true")
+        items = [json.loads(line) for line in resp["body"].splitlines()]
+        assert items == [
+            {"index": 0, "filename": "a.txt", "words": 1},
+            {"index": 1, "filename": "b.txt", "words": 2},
+        ]
+
+    def test_cache(self):
+        cache = CountCache()
+        app = create_asgi_app(cache=cache)
+        post(app, "/api/count", [b"same body"])
+        post(app, "/api/count", [b"same body"])
+        stats = json.loads(asyncio.run(call(app, "GET", "/api/cache"))["body"])
+        assert stats["hits"] == 1
+
+
+class TestErrors:
+    def test_not_found(self, app):
+        resp = asyncio.run(call(app, "GET", "/api/nonexistent"))
+        assert resp["status"] == 404
+        assert json.loads(resp["body"]) == {"error": "Not found"}
+
+    def test_wrong_method(self, app):
+        resp = asyncio.run(call(app, "GET", "/api/count"))
+        assert resp["status"] == 405
+
+    def test_body_too_large(self):
+        app = create_asgi_app(max_body_size=10)
+        resp = post(app, "/api/count", [b"x" * 6, b"x" * 6])
+        assert resp["status"] == 413
+        resp = post(app, "/api/count/batch", [b"x" * 11],
+                    headers=[("content-length", "11"), ("content-type", "application/x-ndjson")])
+        assert resp["status"] == 413
+
+    def test_unsupported_batch_type(self, app):
+        resp = post(app, "/api/count/batch", [b"x"], headers=[("content-type", "text/plain")])
+        assert resp["status"] == 415
+
+    def test_cors(self, app):
+        resp = post(app, "/api/count", [b"test"], headers=[("origin", "http://example.com")])
+        assert resp["headers"]["access-control-allow-origin"] == "*"
+
+
+class TestSlowUploaders:
+    def test_thousands_of_concurrent_slow_uploads(self):
+        """2000 clients trickling bodies in 5 pieces, 20 ms apart, all at once."""
+        app = create_asgi_app(max_workers=4)
+        clients = 2000
+
+        async def main():
+            body = [b"slow ", b"upload ", b"of ", b"five ", b"words\n"]
+            return await asyncio.gather(*(
+                call(app, "POST", "/api/count", body, query=b"words=true", delay=0.02)
+                for _ in range(clients)
+            ))
+
+        start = time.perf_counter()
+        responses = asyncio.run(main())
+        elapsed = time.perf_counter() - start
+
+        assert all(json.loads(r["body"]) == {"words": 5} for r in responses)
+        # Served one at a time this would take clients * 5 * 20 ms = 200 s.
+        assert elapsed < 20
@@ -0,0 +1,125 @@
+import pytest
+
+from agent_teams.cache import CachedCounter, CountCache
+from agent_teams.counter import StreamCounter
+
+COUNTS = (1, 2, 12, 12, 11)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCountCache:
+    def test_hit_and_miss(self):
+        cache = CountCache()
+        assert cache.get(b"k") is None
+        cache.put(b"k", COUNTS)
+        assert cache.get(b"k") == COUNTS
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_lru_eviction_by_entries(self):
+        cache = CountCache(max_entries=2)
+        cache.put(b"a", COUNTS)
+        cache.put(b"b", COUNTS)
+        cache.get(b"a")  # b is now least recently used
+        cache.put(b"c", COUNTS)
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") == COUNTS
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_bound(self):
+        cache = CountCache(max_bytes=1)
+        cache.put(b"a", COUNTS)
+        assert cache.get(b"a") is None
+        assert cache.stats()["bytes"] == 0
+
+        cache = CountCache(max_bytes=2000)
+        for i in range(100):
+            cache.put(str(i).encode(), COUNTS)
+        stats = cache.stats()
+        assert 0 < stats["bytes"] <= 2000
+        assert stats["entries"] < 100
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = CountCache(ttl=60, clock=clock)
+        cache.put(b"k", COUNTS)
+        clock.now += 59
+        assert cache.get(b"k") == COUNTS
+        clock.now += 1
+        assert cache.get(b"k") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = tmp_path / "counts.sqlite"
+        cache = CountCache(path=path)
+        cache.put(b"k", COUNTS)
+        cache.close()
+
+        restarted = CountCache(path=path)
+        assert restarted.get(b"k") == COUNTS
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.get(b"k") == COUNTS  # promoted to memory
+        assert restarted.stats()["disk_hits"] == 1
+        restarted.close()
+
+    def test_disk_tier_ttl(self, tmp_path):
+        clock = FakeClock()
+        cache = CountCache(ttl=10, path=tmp_path / "counts.sqlite", clock=clock)
+        cache.put(b"k", COUNTS)
+        cache.close()
+
+        clock.now += 10
+        restarted = CountCache(ttl=10, path=tmp_path / "counts.sqlite", clock=clock)
+        assert restarted.get(b"k") is None
+        restarted.close()
+
+    def test_expired_in_both_tiers_counts_once(self, tmp_path):
+        clock = FakeClock()
+        cache = CountCache(ttl=10, path=tmp_path / "counts.sqlite", clock=clock)
+        cache.put(b"k", COUNTS)
+        clock.now += 10
+        assert cache.get(b"k") is None
+        assert cache.stats()["expirations"] == 1
+        cache.close()
+
+    def test_disk_tier_is_purged(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("agent_teams.cache.PURGE_EVERY", 5)
+        clock = FakeClock()
+        path = tmp_path / "counts.sqlite"
+        cache = CountCache(ttl=100, path=path, max_disk_entries=8, clock=clock)
+        for i in range(20):
+            cache.put(str(i).encode(), COUNTS)
+            clock.now += 1
+        assert cache._db.execute("SELECT COUNT(*) FROM counts").fetchone()[0] == 8
+        clock.now += 100
+        cache.close()
+
+        reopened = CountCache(ttl=100, path=path, clock=clock)
+        assert reopened._db.execute("SELECT COUNT(*) FROM counts").fetchone()[0] == 0
+        reopened.close()
+
+
+class TestCachedCounter:
+    @pytest.mark.parametrize("spool_size", [4, 1 << 20])
+    def test_counts_only_on_miss(self, spool_size):
+        cache = CountCache()
+        made = []
+
+        def make_counter():
+            made.append(1)
+            return StreamCounter()
+
+        for _ in range(3):
+            counter = CachedCounter(cache, make_counter, spool_size=spool_size)
+            counter.feed_bytes(b"hello ")
+            counter.feed_bytes(b"world\n")
+            assert counter.result() == COUNTS
+        assert len(made) == 1
+        assert cache.stats()["hits"] == 2
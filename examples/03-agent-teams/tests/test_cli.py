@@ -3,7 +3,8 @@ import os
 import pytest
 from click.testing import CliRunner
 
-from agent_teams.cli import main
+from agent_teams.cli import main, plan_counts
+from agent_teams.counter import count_bytes, count_newlines, count_stream
 
 
 @pytest.fixture
@@ -456,3 +457,50 @@ class TestNewFlagCombinations:
         pt = lines[2].split("\t")
         assert pt[0] == "12"  # total bytes
         assert pt[1] == "total"
+
+
+class TestCountingPlan:
+    def test_plan_by_flags(self):
+        assert plan_counts(False, False, False, False) is count_bytes
+        assert plan_counts(True, False, False, False) is count_newlines
+        assert plan_counts(True, True, False, False) is count_stream
+        assert plan_counts(False, False, True, False) is count_stream
+        assert plan_counts(False, False, False, True) is count_stream
+
+    def test_lines_fast_path_matches_full_count(self, runner, tmp_path):
+        f = tmp_path / "mixed.txt"
+        f.write_bytes(b"one\r\ntwo\rthree\nfour")
+        fast = runner.invoke(main, ["-l", str(f)])
+        full = runner.invoke(main, ["-l", "-w", str(f)])
+        assert fast.output.split("\t")[0] == full.output.split("\t")[0] == "3"
+
+    def test_bytes_fast_path_from_stdin(self, runner):
+        result = runner.invoke(main, ["-b"], input="café\n")
+        assert result.output.strip().split("\t") == ["6", "-"]
+
+
+class TestParallelJobs:
+    def test_output_matches_serial(self, runner, tmp_path):
+        paths = []
+        for i in range(6):
+            f = tmp_path / f"f{i}.txt"
+            f.write_text("word " * i + "\n" * i + "café 🌍\n")
+            paths.append(str(f))
+        paths.insert(3, "/no/such/file")
+
+        serial = runner.invoke(main, ["-l", "-w", "-c", "-b", "-L", *paths])
+        parallel = runner.invoke(main, ["-j", "3", "-l", "-w", "-c", "-b", "-L", *paths])
+        assert parallel.exit_code == 0
+        assert parallel.stdout == serial.stdout
+        assert parallel.stderr == serial.stderr
+        assert parallel.stdout.strip().split("\n")[-1].endswith("\ttotal")
+
+    def test_stdin_with_jobs(self, runner, sample_file):
+        result = runner.invoke(main, ["--jobs", "2", "-", str(sample_file)], input="a b\n")
+        lines = result.stdout.strip().split("\n")
+        assert lines[0] == "1\t2\t4\t-"
+        assert lines[2] == "3\t7\t28\ttotal"
+
+    def test_invalid_jobs(self, runner, sample_file):
+        result = runner.invoke(main, ["--jobs", "0", str(sample_file)])
+        assert result.exit_code != 0
@@ -0,0 +1,186 @@
+import io
+import random
+
+import pytest
+
+from agent_teams.cli import count_content
+from agent_teams.counter import (
+    StreamCounter,
+    count_bytes,
+    count_newlines,
+    count_stream,
+    count_stream_partial,
+    count_text,
+    merge_partials,
+)
+
+
+def reference_counts(content):
+    """The original whole-string implementation, kept as the oracle."""
+    lines = content.count("\n")
+    words = len(content.split())
+    chars = len(content)
+    byte_count = len(content.encode("utf-8"))
+    max_line_len = max((len(line) for line in content.splitlines()), default=0)
+    return lines, words, chars, byte_count, max_line_len
+
+
+SAMPLES = [
+    "",
+    "hello",
+    "hello world\nfoo bar baz\n",
+    "\n\n\n",
+    "   leading and trailing   ",
+    "café ☕ naïve\n",
+    "hello 🌍\n",
+    "tabs\tand\vvertical\fform\x1cfeeds\n",
+    "crlf\r\nline\r\nendings\r\n",
+    "lone\rcarriage\rreturns",
+    "unicode separators and\x85nel",
+    "no break　ideographic space",
+    "a" * 1000 + "\n" + "b" * 10,
+]
+
+
+class TestCountText:
+    @pytest.mark.parametrize("content", SAMPLES)
+    def test_matches_reference(self, content):
+        assert count_text(content) == reference_counts(content)
+
+    @pytest.mark.parametrize("content", SAMPLES)
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+    def test_chunk_boundaries(self, content, chunk_size):
+        """Words and lines spanning chunks must not be double counted."""
+        assert count_text(content, chunk_size=chunk_size) == reference_counts(content)
+
+    def test_count_content_is_wrapper(self):
+        assert count_content("hello world\n") == (1, 2, 12, 12, 11)
+
+
+class TestCountStream:
+    @pytest.mark.parametrize("content", [s for s in SAMPLES if "\r" not in s])
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+    def test_matches_reference(self, content, chunk_size):
+        data = content.encode("utf-8")
+        assert count_stream(io.BytesIO(data), chunk_size=chunk_size) == reference_counts(content)
+
+    def test_split_multibyte_sequence(self):
+        """A 4-byte emoji split across every possible boundary."""
+        data = "x🌍y\n".encode("utf-8")
+        for cut in range(len(data) + 1):
+            counter = StreamCounter()
+            counter.feed_bytes(data[:cut])
+            counter.feed_bytes(data[cut:])
+            assert counter.result() == (1, 1, 4, 7, 3)
+
+    def test_universal_newlines(self):
+        """CR and CRLF are translated like text-mode open(); bytes stay raw."""
+        data = b"one\r\ntwo\rthree\n"
+        lines, words, chars, byte_count, max_line_len = count_stream(io.BytesIO(data), chunk_size=4)
+        assert (lines, words, chars, max_line_len) == (3, 3, 14, 5)
+        assert byte_count == len(data)
+
+    def test_invalid_utf8_strict(self):
+        with pytest.raises(UnicodeDecodeError):
+            count_stream(io.BytesIO(b"\xff\xfe"))
+
+    def test_invalid_utf8_replace(self):
+        assert count_stream(io.BytesIO(b"a\xffb"), errors="replace") == (0, 1, 3, 3, 3)
+
+
+class TestMergePartials:
+    @pytest.mark.parametrize("content", [s for s in SAMPLES if "\r" not in s and s.isascii() and len(s) < 100])
+    def test_every_three_way_split(self, content):
+        data = content.encode("utf-8")
+        for a in range(len(data) + 1):
+            for b in range(a, len(data) + 1, 3):
+                parts = [
+                    count_stream_partial(io.BytesIO(piece))
+                    for piece in (data[:a], data[a:b], data[b:])
+                ]
+                assert merge_partials(parts) == reference_counts(content)
+
+
+class TestCountNewlines:
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"no newline",
+        b"a\nb\nc\n",
+        b"one\r\ntwo\rthree\n",
+        b"\r\r\n\n\r",
+        "café ☕\n".encode("utf-8"),
+    ])
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 4096])
+    def test_matches_stream_counter(self, data, chunk_size):
+        lines, _, _, size, _ = count_stream(io.BytesIO(data))
+        assert count_newlines(io.BytesIO(data), chunk_size=chunk_size) == (lines, 0, 0, size, 0)
+
+
+class TestCountBytes:
+    def test_regular_file_uses_stat(self, tmp_path):
+        f = tmp_path / "data.bin"
+        f.write_bytes(b"x" * 1000)
+        with open(f, "rb") as fh:
+            assert count_bytes(fh) == (0, 0, 0, 1000, 0)
+            fh.seek(250)
+            assert count_bytes(fh) == (0, 0, 0, 750, 0)
+
+    def test_non_file_stream_is_read(self):
+        assert count_bytes(io.BytesIO(b"abc" * 10), chunk_size=4) == (0, 0, 0, 30, 0)
+
+
+ALPHABET = (
+    ["a", "b", "Z", "9", "-", ".", "é", "ß", "🌍", "☕", "\x00"]
+    + [" ", "\t", "\n", "\r", "\v", "\f", "\x1c", "\x1d", "\x1e", "\x1f"]
+    + ["\x85", "\xa0", " ", " ", "　", "​"]
+)
+
+
+def random_text(rng):
+    size = rng.choice([0, 1, 5, 40, 300])
+    ascii_only = rng.random() < 0.5
+    alphabet = [ch for ch in ALPHABET if ch.isascii()] if ascii_only else ALPHABET
+    weights = [8 if ch.isalnum() else 1 for ch in alphabet]
+    return "".join(rng.choices(alphabet, weights, k=size))
+
+
+def random_chunks(rng, data):
+    pos = 0
+    while pos < len(data):
+        step = rng.randint(1, 64)
+        yield data[pos:pos + step]
+        pos += step
+
+
+@pytest.mark.parametrize("seed", range(300))
+class TestFusedCounterProperties:
+    """Randomised parity checks of the fused kernel against the original code."""
+
+    def test_text_parity(self, seed):
+        rng = random.Random(seed)
+        content = random_text(rng)
+        counter = StreamCounter()
+        for chunk in random_chunks(rng, content):
+            counter.feed_text(chunk)
+        assert counter.result() == reference_counts(content)
+
+    def test_bytes_parity(self, seed):
+        rng = random.Random(seed)
+        content = random_text(rng)
+        data = content.encode("utf-8")
+        counter = StreamCounter()
+        for chunk in random_chunks(rng, data):
+            counter.feed_bytes(chunk)
+        translated = content.replace("\r\n", "\n").replace("\r", "\n")
+        expected = reference_counts(translated)
+        assert counter.result() == expected[:3] + (len(data),) + expected[4:]
+
+    def test_merge_parity(self, seed):
+        rng = random.Random(seed)
+        content = random_text(rng).replace("\r", "")
+        data = content.encode("utf-8")
+        boundaries = [i for i in range(len(data) + 1) if i == len(data) or not 0x80 <= data[i] < 0xC0]
+        cuts = sorted(rng.choice(boundaries) for _ in range(3))
+        pieces = [data[a:b] for a, b in zip([0, *cuts], [*cuts, len(data)])]
+        parts = [count_stream_partial(io.BytesIO(piece)) for piece in pieces]
+        assert merge_partials(parts) == reference_counts(content)
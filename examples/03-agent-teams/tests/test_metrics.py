@@ -0,0 +1,66 @@
+import pytest
+
+from agent_teams.counter import StreamCounter
+from agent_teams.metrics import Histogram, Metrics, StageTimer, TimedCounter, TimedReader
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+        assert histogram.sum == pytest.approx(3.65)
+
+
+class TestMetrics:
+    def test_render(self):
+        metrics = Metrics(buckets=(1.0,))
+        metrics.observe_request("/api/count", "POST", 200, 0.5, 12, {"count": 0.25})
+        metrics.observe_request("/api/count", "POST", 200, 2.0, 3, {})
+        lines = metrics.render().splitlines()
+        assert 'wc_api_requests_total{route="/api/count",method="POST",status="200"} 2' in lines
+        assert 'wc_api_request_duration_seconds_bucket{route="/api/count",le="1.0"} 1' in lines
+        assert 'wc_api_request_duration_seconds_bucket{route="/api/count",le="+Inf"} 2' in lines
+        assert 'wc_api_request_duration_seconds_sum{route="/api/count"} 2.5' in lines
+        assert 'wc_api_request_body_bytes_total{route="/api/count"} 15' in lines
+        assert 'wc_api_stage_duration_seconds_count{route="/api/count",stage="count"} 1' in lines
+        assert "# TYPE wc_api_stage_duration_seconds histogram" in lines
+
+    def test_label_escaping(self):
+        metrics = Metrics()
+        metrics.observe_request('a"b\\c', "GET", 404, 0.0, 0, {})
+        assert 'route="a\\"b\\\\c"' in metrics.render()
+
+
+class TestTimedCounter:
+    @pytest.mark.parametrize("data", [b"hello world\n", "naïve café ☕\r\n".encode("utf-8") * 50, b"\xff\xfe x"])
+    def test_counts_match_stream_counter(self, data):
+        timer = StageTimer()
+        timed = TimedCounter(timer, errors="replace")
+        plain = StreamCounter(errors="replace")
+        for i in range(0, len(data), 7):
+            timed.feed_bytes(data[i:i + 7])
+            plain.feed_bytes(data[i:i + 7])
+        assert timed.result() == plain.result()
+        assert timer.stages["count"] >= 0
+
+    def test_ascii_is_not_decoded(self):
+        timer = StageTimer()
+        counter = TimedCounter(timer, universal_newlines=False)
+        counter.feed_bytes(b"plain ascii\n")
+        assert "decode" not in timer.stages
+        assert "count" in timer.stages
+
+
+class TestTimedReader:
+    def test_counts_bytes_read(self):
+        import io
+
+        timer = StageTimer()
+        reader = TimedReader(io.BytesIO(b"x" * 10), timer)
+        assert reader.read(4) == b"xxxx"
+        assert reader.read(100) == b"x" * 6
+        assert reader.read(100) == b""
+        assert timer.body_bytes == 10
+        assert "read" in timer.stages
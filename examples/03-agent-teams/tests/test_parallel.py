@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+from agent_teams import parallel
+from agent_teams.counter import count_newlines, count_stream
+from agent_teams.parallel import count_files_parallel, split_points
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    f = tmp_path / "big.txt"
+    f.write_bytes(("naïve wörds 🌍 span\r\nlines\rof text " * 400).encode("utf-8"))
+    return f
+
+
+class TestSplitPoints:
+    def test_never_splits_utf8_or_crlf(self, big_file):
+        data = big_file.read_bytes()
+        points = split_points(big_file, len(data), 37)
+        assert points[0] == 0 and points[-1] == len(data)
+        assert points == sorted(set(points))
+        for p in points[1:-1]:
+            assert not 0x80 <= data[p] < 0xC0
+            assert data[p - 1:p + 1] != b"\r\n"
+
+
+class TestSplitFiles:
+    @pytest.mark.parametrize("count", [count_stream, count_newlines])
+    def test_split_matches_whole_file(self, monkeypatch, big_file, count):
+        monkeypatch.setattr(parallel, "SPLIT_SIZE", 512)
+        expected = count(io.BytesIO(big_file.read_bytes()))
+        assert parallel._ranges_for(big_file, count, 4) is not None
+
+        [(path, counts, error)] = count_files_parallel([str(big_file)], count, 4)
+        assert error is None
+        assert counts == expected
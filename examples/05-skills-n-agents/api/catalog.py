@@ -1,9 +1,78 @@
 """Catalog API for managing books in the store."""
 
+import heapq
+import json
+from collections.abc import Iterator, MutableMapping
+from itertools import islice
+from operator import itemgetter
+from typing import IO
+
+from models.author import Author
 from models.book import Book
+from utils.author_registry import AuthorRegistry
+from utils.feeds import iter_feed
+from utils.field_index import HashIndex, SortedIndex
+from utils.prices import format_price
+from utils.serializers import book_json
+from utils.text_index import TrigramIndex
+from utils.validators import validate_isbns, validate_price
+
+# In-memory store by default; use_store() swaps in a persistent backend
+_books: MutableMapping[str, Book] = {}
+
+# Trigram index over title and author, kept in step with _books by _put_book
+_search_index = TrigramIndex()
+
+# Secondary indexes by catalog position, also maintained by _put_book;
+# the author registry also maps each ISBN to its author
+_authors = AuthorRegistry()
+_genre_index = HashIndex()
+_price_index = SortedIndex()
+
+SEARCH_RANKS = (None, "relevance")
+
+# Fields list_books, iter_books and export_ndjson can project
+BOOK_FIELDS = ("key", "title", "author", "price", "price_cents", "isbn", "genre")
+_FIELD_GETTERS = {
+    "key": lambda key, book: key,
+    "title": lambda key, book: book.title,
+    "author": lambda key, book: book.author,
+    "price": lambda key, book: format_price(book.price_cents),
+    "price_cents": lambda key, book: book.price_cents,
+    "isbn": lambda key, book: book.isbn,
+    "genre": lambda key, book: book.genre,
+}
+
+# Lines export_ndjson encodes before each write
+EXPORT_BATCH_SIZE = 1000
+
+# Feed records validated and inserted together by bulk_import
+IMPORT_BATCH_SIZE = 10_000
+
 
-# In-memory store (would be a database in production)
-_books: dict[str, Book] = {}
+def use_store(store: MutableMapping[str, Book]) -> dict:
+    """Switch the catalog to another storage backend.
+
+    Any mapping of catalog key to ``Book`` works, e.g. a plain dict or one
+    of the persistent stores in ``api.storage``. The search and secondary
+    indexes are rebuilt from the books already in ``store``.
+
+    Args:
+        store: Mapping to read and write books through from now on.
+
+    Returns:
+        Dict with the number of books loaded and a "status" key.
+    """
+    global _books
+    _books = store
+    _search_index.clear()
+    _authors.clear()
+    _genre_index.clear()
+    _price_index.clear()
+    for key, book in store.items():
+        _search_index.add(key, book.title, book.author)
+        _index_fields(_search_index.position(key), book.author, book.genre, book.price_cents, book.isbn)
+    return {"status": "loaded", "books": len(store)}
 
 
 def create_book(title: str, author: str, price_cents: int, isbn: str | None = None) -> dict:
@@ -28,10 +97,55 @@ def create_book(title: str, author: str, price_cents: int, isbn: str | None = No
 
     book = Book(title=title, author=author, price_cents=price_cents, isbn=isbn)
     key = isbn or title.lower().replace(" ", "-")
-    _books[key] = book
+    _put_book(key, book)
     return {"status": "created", "key": key, "book": _to_dict(book)}
 
 
+def bulk_import(
+    stream: IO,
+    format: str = "csv",
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_errors: int = 1000,
+) -> dict:
+    """Import books from a CSV, NDJSON or ONIX feed.
+
+    The feed is read as a stream (see ``utils.feeds``) and checked in
+    batches of ``batch_size`` records. A record needs a title, an author
+    and a non-negative integer price in cents (``validate_price``); an
+    ISBN, if present, must be a valid ISBN-13 including its check digit
+    (``validate_isbns`` checks a whole batch at once). Valid books are
+    keyed and stored as ``create_book`` would store them, with a later
+    record replacing an earlier one with the same key, but no per-book
+    response is built. Invalid records are skipped and reported.
+
+    Args:
+        stream: Open text or binary stream with the feed.
+        format: "csv", "ndjson" or "onix".
+        batch_size: Records to validate and insert at a time.
+        max_errors: Maximum number of row errors to include in the result;
+            the "failed" count always covers all of them.
+
+    Returns:
+        Dict with "status", "imported" and "failed" counts, and "errors",
+        a list of {"row": ..., "error": ...} dicts.
+
+    Raises:
+        ValueError: If the format is unknown or a CSV header lacks a
+            required column.
+    """
+    records = iter_feed(stream, format)
+    imported = failed = 0
+    errors: list[dict] = []
+    while batch := list(islice(records, batch_size)):
+        books, batch_errors = _validate_batch(batch)
+        for key, book in books:
+            _put_book(key, book)
+        imported += len(books)
+        failed += len(batch_errors)
+        errors.extend(batch_errors[:max_errors - len(errors)])
+    return {"status": "completed", "imported": imported, "failed": failed, "errors": errors}
+
+
 def get_book(key: str) -> dict:
     """Retrieve a book by its key (ISBN or title-slug).
 
@@ -50,41 +164,465 @@ def get_book(key: str) -> dict:
     return _to_dict(book)
 
 
-def list_books() -> list[dict]:
-    """List all books in the catalog.
+def list_books(
+    fields: list[str] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> list[dict]:
+    """List books in the catalog, in the order they were added.
+
+    Args:
+        fields: Names from ``BOOK_FIELDS`` to include, or None for the
+            default book dict (every field except "key").
+        limit: Maximum number of books, or None for all of them. With a
+            limit each dict also carries a "cursor".
+        cursor: The "cursor" of the last book of the previous page.
 
     Returns:
         List of dicts, each containing a book's details.
+
+    Raises:
+        ValueError: If a field is unknown, limit is negative or the cursor
+            is invalid.
     """
-    return [_to_dict(book) for book in _books.values()]
+    if limit is not None and limit < 0:
+        raise ValueError("Limit cannot be negative")
+    if limit is None:
+        return list(iter_books(fields, cursor))
+
+    project = _projection(fields)
+    page = []
+    for position, key, book in islice(_iter_catalog(_cursor_start(cursor)), limit):
+        item = project(key, book)
+        item["cursor"] = str(position)
+        page.append(item)
+    return page
 
 
-def search_books(query: str) -> list[dict]:
+def iter_books(fields: list[str] | None = None, cursor: str | None = None) -> Iterator[dict]:
+    """Iterate over the catalog one book dict at a time.
+
+    Only the requested fields are computed; e.g. "price" (the formatted
+    string) is skipped unless asked for. Books added after iteration starts
+    are not included, and the catalog may be written to meanwhile.
+
+    Args:
+        fields: Names from ``BOOK_FIELDS`` to include, or None for the
+            default book dict.
+        cursor: Start after the book this cursor came from.
+
+    Returns:
+        Iterator of book dicts in catalog order.
+
+    Raises:
+        ValueError: If a field is unknown or the cursor is invalid.
+    """
+    project = _projection(fields)
+    return (project(key, book) for _, key, book in _iter_catalog(_cursor_start(cursor)))
+
+
+def export_ndjson(stream: IO[str], fields: list[str] | None = None) -> dict:
+    """Write the catalog to ``stream`` as NDJSON, one book per line.
+
+    Books are streamed in catalog order and written in small batches, so
+    memory use does not grow with the catalog.
+
+    Args:
+        stream: Text stream to write to.
+        fields: Names from ``BOOK_FIELDS`` to include, or None for the
+            default book dict (encoded by ``utils.serializers.book_json``).
+
+    Returns:
+        Dict with the number of books written and a "status" key.
+
+    Raises:
+        ValueError: If a field is unknown.
+    """
+    if fields is None:
+        lines = (book_json(book) + "\n" for _, _, book in _iter_catalog(0))
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        lines = (dumps(book) + "\n" for book in iter_books(fields))
+    exported = 0
+    while batch := list(islice(lines, EXPORT_BATCH_SIZE)):
+        stream.writelines(batch)
+        exported += len(batch)
+    return {"status": "exported", "books": exported}
+
+
+def search_books(
+    query: str,
+    limit: int | None = None,
+    offset: int = 0,
+    cursor: str | None = None,
+    rank: str | None = None,
+) -> list[dict]:
     """Search books by title or author (case-insensitive substring match).
 
+    Queries of three or more characters are answered from the trigram
+    index; only its candidates are checked against the query. Shorter
+    queries scan the whole catalog. Results come in catalog order, or with
+    ``rank="relevance"`` by score: title matches outrank author matches,
+    and matching the whole field, its start or the start of a word in it
+    outranks matching elsewhere. Ties keep catalog order.
+
+    With a ``limit``, only the page is materialized: catalog-order results
+    stop scanning once the page is full, and ranked results are picked with
+    a heap of ``offset + limit`` entries. Each result then carries a
+    ``"cursor"``; passing the last one back returns the results after it,
+    and stays valid while books are added.
+
     Args:
         query: Search string to match against title and author.
+        limit: Maximum number of results, or None for all of them.
+        offset: Number of results to skip (after ``cursor``, if given).
+        cursor: The ``"cursor"`` of the last result of the previous page.
+        rank: None for catalog order, or "relevance".
 
     Returns:
         List of matching book dicts.
+
+    Raises:
+        ValueError: If limit or offset is negative, rank is unknown, or
+            cursor was not produced by a search with the same rank.
     """
     # NOTE: Uses string formatting — a pattern the security-review skill
     # is designed to flag in more dangerous contexts (e.g., SQL queries).
+    if limit is not None and limit < 0:
+        raise ValueError("Limit cannot be negative")
+    if offset < 0:
+        raise ValueError("Offset cannot be negative")
+    if rank not in SEARCH_RANKS:
+        raise ValueError(f"Unknown rank: {rank}")
+
     query_lower = query.lower()
+    hits = _iter_hits(query_lower, rank)
+    if cursor is not None:
+        after = _parse_cursor(cursor, 1 if rank is None else 2)
+        hits = (hit for hit in hits if hit[0] > after)
+
+    if limit is None:
+        page = list(hits) if rank is None else sorted(hits, key=itemgetter(0))
+        page = page[offset:]
+    elif rank is None:
+        page = list(islice(hits, offset, offset + limit))
+    else:
+        page = heapq.nsmallest(offset + limit, hits, key=itemgetter(0))[offset:]
+
     results = []
-    for book in _books.values():
-        if query_lower in book.title.lower() or query_lower in book.author.lower():
-            results.append(_to_dict(book))
+    for sort_key, book in page:
+        result = _to_dict(book)
+        if rank is not None:
+            result["score"] = -sort_key[0]
+        if limit is not None:
+            result["cursor"] = ":".join(map(str, sort_key))
+        results.append(result)
     return results
 
 
+def books_by_author(author: str, limit: int | None = None, cursor: str | None = None) -> list[dict]:
+    """List an author's books in catalog order, from the author index.
+
+    Args:
+        author: Author name, matched exactly.
+        limit: Maximum number of books, or None for all of them. With a
+            limit each dict also carries a "cursor".
+        cursor: The "cursor" of the last book of the previous page.
+
+    Returns:
+        List of book dicts.
+
+    Raises:
+        ValueError: If limit is negative or the cursor is invalid.
+    """
+    return _lookup_page(_authors, author, limit, cursor)
+
+
+def get_author(name: str) -> dict:
+    """Retrieve an author and the catalog keys of their books.
+
+    Args:
+        name: Author name, matched exactly.
+
+    Returns:
+        Dict with the author's id, name, bio, the ISBNs of their books
+        and the catalog keys of all their books, in catalog order.
+
+    Raises:
+        ValueError: If no book in the catalog is by this author.
+    """
+    keys = [_search_index.key(position) for position in _authors.lookup(name)]
+    if not keys:
+        raise ValueError(f"Author not found: {name}")
+    isbns = [book.isbn for key in keys if (book := _books.get(key)) is not None and book.isbn]
+    return _author_dict(_authors.id_of(name), Author(name, book_isbns=isbns), keys)
+
+
+def get_author_by_isbn(isbn: str) -> dict:
+    """Retrieve the author of the book with an ISBN, from the ISBN index.
+
+    Args:
+        isbn: ISBN-13 of a book in the catalog.
+
+    Returns:
+        Dict with the author's details, as ``get_author`` returns them.
+
+    Raises:
+        ValueError: If no book in the catalog has this ISBN.
+    """
+    name = _authors.author_of(isbn)
+    if name is None:
+        raise ValueError(f"ISBN not found: {isbn}")
+    return get_author(name)
+
+
+def books_by_genre(genre: str, limit: int | None = None, cursor: str | None = None) -> list[dict]:
+    """List the books with a genre code (e.g. "FIC000000") in catalog order.
+
+    Args:
+        genre: BISAC genre code, matched exactly.
+        limit: Maximum number of books, or None for all of them. With a
+            limit each dict also carries a "cursor".
+        cursor: The "cursor" of the last book of the previous page.
+
+    Returns:
+        List of book dicts.
+
+    Raises:
+        ValueError: If limit is negative or the cursor is invalid.
+    """
+    return _lookup_page(_genre_index, genre, limit, cursor)
+
+
+def books_in_price_range(
+    min_cents: int = 0,
+    max_cents: int | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> list[dict]:
+    """List books priced from ``min_cents`` to ``max_cents``, inclusive.
+
+    Books come cheapest first, ties in catalog order, straight from the
+    price index: only the books returned are read from the store.
+
+    Args:
+        min_cents: Lowest price in cents.
+        max_cents: Highest price in cents, or None for no upper bound.
+        limit: Maximum number of books, or None for all of them. With a
+            limit each dict also carries a "cursor".
+        cursor: The "cursor" of the last book of the previous page.
+
+    Returns:
+        List of book dicts.
+
+    Raises:
+        ValueError: If limit is negative or the cursor is invalid.
+    """
+    if limit is not None and limit < 0:
+        raise ValueError("Limit cannot be negative")
+    low = (min_cents, -1)
+    if cursor is not None:
+        low = max(low, _parse_cursor(cursor, 2))
+    return _index_page(_price_index.range(low, max_cents), limit)
+
+
+def _lookup_page(index: HashIndex | AuthorRegistry, value: str, limit: int | None, cursor: str | None) -> list[dict]:
+    """Return a page of the books ``index`` lists under ``value``."""
+    if limit is not None and limit < 0:
+        raise ValueError("Limit cannot be negative")
+    after = -1 if cursor is None else _parse_cursor(cursor, 1)[0]
+    return _index_page(((position,) for position in index.lookup(value, after)), limit)
+
+
+def _index_page(sort_keys: Iterator[tuple], limit: int | None) -> list[dict]:
+    """Build book dicts for index entries; each sort key ends with a catalog position."""
+    books = (
+        (sort_key, book)
+        for sort_key in sort_keys
+        if (book := _books.get(_search_index.key(sort_key[-1]))) is not None
+    )
+    page = []
+    for sort_key, book in islice(books, limit):
+        result = _to_dict(book)
+        if limit is not None:
+            result["cursor"] = ":".join(map(str, sort_key))
+        page.append(result)
+    return page
+
+
+def _put_book(key: str, book: Book) -> None:
+    """Store ``book`` under ``key`` and bring every index up to date."""
+    old = _books.get(key)
+    # Read the old values before the write: a store may return a live view.
+    old_fields = None if old is None else (old.author, old.genre, old.price_cents, old.isbn)
+    old_text = () if old is None else (old.title, old.author)
+    _books[key] = book
+    if (book.title, book.author) != old_text:
+        _search_index.add(key, book.title, book.author, previous=old_text)
+    fields = (book.author, book.genre, book.price_cents, book.isbn)
+    if fields != old_fields:
+        position = _search_index.position(key)
+        if old_fields is not None:
+            _unindex_fields(position, *old_fields)
+        _index_fields(position, *fields)
+
+
+def _index_fields(position: int, author: str, genre: str | None, price_cents: int, isbn: str | None) -> None:
+    _authors.add(position, author, isbn)
+    _genre_index.add(genre, position)
+    _price_index.add(price_cents, position)
+
+
+def _unindex_fields(position: int, author: str, genre: str | None, price_cents: int, isbn: str | None) -> None:
+    _authors.remove(position, author, isbn)
+    _genre_index.remove(genre, position)
+    _price_index.remove(price_cents, position)
+
+
+def _iter_hits(query_lower: str, rank: str | None):
+    """Yield ``(sort_key, book)`` for every match; in catalog order when unranked."""
+    candidates = _search_index.candidates(query_lower)
+    if candidates is None or (rank is None and len(candidates) * 8 > len(_books)):
+        # Walking the catalog in order is cheaper than sorting this many
+        # candidates, and stops as soon as a limited page is full.
+        keys = _books
+    elif rank is None:
+        keys = sorted(candidates, key=_search_index.position)
+    else:
+        keys = candidates
+
+    for key in keys:
+        book = _books.get(key)
+        if book is None:
+            continue
+        title = book.title.lower()
+        author = book.author.lower()
+        if query_lower not in title and query_lower not in author:
+            continue
+        position = _search_index.position(key)
+        if rank is None:
+            yield (position,), book
+        else:
+            score = 2 * _match_score(title, query_lower) + _match_score(author, query_lower)
+            yield (-score, position), book
+
+
+def _match_score(text: str, query: str) -> int:
+    """Score how prominently ``query`` occurs in ``text`` (0 when it does not)."""
+    if text == query:
+        return 4
+    if text.startswith(query):
+        return 3
+    if " " + query in text:
+        return 2
+    if query in text:
+        return 1
+    return 0
+
+
+def _parse_cursor(cursor: str, parts: int) -> tuple[int, ...]:
+    """Decode a result cursor into the sort key of ``parts`` ints it stands for."""
+    try:
+        key = tuple(int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+    if len(key) != parts:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return key
+
+
+def _iter_catalog(start: int) -> Iterator[tuple[int, str, Book]]:
+    """Yield ``(position, key, book)`` in catalog order from ``start`` on."""
+    for position, key in _search_index.keys(start):
+        book = _books.get(key)
+        if book is not None:
+            yield position, key, book
+
+
+def _cursor_start(cursor: str | None) -> int:
+    """Return the catalog position a listing cursor resumes from."""
+    if cursor is None:
+        return 0
+    return _parse_cursor(cursor, 1)[0] + 1
+
+
+def _projection(fields: list[str] | None):
+    """Return a ``(key, book) -> dict`` function computing only ``fields``."""
+    if fields is None:
+        return lambda key, book: _to_dict(book)
+    unknown = [name for name in fields if name not in _FIELD_GETTERS]
+    if unknown:
+        raise ValueError(f"Unknown field: {unknown[0]}")
+    getters = [(name, _FIELD_GETTERS[name]) for name in fields]
+    return lambda key, book: {name: get(key, book) for name, get in getters}
+
+
+def _validate_batch(batch: list[tuple]) -> tuple[list[tuple[str, Book]], list[dict]]:
+    """Split raw feed records into ``(key, Book)`` pairs and row errors."""
+    errors = []
+    records = []
+    for record in batch:
+        if len(record) == 2:
+            errors.append({"row": record[0], "error": record[1]})
+        else:
+            records.append(record)
+
+    prices = [_price_cents(record[3]) for record in records]
+    price_ok = list(map(validate_price, prices))
+    isbn_ok = [True] * len(records)
+    given = [i for i, record in enumerate(records) if record[4] is not None]
+    for i, valid in zip(given, validate_isbns([records[i][4] for i in given])[0]):
+        isbn_ok[i] = valid
+
+    books = []
+    for (row, title, author, raw_price, isbn, genre), price, valid_price, valid_isbn in zip(
+        records, prices, price_ok, isbn_ok
+    ):
+        if not title or not isinstance(title, str):
+            errors.append({"row": row, "error": "Title cannot be empty"})
+        elif not author or not isinstance(author, str):
+            errors.append({"row": row, "error": "Author cannot be empty"})
+        elif not valid_price:
+            errors.append({"row": row, "error": f"Invalid price: {raw_price!r}"})
+        elif not valid_isbn:
+            errors.append({"row": row, "error": f"Invalid ISBN: {isbn!r}"})
+        else:
+            key = isbn or title.lower().replace(" ", "-")
+            books.append((key, Book(title, author, price, isbn, genre if isinstance(genre, str) else None)))
+    errors.sort(key=itemgetter("row"))
+    return books, errors
+
+
+def _price_cents(raw) -> int | None:
+    """Return a feed price as integer cents, or None if it is not one."""
+    if isinstance(raw, int) and not isinstance(raw, bool):
+        return raw
+    if isinstance(raw, str):
+        try:
+            return int(raw)
+        except ValueError:
+            return None
+    return None
+
+
 def _to_dict(book: Book) -> dict:
     """Convert a Book dataclass to a plain dict."""
     return {
         "title": book.title,
         "author": book.author,
-        "price": book.price_display(),
+        "price": format_price(book.price_cents),
         "price_cents": book.price_cents,
         "isbn": book.isbn,
         "genre": book.genre,
     }
+
+
+def _author_dict(author_id: int, author: Author, keys: list[str]) -> dict:
+    """Convert an Author dataclass to a plain dict with its id and catalog keys."""
+    return {
+        "id": author_id,
+        "name": author.name,
+        "bio": author.bio,
+        "book_isbns": author.book_isbns,
+        "keys": keys,
+    }
@@ -0,0 +1,346 @@
+"""Columnar, array-backed catalog store for large catalogs.
+
+``ColumnarStore`` is a ``MutableMapping[str, Book]`` like the backends in
+``api.storage``, so the catalog can switch to it with
+``api.catalog.use_store``. It keeps no per-book Python objects. Instead
+each field lives in its own compact column:
+
+- title: UTF-8 bytes in one shared buffer, addressed by offset and length.
+- author: an index into a table of interned author names.
+- price_cents: an int64 array.
+- isbn: a 13-digit ISBN packed into a uint64 (0 for no ISBN). The rare ISBN
+  that is not 13 plain digits is kept as a string on the side.
+- genre: an index into a dictionary of genre codes (0 for no genre).
+- key: nothing when the key is the packed ISBN, else UTF-8 bytes in a
+  shared buffer. Keys are found through an open-addressing hash table of
+  row numbers.
+
+Reads return ``BookRow`` views, which decode fields on access.
+"""
+
+from array import array
+from collections.abc import Iterator, MutableMapping
+
+from models.book import Book
+
+
+class BookRow:
+    """Read-only view of one row of a ``ColumnarStore``.
+
+    Has the same attributes and ``price_display`` as ``Book``, and compares
+    equal to a ``Book`` with the same field values.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "ColumnarStore", row: int) -> None:
+        self._store = store
+        self._row = row
+
+    @property
+    def title(self) -> str:
+        return self._store._title(self._row)
+
+    @property
+    def author(self) -> str:
+        store = self._store
+        return store._authors[store._author_ids[self._row]]
+
+    @property
+    def price_cents(self) -> int:
+        return self._store._prices[self._row]
+
+    @property
+    def isbn(self) -> str | None:
+        return self._store._isbn(self._row)
+
+    @property
+    def genre(self) -> str | None:
+        store = self._store
+        return store._genres[store._genre_ids[self._row]]
+
+    price_display = Book.price_display
+
+    def to_book(self) -> Book:
+        """Return a standalone ``Book`` with this row's values."""
+        return Book(self.title, self.author, self.price_cents, self.isbn, self.genre)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Book, BookRow)):
+            return (self.title, self.author, self.price_cents, self.isbn, self.genre) == (
+                other.title, other.author, other.price_cents, other.isbn, other.genre,
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BookRow({self.to_book()!r})"
+
+
+class ColumnarStore(MutableMapping[str, Book]):
+    """In-memory catalog that stores books column by column.
+
+    Keys live in the columns too. A key that equals the book's packed ISBN
+    (the usual catalog key) costs nothing extra; any other key is stored as
+    UTF-8 bytes like titles. Lookups go through an open-addressing hash
+    table of row numbers instead of a dict, so no per-key object is kept.
+
+    Replacing a book rewrites its row in place, so the key keeps its
+    position. A new title is written over the old one when it fits, and
+    otherwise appended, leaving the old bytes stale. Deleting a book leaves
+    a tombstone in the hash table and a dead row in the columns. Tombstones
+    count toward the table's load factor, and once live keys plus
+    tombstones fill half the table, or stale bytes make up half of the
+    title and key buffers, the store is rebuilt: dead rows and stale bytes
+    are dropped from every column and the table is re-hashed without
+    tombstones. Rows keep their order, but a rebuild renumbers them, so
+    ``BookRow`` views taken before a write may no longer point at the same
+    book.
+    """
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._tombstones = 0
+        # Title and key bytes no live row points at
+        self._stale_bytes = 0
+        self._table = array("q", [_EMPTY]) * 8
+        self._live = bytearray()
+        self._key_data = bytearray()
+        self._key_starts = array("Q")
+        self._key_lengths = array("I")
+        self._title_data = bytearray()
+        self._title_starts = array("Q")
+        self._title_lengths = array("I")
+        self._author_ids = array("I")
+        self._authors: list[str] = []
+        self._author_lookup: dict[str, int] = {}
+        self._prices = array("q")
+        self._isbns = array("Q")
+        self._odd_isbns: dict[int, str] = {}
+        self._genre_ids = array("H")
+        self._genres: list[str | None] = [None]
+        self._genre_lookup: dict[str | None, int] = {None: 0}
+
+    def __getitem__(self, key: str) -> BookRow:
+        row = self._find(key)[1]
+        if row < 0:
+            raise KeyError(key)
+        return BookRow(self, row)
+
+    def get(self, key: str, default: Book | None = None) -> BookRow | Book | None:
+        row = self._find(key)[1]
+        return default if row < 0 else BookRow(self, row)
+
+    def __setitem__(self, key: str, book: Book) -> None:
+        title = book.title.encode("utf-8")
+        author_id = self._intern_author(book.author)
+        genre_id = self._intern_genre(book.genre)
+        packed_isbn = _pack_isbn(book.isbn)
+
+        slot, row = self._find(key)
+        if row < 0:
+            # The price is the only column a bad value can reject, so append
+            # it first to leave the columns aligned if it fails.
+            row = len(self._prices)
+            self._prices.append(book.price_cents)
+            self._isbns.append(packed_isbn)
+            self._store_key(key, packed_isbn)
+            self._title_starts.append(len(self._title_data))
+            self._title_lengths.append(len(title))
+            self._author_ids.append(author_id)
+            self._genre_ids.append(genre_id)
+            self._live.append(1)
+            if self._table[slot] == _DELETED:
+                self._tombstones -= 1
+            self._table[slot] = row
+            self._count += 1
+            self._title_data += title
+        else:
+            self._prices[row] = book.price_cents
+            self._replace_title(row, title)
+            self._author_ids[row] = author_id
+            self._genre_ids[row] = genre_id
+            self._odd_isbns.pop(row, None)
+            if packed_isbn != self._isbns[row] and self._key_lengths[row] == _ISBN_KEY:
+                # The key was stored as the old ISBN; keep it as bytes instead.
+                self._key_lengths[row] = 0
+                self._set_key_bytes(row, key)
+            self._isbns[row] = packed_isbn
+        if packed_isbn == 0 and book.isbn is not None:
+            self._odd_isbns[row] = book.isbn
+        if (self._count + self._tombstones) * 2 > len(self._table) or self._mostly_stale():
+            self._rebuild()
+
+    def __delitem__(self, key: str) -> None:
+        slot, row = self._find(key)
+        if row < 0:
+            raise KeyError(key)
+        self._table[slot] = _DELETED
+        self._live[row] = 0
+        self._odd_isbns.pop(row, None)
+        self._stale_bytes += self._title_lengths[row]
+        if self._key_lengths[row] != _ISBN_KEY:
+            self._stale_bytes += self._key_lengths[row]
+        self._count -= 1
+        self._tombstones += 1
+
+    def __iter__(self) -> Iterator[str]:
+        live = self._live
+        for row in range(len(live)):
+            if live[row]:
+                yield self._key(row)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key)[1] >= 0
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _find(self, key: str) -> tuple[int, int]:
+        """Return ``(slot, row)`` for ``key``; row is -1 and slot is where to insert if absent."""
+        table = self._table
+        mask = len(table) - 1
+        slot = hash(key) & mask
+        free = -1
+        while True:
+            row = table[slot]
+            if row == _EMPTY:
+                return (slot if free < 0 else free), -1
+            if row == _DELETED:
+                if free < 0:
+                    free = slot
+            elif self._key(row) == key:
+                return slot, row
+            slot = (slot + 1) & mask
+
+    def _rebuild(self) -> None:
+        """Drop dead rows and stale bytes, and re-hash every live key into a tombstone-free table."""
+        if len(self._live) > self._count or self._stale_bytes:
+            self._compact_rows()
+        size = 8
+        while size < self._count * 3:
+            size *= 2
+        table = array("q", [_EMPTY]) * size
+        mask = size - 1
+        for row in range(self._count):
+            slot = hash(self._key(row)) & mask
+            while table[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            table[slot] = row
+        self._table = table
+        self._tombstones = 0
+
+    def _compact_rows(self) -> None:
+        """Rewrite every column with only the live rows, in their current order."""
+        live = self._live
+        rows = [row for row in range(len(live)) if live[row]]
+        keys = [None if self._key_lengths[row] == _ISBN_KEY else self._key(row) for row in rows]
+        titles = [self._title(row).encode("utf-8") for row in rows]
+        self._odd_isbns = {
+            new: self._odd_isbns[old] for new, old in enumerate(rows) if old in self._odd_isbns
+        }
+        for name in ("_author_ids", "_prices", "_isbns", "_genre_ids"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[row] for row in rows]))
+        self._live = bytearray(b"\x01") * len(rows)
+        self._stale_bytes = 0
+
+        self._title_data = bytearray()
+        self._title_starts = array("Q")
+        self._title_lengths = array("I")
+        for title in titles:
+            self._title_starts.append(len(self._title_data))
+            self._title_lengths.append(len(title))
+            self._title_data += title
+
+        self._key_data = bytearray()
+        self._key_starts = array("Q", [0]) * len(rows)
+        self._key_lengths = array("I", [_ISBN_KEY]) * len(rows)
+        for row, key in enumerate(keys):
+            if key is not None:
+                self._set_key_bytes(row, key)
+
+    def _replace_title(self, row: int, title: bytes) -> None:
+        """Point ``row`` at ``title``, reusing its old span when the new title fits."""
+        start, length = self._title_starts[row], self._title_lengths[row]
+        if len(title) <= length:
+            if self._title_data[start:start + len(title)] != title:
+                self._title_data[start:start + len(title)] = title
+        else:
+            start = self._title_starts[row] = len(self._title_data)
+            self._title_data += title
+        self._title_lengths[row] = len(title)
+        self._stale_bytes += length - len(title) if len(title) <= length else length
+
+    def _mostly_stale(self) -> bool:
+        """True once stale bytes are half of the title and key buffers (and worth a rebuild)."""
+        stale = self._stale_bytes
+        return stale > 4096 and stale * 2 > len(self._title_data) + len(self._key_data)
+
+    def _store_key(self, key: str, packed_isbn: int) -> None:
+        if packed_isbn and key == str(packed_isbn):
+            self._key_starts.append(0)
+            self._key_lengths.append(_ISBN_KEY)
+        else:
+            self._key_starts.append(0)
+            self._key_lengths.append(0)
+            self._set_key_bytes(len(self._key_lengths) - 1, key)
+
+    def _set_key_bytes(self, row: int, key: str) -> None:
+        data = key.encode("utf-8")
+        self._key_starts[row] = len(self._key_data)
+        self._key_lengths[row] = len(data)
+        self._key_data += data
+
+    def _key(self, row: int) -> str:
+        length = self._key_lengths[row]
+        if length == _ISBN_KEY:
+            return str(self._isbns[row])
+        start = self._key_starts[row]
+        return self._key_data[start:start + length].decode("utf-8")
+
+    def _title(self, row: int) -> str:
+        start = self._title_starts[row]
+        return self._title_data[start:start + self._title_lengths[row]].decode("utf-8")
+
+    def _isbn(self, row: int) -> str | None:
+        packed = self._isbns[row]
+        if packed:
+            return str(packed)
+        return self._odd_isbns.get(row)
+
+    def _intern_author(self, author: str) -> int:
+        author_id = self._author_lookup.get(author)
+        if author_id is None:
+            author_id = self._author_lookup[author] = len(self._authors)
+            self._authors.append(author)
+        return author_id
+
+    def _intern_genre(self, genre: str | None) -> int:
+        genre_id = self._genre_lookup.get(genre)
+        if genre_id is None:
+            # Checked before any column is touched, so a rejected insert
+            # leaves the columns aligned.
+            if len(self._genres) > _MAX_GENRE_ID:
+                raise ValueError(f"Too many distinct genres (at most {_MAX_GENRE_ID})")
+            genre_id = self._genre_lookup[genre] = len(self._genres)
+            self._genres.append(genre)
+        return genre_id
+
+
+# Hash table markers, and the key length that means "the key is the ISBN"
+_EMPTY = -1
+_DELETED = -2
+_ISBN_KEY = 0xFFFFFFFF
+
+# Largest id the uint16 genre column holds
+_MAX_GENRE_ID = 0xFFFF
+
+
+def _pack_isbn(isbn: str | None) -> int:
+    """Pack a 13-digit ISBN into an int, or return 0 if it cannot round-trip."""
+    if isbn is not None and len(isbn) == 13 and isbn.isdigit() and isbn.isascii() and isbn[0] != "0":
+        return int(isbn)
+    return 0
@@ -1,8 +1,91 @@
-"""Inventory API for tracking book stock levels."""
+"""Inventory API for tracking book stock levels.
+
+Writes are safe to make from many threads at once. Each book key maps to
+one of ``LOCK_STRIPES`` locks, and every read-modify-write of a key's
+stock happens under its lock, so concurrent decrements cannot oversell.
+Writes to keys on different stripes do not wait for each other.
+
+Checkout can hold copies with ``reserve_stock`` and later
+``confirm_reservation`` or ``release_reservation``. Held copies count
+against availability until then. Holds that are neither confirmed nor
+released expire after their TTL. Expiry times sit in a min-heap, so each
+expiration costs O(log n). Due holds are released whenever the inventory
+is read or reserved from, or by calling ``expire_reservations``.
+
+``use_event_log`` makes stock durable. Every change is logged to an
+``api.inventory_log.EventLog`` before it is applied. Reservations are not
+logged: only confirmed sales change stock.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Iterable
+
+from api.inventory_log import EventLog
 
 # In-memory stock store: key → quantity
 _stock: dict[str, int] = {}
 
+# Copies held by open reservations: key → quantity
+_reserved: dict[str, int] = {}
+
+# Open reservations: id → (key, quantity, expires_at)
+_reservations: dict[str, tuple[str, int, float]] = {}
+
+# (expires_at, id) for every reservation made; entries for reservations
+# already confirmed or released are skipped when they come due
+_expiry_heap: list[tuple[float, str]] = []
+_expiry_lock = threading.Lock()
+_reservation_ids = itertools.count(1)
+
+# Seconds a reservation is held by default
+RESERVATION_TTL = 900.0
+
+# Monotonic clock for expiry times (replaceable in tests)
+_clock = time.monotonic
+
+# Durable record of stock changes, if any; set by use_event_log()
+_event_log: EventLog | None = None
+
+# Number of locks the keys are spread over
+LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def _lock_for(book_key: str) -> threading.Lock:
+    return _locks[hash(book_key) % LOCK_STRIPES]
+
+
+def use_event_log(log: EventLog | None) -> dict:
+    """Log every stock change to ``log``, starting from the stock it holds.
+
+    The stock levels are replaced by the ones ``log`` replayed, so this is
+    also how stock is recovered after a restart. Open reservations are
+    dropped. Pass None to stop logging.
+
+    Args:
+        log: Event log to restore from and append to, or None.
+
+    Returns:
+        Dict with the number of books loaded and a "status" key.
+    """
+    global _event_log
+    for lock in _locks:
+        lock.acquire()
+    try:
+        _reservations.clear()
+        _reserved.clear()
+        if log is not None:
+            _stock.clear()
+            _stock.update(log.stock())
+        _event_log = log
+    finally:
+        for lock in _locks:
+            lock.release()
+    return {"status": "loaded", "books": len(_stock)}
+
 
 def track_stock(book_key: str, quantity: int) -> dict:
     """Set the stock level for a book.
@@ -15,11 +98,18 @@ def track_stock(book_key: str, quantity: int) -> dict:
         Dict with the updated stock info.
 
     Raises:
-        ValueError: If quantity is negative.
+        ValueError: If quantity is negative or below the copies held by
+            reservations.
     """
     if quantity < 0:
         raise ValueError("Quantity cannot be negative")
-    _stock[book_key] = quantity
+    with _lock_for(book_key):
+        reserved = _reserved.get(book_key, 0)
+        if quantity < reserved:
+            raise ValueError(f"Quantity cannot be below the {reserved} reserved copies")
+        if _event_log is not None:
+            _event_log.record_set(book_key, quantity)
+        _stock[book_key] = quantity
     return {"book_key": book_key, "quantity": quantity, "status": "updated"}
 
 
@@ -30,13 +120,17 @@ def check_availability(book_key: str) -> dict:
         book_key: The book's catalog key.
 
     Returns:
-        Dict with availability status and quantity.
+        Dict with the quantity in stock, the quantity held by reservations,
+        and whether any unreserved copy is available.
     """
+    expire_reservations()
     quantity = _stock.get(book_key, 0)
+    reserved = _reserved.get(book_key, 0)
     return {
         "book_key": book_key,
         "quantity": quantity,
-        "available": quantity > 0,
+        "reserved": reserved,
+        "available": quantity > reserved,
     }
 
 
@@ -51,13 +145,234 @@ def adjust_stock(book_key: str, delta: int) -> dict:
         Dict with the new stock level.
 
     Raises:
-        ValueError: If the adjustment would make stock negative.
-    """
-    current = _stock.get(book_key, 0)
-    new_quantity = current + delta
-    if new_quantity < 0:
-        raise ValueError(
-            f"Cannot remove {abs(delta)} copies; only {current} in stock"
-        )
-    _stock[book_key] = new_quantity
+        ValueError: If the adjustment would make stock negative, or take
+            copies held by reservations.
+    """
+    with _lock_for(book_key):
+        current = _stock.get(book_key, 0)
+        new_quantity = current + delta
+        if delta < 0 and new_quantity < _reserved.get(book_key, 0):
+            raise ValueError(
+                f"Cannot remove {abs(delta)} copies; only {current} in stock"
+                + _held_note(book_key)
+            )
+        if _event_log is not None:
+            _event_log.record_adjust(book_key, delta)
+        _stock[book_key] = new_quantity
     return {"book_key": book_key, "quantity": new_quantity, "status": "adjusted"}
+
+
+def adjust_stock_batch(adjustments: Iterable[tuple[str, int]]) -> dict:
+    """Apply several stock adjustments atomically (all or nothing).
+
+    Deltas for the same key are added together. The locks of every key
+    involved are taken (in a fixed order, so concurrent batches cannot
+    deadlock), all new levels are checked, and only then written. Other
+    threads never see part of a batch applied.
+
+    Args:
+        adjustments: ``(book_key, delta)`` pairs, e.g. one per order line.
+
+    Returns:
+        Dict with the new stock level of each key under "items" and a
+        "status" key.
+
+    Raises:
+        ValueError: If any adjustment would make stock negative or take
+            reserved copies; no stock is changed.
+    """
+    deltas: dict[str, int] = {}
+    for book_key, delta in adjustments:
+        deltas[book_key] = deltas.get(book_key, 0) + delta
+
+    stripes = sorted({hash(book_key) % LOCK_STRIPES for book_key in deltas})
+    for stripe in stripes:
+        _locks[stripe].acquire()
+    try:
+        new_quantities = {}
+        for book_key, delta in deltas.items():
+            current = _stock.get(book_key, 0)
+            if delta < 0 and current + delta < _reserved.get(book_key, 0):
+                raise ValueError(
+                    f"Cannot remove {abs(delta)} copies of {book_key}; only {current} in stock"
+                    + _held_note(book_key)
+                )
+            new_quantities[book_key] = current + delta
+        if _event_log is not None:
+            _event_log.record_batch(deltas)
+        _stock.update(new_quantities)
+    finally:
+        for stripe in stripes:
+            _locks[stripe].release()
+
+    items = [{"book_key": key, "quantity": quantity} for key, quantity in new_quantities.items()]
+    return {"items": items, "status": "adjusted"}
+
+
+def reserve_stock(book_key: str, quantity: int, ttl: float = RESERVATION_TTL) -> dict:
+    """Hold copies of a book for a checkout.
+
+    Held copies stay in stock but are no longer available to other
+    reservations or to ``adjust_stock``. The hold lasts until it is
+    confirmed, released, or ``ttl`` seconds pass.
+
+    Args:
+        book_key: The book's catalog key.
+        quantity: Number of copies to hold.
+        ttl: Seconds until the hold expires.
+
+    Returns:
+        Dict with the "reservation_id" to confirm or release it with.
+
+    Raises:
+        ValueError: If quantity or ttl is not positive, or fewer than
+            ``quantity`` unreserved copies are in stock.
+    """
+    if quantity <= 0:
+        raise ValueError("Quantity must be positive")
+    if ttl <= 0:
+        raise ValueError("TTL must be positive")
+    expire_reservations()
+
+    reservation_id = f"res-{next(_reservation_ids)}"
+    expires_at = _clock() + ttl
+    with _lock_for(book_key):
+        in_stock = _stock.get(book_key, 0)
+        reserved = _reserved.get(book_key, 0)
+        if in_stock - reserved < quantity:
+            raise ValueError(
+                f"Cannot reserve {quantity} copies; only {in_stock - reserved} available"
+            )
+        _reserved[book_key] = reserved + quantity
+        _reservations[reservation_id] = (book_key, quantity, expires_at)
+    with _expiry_lock:
+        heapq.heappush(_expiry_heap, (expires_at, reservation_id))
+    return {
+        "reservation_id": reservation_id,
+        "book_key": book_key,
+        "quantity": quantity,
+        "ttl": ttl,
+        "status": "reserved",
+    }
+
+
+def confirm_reservation(reservation_id: str) -> dict:
+    """Turn a hold into a sale, removing its copies from stock.
+
+    Args:
+        reservation_id: Id returned by ``reserve_stock``.
+
+    Returns:
+        Dict with the book's new stock level.
+
+    Raises:
+        ValueError: If the reservation is unknown, already confirmed or
+            released, or has expired.
+    """
+    book_key = _reservation_key(reservation_id)
+    with _lock_for(book_key):
+        quantity = _close_reservation(reservation_id)
+        if _event_log is not None:
+            _event_log.record_adjust(book_key, -quantity)
+        new_quantity = _stock.get(book_key, 0) - quantity
+        _stock[book_key] = new_quantity
+    return {
+        "reservation_id": reservation_id,
+        "book_key": book_key,
+        "quantity": new_quantity,
+        "status": "confirmed",
+    }
+
+
+def release_reservation(reservation_id: str) -> dict:
+    """Give a hold's copies back without selling them.
+
+    Args:
+        reservation_id: Id returned by ``reserve_stock``.
+
+    Returns:
+        Dict with the book key and the quantity released.
+
+    Raises:
+        ValueError: If the reservation is unknown, already confirmed or
+            released, or has expired.
+    """
+    book_key = _reservation_key(reservation_id)
+    with _lock_for(book_key):
+        quantity = _close_reservation(reservation_id)
+    return {
+        "reservation_id": reservation_id,
+        "book_key": book_key,
+        "quantity": quantity,
+        "status": "released",
+    }
+
+
+def expire_reservations() -> int:
+    """Release every hold whose TTL has passed.
+
+    Returns:
+        Number of reservations expired.
+    """
+    now = _clock()
+    # Unlocked peek for the common nothing-due case: one indexing of the
+    # list is atomic, and the entry is an immutable tuple, so the only race
+    # is the heap being emptied in between, which reads as nothing due.
+    try:
+        earliest = _expiry_heap[0][0]
+    except IndexError:
+        return 0
+    if earliest > now:
+        return 0
+    due = []
+    with _expiry_lock:
+        while _expiry_heap and _expiry_heap[0][0] <= now:
+            due.append(heapq.heappop(_expiry_heap)[1])
+
+    expired = 0
+    for reservation_id in due:
+        reservation = _reservations.get(reservation_id)
+        if reservation is None:
+            continue
+        with _lock_for(reservation[0]):
+            if _reservations.pop(reservation_id, None) is not None:
+                _unhold(reservation[0], reservation[1])
+                expired += 1
+    return expired
+
+
+def _reservation_key(reservation_id: str) -> str:
+    reservation = _reservations.get(reservation_id)
+    if reservation is None:
+        raise ValueError(f"Reservation not found: {reservation_id}")
+    return reservation[0]
+
+
+def _close_reservation(reservation_id: str) -> int:
+    """Remove an open reservation and its hold; the caller holds its key's lock.
+
+    Returns the quantity held, or raises ValueError if the reservation was
+    closed meanwhile or has expired (its hold is released either way).
+    """
+    reservation = _reservations.pop(reservation_id, None)
+    if reservation is None:
+        raise ValueError(f"Reservation not found: {reservation_id}")
+    book_key, quantity, expires_at = reservation
+    _unhold(book_key, quantity)
+    if expires_at <= _clock():
+        raise ValueError(f"Reservation expired: {reservation_id}")
+    return quantity
+
+
+def _unhold(book_key: str, quantity: int) -> None:
+    """Drop ``quantity`` from a key's held copies; the caller holds its lock."""
+    reserved = _reserved[book_key] - quantity
+    if reserved:
+        _reserved[book_key] = reserved
+    else:
+        del _reserved[book_key]
+
+
+def _held_note(book_key: str) -> str:
+    reserved = _reserved.get(book_key, 0)
+    return f" ({reserved} reserved)" if reserved else ""
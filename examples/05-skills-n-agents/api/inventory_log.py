@@ -0,0 +1,225 @@
+"""Append-only binary event log for the inventory.
+
+Every stock change is one fixed-size event record, so the log is a full
+audit trail, and stock can be rebuilt after a crash by replaying it
+(see ``api.inventory.use_event_log``). The log lives in three files in
+one directory:
+
+- ``inventory.keys``: each book key, stored once, as a uint16 length plus
+  UTF-8 bytes. A key's id is its position in this file.
+- ``inventory.events``: 13-byte records of event kind (uint8), key id
+  (uint32) and value (int64). The file is never rewritten, only appended.
+- ``inventory.snapshot``: the stock level of every key after the first N
+  events, as an int64 array. Recovery loads it and replays only the
+  events after N.
+
+A batch of adjustments is written as ``BATCH`` records followed by one
+``ADJUST`` record. Replay applies a batch only once its final record is
+read, so a batch torn by a crash is dropped as a whole, like a torn
+single record.
+"""
+
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Mapping
+
+KEYS_FILE = "inventory.keys"
+EVENTS_FILE = "inventory.events"
+SNAPSHOT_FILE = "inventory.snapshot"
+
+# Event kinds
+SET = 1
+ADJUST = 2
+BATCH = 3
+
+_RECORD = struct.Struct("<BIq")
+_KEY_LENGTH = struct.Struct("<H")
+_SNAPSHOT_HEADER = struct.Struct("<QI")
+
+# Events read per chunk during replay
+REPLAY_CHUNK = 65_536
+
+
+class EventLog:
+    """Durable log of stock changes, with periodic snapshots.
+
+    Every write is flushed before it returns (and fsynced with ``fsync``).
+    The log also applies each event to its own copy of the stock levels,
+    so a snapshot always matches an exact event count, whatever the
+    caller's in-memory state is doing meanwhile. Safe to share between
+    threads.
+
+    Args:
+        directory: Directory holding the log files (created if missing).
+        snapshot_every: Events after which to write a snapshot; 0
+            disables snapshots.
+        fsync: Also fsync each write, so it survives power loss and not
+            just a process crash.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 1_000_000, fsync: bool = False) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._keys_path = os.path.join(directory, KEYS_FILE)
+        self._events_path = os.path.join(directory, EVENTS_FILE)
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self._lock = threading.Lock()
+        self._keys: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._levels = array("q")
+        self.events = 0
+        self._snapshot_events = 0
+        self._load_keys()
+        self._load_snapshot()
+        self._replay_events()
+        self._keys_file = open(self._keys_path, "ab")
+        self._events_file = open(self._events_path, "ab")
+
+    def stock(self) -> dict[str, int]:
+        """Return the stock level of every key, as of the last event."""
+        with self._lock:
+            return dict(zip(self._keys, self._levels))
+
+    def record_set(self, key: str, quantity: int) -> None:
+        """Log that ``key``'s stock was set to ``quantity``."""
+        with self._lock:
+            key_id = self._key_id(key)
+            self._write(_RECORD.pack(SET, key_id, quantity))
+            self._levels[key_id] = quantity
+            self.events += 1
+            self._maybe_snapshot()
+
+    def record_adjust(self, key: str, delta: int) -> None:
+        """Log that ``key``'s stock changed by ``delta``."""
+        with self._lock:
+            key_id = self._key_id(key)
+            self._write(_RECORD.pack(ADJUST, key_id, delta))
+            self._levels[key_id] += delta
+            self.events += 1
+            self._maybe_snapshot()
+
+    def record_batch(self, deltas: Mapping[str, int]) -> None:
+        """Log several adjustments as one all-or-nothing event group."""
+        if not deltas:
+            return
+        with self._lock:
+            ids = [(self._key_id(key), delta) for key, delta in deltas.items()]
+            kinds = [BATCH] * (len(ids) - 1) + [ADJUST]
+            self._write(b"".join(
+                _RECORD.pack(kind, key_id, delta) for kind, (key_id, delta) in zip(kinds, ids)
+            ))
+            for key_id, delta in ids:
+                self._levels[key_id] += delta
+            self.events += len(ids)
+            self._maybe_snapshot()
+
+    def snapshot(self) -> None:
+        """Write the current stock levels to the snapshot file."""
+        with self._lock:
+            self._write_snapshot()
+
+    def close(self) -> None:
+        """Close the log files."""
+        self._keys_file.close()
+        self._events_file.close()
+
+    def _key_id(self, key: str) -> int:
+        key_id = self._ids.get(key)
+        if key_id is None:
+            data = key.encode("utf-8")
+            # The key must be durable before any event that refers to it.
+            self._keys_file.write(_KEY_LENGTH.pack(len(data)) + data)
+            self._keys_file.flush()
+            if self.fsync:
+                os.fsync(self._keys_file.fileno())
+            key_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._levels.append(0)
+        return key_id
+
+    def _write(self, data: bytes) -> None:
+        self._events_file.write(data)
+        self._events_file.flush()
+        if self.fsync:
+            os.fsync(self._events_file.fileno())
+
+    def _maybe_snapshot(self) -> None:
+        if self.snapshot_every and self.events - self._snapshot_events >= self.snapshot_every:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(self.events, len(self._levels)))
+            self._levels.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        self._snapshot_events = self.events
+
+    def _load_keys(self) -> None:
+        try:
+            with open(self._keys_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        offset = 0
+        while offset + _KEY_LENGTH.size <= len(data):
+            (length,) = _KEY_LENGTH.unpack_from(data, offset)
+            end = offset + _KEY_LENGTH.size + length
+            if end > len(data):
+                break
+            key = data[offset + _KEY_LENGTH.size:end].decode("utf-8")
+            self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            offset = end
+        if offset != len(data):
+            os.truncate(self._keys_path, offset)
+        self._levels = array("q", bytes(8 * len(self._keys)))
+
+    def _load_snapshot(self) -> None:
+        try:
+            with open(self._snapshot_path, "rb") as f:
+                events, count = _SNAPSHOT_HEADER.unpack(f.read(_SNAPSHOT_HEADER.size))
+                levels = array("q")
+                levels.fromfile(f, count)
+        except FileNotFoundError:
+            return
+        self._levels[:count] = levels
+        self.events = self._snapshot_events = events
+
+    def _replay_events(self) -> None:
+        """Apply the events after the snapshot, dropping a torn tail."""
+        try:
+            f = open(self._events_path, "rb")
+        except FileNotFoundError:
+            return
+        levels = self._levels
+        pending: list[tuple[int, int]] = []
+        replayed = 0
+        with f:
+            f.seek(self.events * _RECORD.size)
+            while chunk := f.read(REPLAY_CHUNK * _RECORD.size):
+                whole = len(chunk) - len(chunk) % _RECORD.size
+                for kind, key_id, value in _RECORD.iter_unpack(chunk[:whole]):
+                    if kind == SET:
+                        levels[key_id] = value
+                    elif kind == ADJUST:
+                        levels[key_id] += value
+                        for part_id, part_delta in pending:
+                            levels[part_id] += part_delta
+                        pending.clear()
+                    else:
+                        pending.append((key_id, value))
+                replayed += whole // _RECORD.size
+                if whole != len(chunk):
+                    break
+        # Keep only whole records and whole batches.
+        replayed -= len(pending)
+        self.events += replayed
+        valid_end = self.events * _RECORD.size
+        if valid_end < os.path.getsize(self._events_path):
+            os.truncate(self._events_path, valid_end)
@@ -0,0 +1,269 @@
+"""Persistent storage backends for the catalog.
+
+Each backend is a ``MutableMapping[str, Book]`` keyed by catalog key, so the
+catalog can use one anywhere it would use a plain dict (see
+``api.catalog.use_store``). Iteration follows first-insertion order, like a
+dict.
+
+- ``WALStore`` keeps every book in memory and makes writes durable by
+  appending them to a write-ahead log. The log is periodically compacted
+  into a snapshot, which is decoded in blocks on start-up.
+- ``SQLiteStore`` keeps books only in a SQLite database, for catalogs that
+  should not be held in memory.
+"""
+
+import gc
+import json
+import os
+import sqlite3
+from collections.abc import Iterator, MutableMapping
+
+from models.book import Book
+
+SNAPSHOT_FILE = "catalog.snapshot"
+WAL_FILE = "catalog.wal"
+
+# Snapshot bytes read and decoded at a time on start-up
+SNAPSHOT_READ_SIZE = 1 << 22
+
+
+def _encode(key: str, book: Book) -> bytes:
+    row = [key, book.title, book.author, book.price_cents, book.isbn, book.genre]
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _decode(line: bytes) -> tuple[str, Book | None]:
+    """Return ``(key, book)`` for a log line; ``book`` is None for a deletion."""
+    row = json.loads(line)
+    if len(row) == 1:
+        return row[0], None
+    key, title, author, price_cents, isbn, genre = row
+    return key, Book(title, author, price_cents, isbn, genre)
+
+
+class WALStore(MutableMapping[str, Book]):
+    """In-memory catalog made durable by a write-ahead log and snapshots.
+
+    Every write is appended to ``catalog.wal`` in ``directory`` as one JSON
+    line and flushed before the in-memory dict is updated. Once
+    ``snapshot_every`` records have been logged, the whole catalog is
+    written to ``catalog.snapshot`` and the log is truncated. Opening the
+    store loads the snapshot, then replays the log on top of it; a torn
+    last record from a crash mid-write is discarded.
+
+    Args:
+        directory: Directory holding the snapshot and log (created if missing).
+        snapshot_every: Log records after which to compact; 0 disables it.
+        fsync: Also fsync each write, so it survives power loss and not
+            just a process crash.
+    """
+
+    def __init__(self, directory: str, snapshot_every: int = 100_000, fsync: bool = False) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self._wal_path = os.path.join(directory, WAL_FILE)
+        self._books: dict[str, Book] = {}
+        self._load_snapshot()
+        self._logged = self._replay_wal()
+        self._wal = open(self._wal_path, "ab")
+
+    def __getitem__(self, key: str) -> Book:
+        return self._books[key]
+
+    def __setitem__(self, key: str, book: Book) -> None:
+        self._append(_encode(key, book))
+        self._books[key] = book
+        self._maybe_snapshot()
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._books:
+            raise KeyError(key)
+        self._append(json.dumps([key], ensure_ascii=False).encode("utf-8") + b"\n")
+        del self._books[key]
+        self._maybe_snapshot()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._books)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._books
+
+    def get(self, key: str, default: Book | None = None) -> Book | None:
+        return self._books.get(key, default)
+
+    def clear(self) -> None:
+        """Remove every book and persist the empty catalog."""
+        self._books.clear()
+        self.snapshot()
+
+    def snapshot(self) -> None:
+        """Write the whole catalog to the snapshot file and truncate the log."""
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(_encode(key, book) for key, book in self._books.items())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        # A crash before the truncate only replays records already in the
+        # snapshot, which is harmless.
+        self._wal.truncate(0)
+        self._wal.seek(0)
+        self._logged = 0
+
+    def close(self) -> None:
+        """Close the log file."""
+        self._wal.close()
+
+    def _append(self, record: bytes) -> None:
+        self._wal.write(record)
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        self._logged += 1
+
+    def _maybe_snapshot(self) -> None:
+        if self.snapshot_every and self._logged >= self.snapshot_every:
+            self.snapshot()
+
+    def _load_snapshot(self) -> None:
+        try:
+            f = open(self._snapshot_path, "rb")
+        except FileNotFoundError:
+            return
+        # Nothing loaded here can form a reference cycle, so skip the
+        # collector passes that millions of new objects would trigger.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with f:
+                pending = b""
+                while block := f.read(SNAPSHOT_READ_SIZE):
+                    data = pending + block
+                    cut = data.rfind(b"\n") + 1
+                    pending = data[cut:]
+                    if cut:
+                        self._load_records(data[:cut - 1])
+                if pending:
+                    self._load_records(pending)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _load_records(self, lines: bytes) -> None:
+        # Records are newline-separated JSON arrays (newlines inside strings
+        # are escaped), so a block of whole lines is one JSON array away from
+        # a single decode call.
+        rows = json.loads(b"[" + lines.replace(b"\n", b",") + b"]")
+        self._books.update(
+            (key, Book(title, author, price_cents, isbn, genre))
+            for key, title, author, price_cents, isbn, genre in rows
+        )
+
+    def _replay_wal(self) -> int:
+        try:
+            f = open(self._wal_path, "rb")
+        except FileNotFoundError:
+            return 0
+        replayed = 0
+        valid_end = 0
+        with f:
+            for line in f:
+                # A record is complete only with its newline: a line torn just
+                # before it can still parse, and the next append would then
+                # run on into it.
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    key, book = _decode(line)
+                except ValueError:
+                    break
+                if book is None:
+                    self._books.pop(key, None)
+                else:
+                    self._books[key] = book
+                replayed += 1
+                valid_end += len(line)
+        if valid_end != os.path.getsize(self._wal_path):
+            os.truncate(self._wal_path, valid_end)
+        return replayed
+
+
+class SQLiteStore(MutableMapping[str, Book]):
+    """Catalog stored in a SQLite database file.
+
+    Books are read from and written to the database on every access, so
+    memory use does not grow with the catalog. Each write is committed
+    immediately; the database runs in WAL journal mode.
+
+    Args:
+        path: Database file path.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS books ("
+            " key TEXT PRIMARY KEY, title TEXT NOT NULL, author TEXT NOT NULL,"
+            " price_cents INTEGER NOT NULL, isbn TEXT, genre TEXT)"
+        )
+        self._db.commit()
+
+    def __getitem__(self, key: str) -> Book:
+        row = self._db.execute(
+            "SELECT title, author, price_cents, isbn, genre FROM books WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return Book(*row)
+
+    def __setitem__(self, key: str, book: Book) -> None:
+        # An upsert keeps the row's rowid, and with it the key's position.
+        self._db.execute(
+            "INSERT INTO books VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET"
+            " title = excluded.title, author = excluded.author,"
+            " price_cents = excluded.price_cents, isbn = excluded.isbn, genre = excluded.genre",
+            (key, book.title, book.author, book.price_cents, book.isbn, book.genre),
+        )
+        self._db.commit()
+
+    def __delitem__(self, key: str) -> None:
+        cursor = self._db.execute("DELETE FROM books WHERE key = ?", (key,))
+        self._db.commit()
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self._db.execute("SELECT key FROM books ORDER BY rowid"):
+            yield key
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def __contains__(self, key: object) -> bool:
+        return self._db.execute("SELECT 1 FROM books WHERE key = ?", (key,)).fetchone() is not None
+
+    def items(self) -> Iterator[tuple[str, Book]]:
+        rows = self._db.execute(
+            "SELECT key, title, author, price_cents, isbn, genre FROM books ORDER BY rowid"
+        )
+        for key, *fields in rows:
+            yield key, Book(*fields)
+
+    def values(self) -> Iterator[Book]:
+        for _, book in self.items():
+            yield book
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM books")
+        self._db.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
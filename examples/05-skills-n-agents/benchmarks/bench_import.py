@@ -0,0 +1,64 @@
+"""Benchmark catalog.bulk_import throughput for CSV and NDJSON feeds.
+
+    python benchmarks/bench_import.py --rows 500000
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import catalog  # noqa: E402
+
+WORDS = ["the", "river", "secret", "garden", "night", "king", "stone", "light", "dark", "house"]
+
+
+def isbn13(n: int) -> str:
+    digits = f"978{n:09d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def make_rows(count: int) -> list[tuple]:
+    rng = random.Random(14)
+    return [
+        (" ".join(rng.choices(WORDS, k=4)).title(), f"Author {rng.randrange(50_000)}",
+         rng.randrange(100, 5000), isbn13(i), "FIC000000")
+        for i in range(count)
+    ]
+
+
+def csv_feed(rows) -> bytes:
+    lines = ["title,author,price_cents,isbn,genre"]
+    lines += [f"{t},{a},{p},{i},{g}" for t, a, p, i, g in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def ndjson_feed(rows) -> bytes:
+    keys = ("title", "author", "price_cents", "isbn", "genre")
+    return "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows).encode("utf-8")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Records per feed.")
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.rows)
+    for name, feed in (("csv", csv_feed(rows)), ("ndjson", ndjson_feed(rows))):
+        catalog.use_store({})
+        start = time.perf_counter()
+        result = catalog.bulk_import(io.BytesIO(feed), format=name)
+        seconds = time.perf_counter() - start
+        assert result["imported"] == args.rows, result["errors"][:3]
+        print(f"{name:8} {args.rows / seconds:12,.0f} rows/s  ({seconds:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Secondary index query latency as the catalog grows, against a full scan.
+
+    python benchmarks/bench_indexes.py --sizes 10000,100000,1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import catalog  # noqa: E402
+from models.book import Book  # noqa: E402
+
+WORDS = ["the", "river", "secret", "garden", "night", "king", "stone", "light", "dark", "house"]
+GENRES = ["FIC000000", "FIC028000", "FIC014000", "JUV000000", "BIO000000"]
+PAGE = 20
+# Looked up with get_author_by_isbn; present at every catalog size
+ISBN = "9780000005000"
+
+
+def make_store(count: int) -> dict[str, Book]:
+    rng = random.Random(17)
+    return {
+        f"book-{i}": Book(
+            " ".join(rng.choices(WORDS, k=4)).title(),
+            f"Author {rng.randrange(count // 10)}",
+            rng.randrange(100, 5000),
+            f"978{i:010d}",
+            rng.choice(GENRES),
+        )
+        for i in range(count)
+    }
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scan(predicate):
+    return lambda: list(islice((b for b in catalog._books.values() if predicate(b)), PAGE))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,50000,200000", help="Comma-separated catalog sizes.")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query; the best is reported.")
+    args = parser.parse_args(argv)
+
+    queries = [
+        ("author", lambda: catalog.books_by_author("Author 7", limit=PAGE),
+         scan(lambda b: b.author == "Author 7")),
+        ("genre", lambda: catalog.books_by_genre("BIO000000", limit=PAGE),
+         scan(lambda b: b.genre == "BIO000000")),
+        ("price", lambda: catalog.books_in_price_range(1000, 1010, limit=PAGE),
+         scan(lambda b: 1000 <= b.price_cents <= 1010)),
+        ("isbn", lambda: catalog.get_author_by_isbn(ISBN),
+         scan(lambda b: b.isbn == ISBN)),
+    ]
+    print(f"{'books':>10} {'query':8} {'indexed':>12} {'scan':>12}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        catalog.use_store(make_store(size))
+        for name, indexed, scanned in queries:
+            print(
+                f"{size:>10,} {name:8} {best_of(indexed, args.repeat) * 1e6:10.1f}us"
+                f" {best_of(scanned, args.repeat) * 1e6:10.1f}us"
+            )
+    catalog.use_store({})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
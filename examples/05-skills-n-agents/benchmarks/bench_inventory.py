@@ -0,0 +1,103 @@
+"""Inventory write throughput under thread contention, one lock vs striped locks.
+
+Also times placing and expiring reservation holds.
+
+    python benchmarks/bench_inventory.py --threads 1,2,4,8,16 --ops 50000 --holds 1000000
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import inventory  # noqa: E402
+
+
+def use_stripes(count: int) -> None:
+    inventory.LOCK_STRIPES = count
+    inventory._locks = [threading.Lock() for _ in range(count)]
+
+
+def run(threads: int, ops: int, keys: list[str], batch: bool) -> float:
+    """Return adjustments per second with ``threads`` workers doing ``ops`` each."""
+    for key in keys:
+        inventory.track_stock(key, 10**9)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        picks = [rng.choice(keys) for _ in range(ops)]
+        barrier.wait()
+        if batch:
+            for i in range(0, ops, 3):
+                inventory.adjust_stock_batch([(key, -1) for key in picks[i:i + 3]])
+        else:
+            for key in picks:
+                inventory.adjust_stock(key, -1)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    seconds = time.perf_counter() - start
+    assert sum(10**9 - inventory._stock[key] for key in keys) == threads * ops
+    return threads * ops / seconds
+
+
+def run_holds(holds: int, keys: list[str]) -> tuple[float, float]:
+    """Return (reservations/s, expirations/s) for ``holds`` holds with spread-out TTLs."""
+    for key in keys:
+        inventory.track_stock(key, 10**9)
+    rng = random.Random(19)
+    now = [0.0]
+    real_clock = inventory._clock
+    inventory._clock = lambda: now[0]
+    try:
+        start = time.perf_counter()
+        for _ in range(holds):
+            inventory.reserve_stock(rng.choice(keys), 1, ttl=rng.uniform(1, 100))
+        reserve_seconds = time.perf_counter() - start
+        now[0] = 1000.0
+        start = time.perf_counter()
+        expired = inventory.expire_reservations()
+        expire_seconds = time.perf_counter() - start
+    finally:
+        inventory._clock = real_clock
+    assert expired == holds and not inventory._reserved
+    return holds / reserve_seconds, holds / expire_seconds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", default="1,2,4,8", help="Comma-separated thread counts.")
+    parser.add_argument("--ops", type=int, default=30_000, help="Adjustments per thread.")
+    parser.add_argument("--keys", type=int, default=1000, help="Distinct book keys.")
+    parser.add_argument("--holds", type=int, default=200_000, help="Reservations to place and expire.")
+    args = parser.parse_args(argv)
+
+    keys = [f"978{n:010d}" for n in range(args.keys)]
+    default_stripes = inventory.LOCK_STRIPES
+    print(f"{'threads':>7} {'mode':6} {'1 lock':>14} {f'{default_stripes} stripes':>14}")
+    for threads in (int(n) for n in args.threads.split(",")):
+        for mode in ("single", "batch"):
+            rates = []
+            for stripes in (1, default_stripes):
+                use_stripes(stripes)
+                rates.append(run(threads, args.ops, keys, mode == "batch"))
+            print(f"{threads:>7} {mode:6} {rates[0]:10,.0f} op/s {rates[1]:10,.0f} op/s")
+    use_stripes(default_stripes)
+
+    reserved, expired = run_holds(args.holds, keys)
+    print(f"\n{args.holds:,} holds: reserve {reserved:,.0f}/s, expire {expired:,.0f}/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
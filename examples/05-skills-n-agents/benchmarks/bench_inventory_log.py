@@ -0,0 +1,90 @@
+"""Inventory event log append throughput and recovery time.
+
+Appends go through the EventLog API. The recovery runs replay a log
+written in bulk, so large logs can be tested quickly.
+
+    python benchmarks/bench_inventory_log.py --events 5000000 --replay-events 100000000
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.inventory_log import ADJUST, EVENTS_FILE, KEYS_FILE, EventLog  # noqa: E402
+
+RECORD = struct.Struct("<BIq")
+CHUNK = 65_536
+
+
+def bench_append(directory: str, events: int, keys: list[str]) -> float:
+    log = EventLog(directory, snapshot_every=0)
+    rng = random.Random(20)
+    picks = [rng.choice(keys) for _ in range(min(events, 100_000))]
+    start = time.perf_counter()
+    for i in range(events):
+        log.record_adjust(picks[i % len(picks)], -1)
+    seconds = time.perf_counter() - start
+    log.close()
+    return events / seconds
+
+
+def write_log(directory: str, events: int, keys: list[str]) -> None:
+    """Write ``events`` ADJUST records spread over ``keys`` without the API."""
+    with open(os.path.join(directory, KEYS_FILE), "wb") as f:
+        for key in keys:
+            data = key.encode("utf-8")
+            f.write(struct.pack("<H", len(data)) + data)
+    chunk = b"".join(RECORD.pack(ADJUST, i % len(keys), 1) for i in range(CHUNK))
+    with open(os.path.join(directory, EVENTS_FILE), "wb") as f:
+        for _ in range(events // CHUNK):
+            f.write(chunk)
+        f.write(chunk[:events % CHUNK * RECORD.size])
+
+
+def recover(directory: str) -> tuple[float, EventLog]:
+    start = time.perf_counter()
+    log = EventLog(directory, snapshot_every=0)
+    return time.perf_counter() - start, log
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000, help="Events to append via the API.")
+    parser.add_argument("--replay-events", type=int, default=10_000_000, help="Events in the recovery log.")
+    parser.add_argument("--tail", type=int, default=100_000, help="Events after the snapshot.")
+    parser.add_argument("--keys", type=int, default=10_000, help="Distinct book keys.")
+    args = parser.parse_args(argv)
+
+    keys = [f"978{n:010d}" for n in range(args.keys)]
+    with tempfile.TemporaryDirectory() as directory:
+        rate = bench_append(os.path.join(directory, "append"), args.events, keys)
+        print(f"append           {rate:12,.0f} events/s  ({args.events:,} events)")
+
+        replay_dir = os.path.join(directory, "replay")
+        os.makedirs(replay_dir)
+        write_log(replay_dir, args.replay_events, keys)
+        seconds, log = recover(replay_dir)
+        assert log.events == args.replay_events
+        print(f"full replay      {seconds:9.2f} s  ({args.replay_events / seconds:,.0f} events/s)")
+
+        # Snapshot everything, then recover from the snapshot plus a tail.
+        log.snapshot()
+        log.close()
+        with open(os.path.join(replay_dir, EVENTS_FILE), "ab") as f:
+            f.write(b"".join(RECORD.pack(ADJUST, i % len(keys), 1) for i in range(args.tail)))
+        seconds, log = recover(replay_dir)
+        log.close()
+        assert log.events == args.replay_events + args.tail
+        print(f"snapshot + tail  {seconds:9.2f} s  ({args.tail:,} events replayed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
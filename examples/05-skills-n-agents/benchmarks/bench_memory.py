@@ -0,0 +1,79 @@
+"""Per-book memory footprint: dict of Book objects vs ColumnarStore.
+
+    python benchmarks/bench_memory.py --books 1000000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.columnar import ColumnarStore  # noqa: E402
+from models.book import Book  # noqa: E402
+
+WORDS = ["the", "river", "secret", "garden", "night", "king", "stone", "light", "dark", "house"]
+GENRES = ["FIC000000", "FIC028000", "FIC014000", "JUV000000", "BIO000000", None]
+
+
+def isbn13(n: int) -> str:
+    digits = f"978{n:09d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def book_fields(count: int):
+    rng = random.Random(16)
+    for i in range(count):
+        yield (
+            isbn13(i),
+            f"{' '.join(rng.choices(WORDS, k=4)).title()} {i}",
+            f"Author {rng.randrange(count // 10 + 1)}",
+            rng.randrange(100, 5000),
+            rng.choice(GENRES),
+        )
+
+
+def measure(build) -> int:
+    """Return bytes still allocated by ``build()``'s result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def build_dict(count: int):
+    # Each field value is a fresh object, as it would be after parsing a feed.
+    books = {}
+    for isbn, title, author, price, genre in book_fields(count):
+        books[isbn] = Book(title, author, price, isbn, genre)
+    return books
+
+
+def build_columnar(count: int):
+    store = ColumnarStore()
+    for isbn, title, author, price, genre in book_fields(count):
+        store[isbn] = Book(title, author, price, isbn, genre)
+    return store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=200_000, help="Catalog size.")
+    args = parser.parse_args(argv)
+
+    for name, build in (("dict[str, Book]", build_dict), ("ColumnarStore", build_columnar)):
+        size = measure(lambda: build(args.books))
+        print(f"{name:18} {size / args.books:8.1f} bytes/book  ({size / 2**20:.1f} MiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
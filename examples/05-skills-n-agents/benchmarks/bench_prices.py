@@ -0,0 +1,57 @@
+"""Price formatting cost on million-row columns and listings.
+
+Compares the old per-call f-string with the cached formatter (one price
+at a time and a whole column at once), and times building the book dicts
+of a full listing.
+
+    python benchmarks/bench_prices.py --rows 5000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.catalog import _to_dict  # noqa: E402
+from models.book import Book  # noqa: E402
+from utils.prices import PriceFormatter, format_price, format_prices  # noqa: E402
+
+
+def f_string(price_cents: int) -> str:
+    """The formatting Book.price_display used to do on every call."""
+    return f"${price_cents // 100}.{price_cents % 100:02d}"
+
+
+def timed(label: str, rows: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:34} {seconds / rows * 1e9:8.1f} ns/row  ({seconds:.2f} s)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Prices per column.")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(23)
+    prices = array("q", (rng.randrange(1, 60) * 100 + rng.choice((0, 49, 95, 99)) for _ in range(args.rows)))
+    rows = args.rows
+    euro = PriceFormatter("EUR", "de_DE")
+
+    timed("f-string per price", rows, lambda: [f_string(p) for p in prices])
+    timed("format_price per price", rows, lambda: [format_price(p) for p in prices])
+    timed("format_prices(column)", rows, lambda: format_prices(prices))
+    timed("EUR/de_DE format_many(column)", rows, lambda: euro.format_many(prices))
+
+    books = [Book("Title", "Author", p) for p in prices]
+    timed("listing dicts (_to_dict)", rows, lambda: [_to_dict(book) for book in books])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Per-book cost of utils.serializers against _to_dict + json.dumps.
+
+    python benchmarks/bench_serializers.py --books 5000000
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.catalog import _to_dict  # noqa: E402
+from models.book import Book  # noqa: E402
+from utils.serializers import dump_book, dump_books, write_books  # noqa: E402
+
+
+def make_books(count: int) -> list[Book]:
+    rng = random.Random(24)
+    authors = [f"Author {i}" for i in range(5000)]
+    return [
+        Book(f"Book title {i}", rng.choice(authors), rng.randrange(100, 6000), f"978{i:010d}", "FIC000000")
+        for i in range(count)
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000, help="Books to encode.")
+    args = parser.parse_args(argv)
+
+    books = make_books(args.books)
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    cases = [
+        ("json.dumps(_to_dict) per book", lambda: [encoder.encode(_to_dict(b)).encode() for b in books]),
+        ("dump_book per book", lambda: [dump_book(b) for b in books]),
+        ("json.dumps([_to_dict...])", lambda: encoder.encode([_to_dict(b) for b in books]).encode()),
+        ("dump_books (json)", lambda: dump_books(books)),
+        ("write_books (json, streamed)", lambda: write_books(io.BytesIO(), books)),
+        ("dump_books (msgpack)", lambda: dump_books(books, format="msgpack")),
+    ]
+    for name, fn in cases:
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        print(f"{name:32} {seconds / len(books) * 1e9:8.1f} ns/book  ({seconds:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Benchmark catalog storage backends: write throughput and cold start.
+
+Compares the in-memory dict with ``api.storage.WALStore`` and
+``api.storage.SQLiteStore``:
+
+    python benchmarks/bench_storage.py --books 200000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.storage import SQLiteStore, WALStore  # noqa: E402
+from models.book import Book  # noqa: E402
+
+WORDS = ["the", "river", "secret", "garden", "night", "king", "stone", "light", "dark", "house"]
+
+
+def make_books(count: int) -> list[tuple[str, Book]]:
+    rng = random.Random(13)
+    books = []
+    for i in range(count):
+        isbn = f"978{i:010d}"
+        title = " ".join(rng.choices(WORDS, k=4)).title()
+        books.append((isbn, Book(title, f"Author {rng.randrange(count // 4 + 1)}", rng.randrange(100, 5000), isbn)))
+    return books
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def fill(store, books) -> None:
+    for key, book in books:
+        store[key] = book
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=200_000, help="Catalog size.")
+    args = parser.parse_args(argv)
+
+    books = make_books(args.books)
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        root = Path(root)
+
+        seconds = timed(lambda: fill({}, books))
+        rows.append(("dict", seconds, None))
+
+        # Every record stays in the log, so opening replays all of it.
+        wal = WALStore(str(root / "wal-log"), snapshot_every=0)
+        seconds = timed(lambda: fill(wal, books))
+        wal.close()
+        replay = timed(lambda: WALStore(str(root / "wal-log")).close())
+        rows.append(("WALStore (log replay)", seconds, replay))
+
+        wal = WALStore(str(root / "wal-snap"), snapshot_every=0)
+        fill(wal, books)
+        seconds = timed(wal.snapshot)
+        wal.close()
+        load = timed(lambda: WALStore(str(root / "wal-snap")).close())
+        rows.append(("WALStore (snapshot)", None, load))
+        print(f"snapshot write: {seconds:.2f} s")
+
+        sqlite = SQLiteStore(str(root / "catalog.sqlite"))
+        seconds = timed(lambda: fill(sqlite, books))
+        sqlite.close()
+
+        def open_and_scan():
+            store = SQLiteStore(str(root / "catalog.sqlite"))
+            for _ in store.values():
+                pass
+            store.close()
+
+        open_only = timed(lambda: SQLiteStore(str(root / "catalog.sqlite")).close())
+        rows.append(("SQLiteStore (open)", seconds, open_only))
+        rows.append(("SQLiteStore (open + full scan)", None, timed(open_and_scan)))
+
+    print(f"{'backend':32} {'writes/s':>12} {'cold start':>12}")
+    for name, write_seconds, start_seconds in rows:
+        writes = f"{args.books / write_seconds:12,.0f}" if write_seconds else f"{'-':>12}"
+        start = f"{start_seconds * 1000:10.1f}ms" if start_seconds is not None else f"{'-':>12}"
+        print(f"{name:32} {writes} {start}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
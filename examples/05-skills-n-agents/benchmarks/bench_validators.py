@@ -0,0 +1,65 @@
+"""Per-ISBN cost of validate_isbns against calling validate_isbn in a loop.
+
+The scalar loop is timed with and without a check-digit test, since
+validate_isbn on its own only checks the format.
+
+    python benchmarks/bench_validators.py --isbns 5000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.validators import validate_isbn, validate_isbns  # noqa: E402
+
+
+def make_isbns(count: int) -> list[str]:
+    """Mostly valid ISBN-13s, with a few bad check digits and lengths."""
+    rng = random.Random(21)
+    isbns = []
+    for _ in range(count):
+        digits = f"978{rng.randrange(10**9):09d}"
+        total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+        check = (10 - total % 10) % 10
+        roll = rng.random()
+        if roll < 0.01:
+            check = (check + 1) % 10
+        isbns.append(digits + str(check) if roll > 0.001 else digits)
+    return isbns
+
+
+def scalar_with_check_digit(isbns: list[str]) -> list[bool]:
+    return [
+        validate_isbn(isbn)
+        and sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(isbn)) % 10 == 0
+        for isbn in isbns
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--isbns", type=int, default=1_000_000, help="ISBNs to validate.")
+    args = parser.parse_args(argv)
+
+    isbns = make_isbns(args.isbns)
+    cases = [
+        ("validate_isbn loop (format only)", lambda: [validate_isbn(isbn) for isbn in isbns]),
+        ("validate_isbn + check digit loop", lambda: scalar_with_check_digit(isbns)),
+        ("validate_isbns", lambda: validate_isbns(isbns)[0]),
+    ]
+    results = {}
+    for name, fn in cases:
+        start = time.perf_counter()
+        results[name] = fn()
+        seconds = time.perf_counter() - start
+        print(f"{name:34} {seconds / len(isbns) * 1e9:8.1f} ns/ISBN  ({seconds:.2f} s)")
+    assert results["validate_isbns"] == results["validate_isbn + check digit loop"]
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
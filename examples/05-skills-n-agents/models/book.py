@@ -2,6 +2,8 @@
 
 from dataclasses import dataclass, field
 
+from utils.prices import format_price
+
 
 @dataclass(slots=True)
 class Book:
@@ -25,8 +27,6 @@ class Book:
         """Return human-readable price string.
 
         Returns:
-            Formatted price like "$12.99".
+            Formatted price like "$12.99" (cached per distinct price).
         """
-        dollars = self.price_cents // 100
-        cents = self.price_cents % 100
-        return f"${dollars}.{cents:02d}"
+        return format_price(self.price_cents)
@@ -1,15 +1,44 @@
 """Tests for the catalog API."""
 
+import io
+import json
+import random
+from operator import itemgetter
+
 import pytest
-from api.catalog import create_book, get_book, list_books, search_books, _books
+from api.catalog import (
+    books_by_author,
+    books_by_genre,
+    books_in_price_range,
+    bulk_import,
+    create_book,
+    export_ndjson,
+    get_author,
+    get_author_by_isbn,
+    get_book,
+    iter_books,
+    list_books,
+    search_books,
+    use_store,
+    _authors,
+    _books,
+    _genre_index,
+    _price_index,
+    _search_index,
+)
+
+
+def _clear():
+    for store in (_books, _search_index, _authors, _genre_index, _price_index):
+        store.clear()
 
 
 @pytest.fixture(autouse=True)
 def clear_store():
     """Clear the in-memory store before each test."""
-    _books.clear()
+    _clear()
     yield
-    _books.clear()
+    _clear()
 
 
 class TestCreateBook:
@@ -68,3 +97,396 @@ class TestSearchBooks:
     def test_search_no_match(self):
         create_book("Python Crash Course", "Eric Matthes", 2999)
         assert search_books("javascript") == []
+
+    def test_search_short_query_scans(self):
+        create_book("Dune", "Frank Herbert", 1699)
+        create_book("Emma", "Jane Austen", 999)
+        assert [b["title"] for b in search_books("du")] == ["Dune"]
+        assert len(search_books("")) == 2
+
+    def test_search_does_not_match_across_fields(self):
+        create_book("Dune", "Frank Herbert", 1699)
+        assert search_books("unefra") == []
+
+    def test_search_sees_replaced_book(self):
+        create_book("Old Title", "Someone", 999, isbn="9780000000002")
+        create_book("New Title", "Someone", 999, isbn="9780000000002")
+        assert search_books("old title") == []
+        assert [b["title"] for b in search_books("new title")] == ["New Title"]
+
+    def test_resaving_a_book_keeps_postings_compact(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        sizes = {gram: len(posting) for gram, posting in _search_index._postings.items()}
+        for price in range(1000):
+            create_book("Dune", "Frank Herbert", price, isbn="9780441013593")
+        assert {gram: len(posting) for gram, posting in _search_index._postings.items()} == sizes
+        create_book("Dune Messiah", "Frank Herbert", 999, isbn="9780441013593")
+        create_book("Dune", "Frank Herbert", 999, isbn="9780441013593")
+        assert {gram: len(posting) for gram, posting in _search_index._postings.items()} == sizes
+        assert [b["title"] for b in search_books("dune")] == ["Dune"]
+
+    def test_search_matches_linear_scan(self):
+        rng = random.Random(11)
+        words = ["the", "python", "dune", "emma", "war", "peace", "Straße", "café"]
+        for i in range(300):
+            title = " ".join(rng.choices(words, k=3)).title()
+            create_book(title, rng.choice(["Ann Lee", "Bo Tran", "Cé Dupont"]), 999, isbn=f"978{i:010d}")
+        for query in ["the", "pyth", "ce d", "e W", "ssE", "café p", "zzz", "ann", "hon dune"]:
+            expected = [
+                b["isbn"] for b in list_books()
+                if query.lower() in b["title"].lower() or query.lower() in b["author"].lower()
+            ]
+            assert [b["isbn"] for b in search_books(query)] == expected
+
+
+class TestSearchRankingAndPaging:
+    @pytest.fixture
+    def books(self):
+        create_book("A Tale of Python Snakes", "Ann Lee", 999)
+        create_book("Python", "Bo Tran", 999)
+        create_book("Learning Python", "Cy Python", 999)
+        create_book("Snakes", "Pythonia Jones", 999)
+        create_book("Python Tricks", "Dan Bader", 999)
+
+    def test_relevance_order(self, books):
+        results = search_books("python", rank="relevance")
+        assert [b["title"] for b in results] == [
+            "Python",                   # whole title
+            "Learning Python",          # word in title + word in author
+            "Python Tricks",            # title prefix
+            "A Tale of Python Snakes",  # word in title
+            "Snakes",                   # author prefix only
+        ]
+        assert results[0]["score"] > results[-1]["score"]
+
+    def test_limit_and_offset(self, books):
+        titles = [b["title"] for b in search_books("python")]
+        assert [b["title"] for b in search_books("python", limit=2)] == titles[:2]
+        assert [b["title"] for b in search_books("python", limit=2, offset=2)] == titles[2:4]
+        assert search_books("python", limit=0) == []
+        assert "cursor" not in search_books("python")[0]
+
+    @pytest.mark.parametrize("rank", [None, "relevance"])
+    def test_cursor_walks_all_results(self, books, rank):
+        expected = [b["title"] for b in search_books("python", rank=rank)]
+        seen = []
+        cursor = None
+        while page := search_books("python", limit=2, cursor=cursor, rank=rank):
+            seen += [b["title"] for b in page]
+            cursor = page[-1]["cursor"]
+        assert seen == expected
+
+    def test_cursor_stable_when_books_added(self, books):
+        expected = [b["title"] for b in search_books("python", rank="relevance")]
+        first = search_books("python", limit=2, rank="relevance")
+        # Ranks above the cursor, so it belongs to pages already served
+        create_book("Python", "Someone Else", 999, isbn="9780000000002")
+        # Ranks below the cursor and shows up in the remaining pages
+        create_book("Pythons", "Someone Else", 999, isbn="9780000000003")
+        rest = search_books("python", cursor=first[-1]["cursor"], rank="relevance")
+        assert [b["title"] for b in first + rest] == expected[:3] + ["Pythons"] + expected[3:]
+
+    def test_short_query_paging(self, books):
+        assert [b["title"] for b in search_books("sn", limit=1, offset=1)] == ["Snakes"]
+
+    def test_heap_matches_full_sort(self):
+        rng = random.Random(12)
+        words = ["the", "then", "other", "theme", "cat", "hat"]
+        for i in range(200):
+            create_book(" ".join(rng.choices(words, k=3)), rng.choice(["The Author", "Kim"]), 999, isbn=f"978{i:010d}")
+        full = search_books("the", rank="relevance")
+        for offset, limit in [(0, 10), (5, 7), (190, 50)]:
+            page = search_books("the", limit=limit, offset=offset, rank="relevance")
+            assert [b["isbn"] for b in page] == [b["isbn"] for b in full[offset:offset + limit]]
+
+    def test_invalid_arguments(self, books):
+        with pytest.raises(ValueError, match="Limit cannot be negative"):
+            search_books("python", limit=-1)
+        with pytest.raises(ValueError, match="Offset cannot be negative"):
+            search_books("python", offset=-1)
+        with pytest.raises(ValueError, match="Unknown rank"):
+            search_books("python", rank="popularity")
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            search_books("python", cursor="abc")
+        cursor = search_books("python", limit=1)[0]["cursor"]
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            search_books("python", cursor=cursor, rank="relevance")
+
+
+ONIX_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<ONIXMessage xmlns="http://ns.editeur.org/onix/3.0/reference" release="3.0">
+  <Header><Sender><SenderName>Pub</SenderName></Sender></Header>
+  <Product>
+    <RecordReference>rec-1</RecordReference>
+    <ProductIdentifier><ProductIDType>01</ProductIDType><IDValue>internal-7</IDValue></ProductIdentifier>
+    <ProductIdentifier><ProductIDType>15</ProductIDType><IDValue>9780441013593</IDValue></ProductIdentifier>
+    <DescriptiveDetail>
+      <TitleDetail><TitleElement><TitleText>Dune</TitleText></TitleElement></TitleDetail>
+      <Contributor><PersonName>Frank Herbert</PersonName></Contributor>
+      <Subject><SubjectSchemeIdentifier>10</SubjectSchemeIdentifier><SubjectCode>FIC028000</SubjectCode></Subject>
+    </DescriptiveDetail>
+    <ProductSupply><SupplyDetail><Price><PriceAmount>16.99</PriceAmount></Price></SupplyDetail></ProductSupply>
+  </Product>
+  <Product>
+    <DescriptiveDetail>
+      <TitleDetail><TitleElement><TitleText>Free Book</TitleText></TitleElement></TitleDetail>
+    </DescriptiveDetail>
+    <ProductSupply><SupplyDetail><Price><PriceAmount>lots</PriceAmount></Price></SupplyDetail></ProductSupply>
+  </Product>
+</ONIXMessage>
+"""
+
+
+class TestBulkImport:
+    def test_csv(self):
+        feed = io.StringIO(
+            "title,author,price_cents,isbn,genre\n"
+            "Dune,Frank Herbert,1699,9780441013593,FIC028000\n"
+            "Emma,Jane Austen,999,,\n"
+        )
+        result = bulk_import(feed)
+        assert result == {"status": "completed", "imported": 2, "failed": 0, "errors": []}
+        assert get_book("9780441013593")["genre"] == "FIC028000"
+        assert get_book("emma")["price"] == "$9.99"
+        assert [b["title"] for b in search_books("austen")] == ["Emma"]
+
+    def test_csv_row_errors(self):
+        feed = io.BytesIO(
+            b"author,title,price_cents,isbn\n"
+            b"A,Good,100,\n"
+            b"A,,100,\n"
+            b"A,Cheap,-1,\n"
+            b"A,Bad ISBN,100,12345\n"
+            b"A,Short row\n"
+            b",No Author,100,\n"
+            b"A,Not a number,12.99,\n"
+        )
+        result = bulk_import(feed, batch_size=3)
+        assert result["imported"] == 1
+        assert result["failed"] == 6
+        assert result["errors"] == [
+            {"row": 2, "error": "Title cannot be empty"},
+            {"row": 3, "error": "Invalid price: '-1'"},
+            {"row": 4, "error": "Invalid ISBN: '12345'"},
+            {"row": 5, "error": "Expected 4 columns, got 2"},
+            {"row": 6, "error": "Author cannot be empty"},
+            {"row": 7, "error": "Invalid price: '12.99'"},
+        ]
+
+    def test_isbn_check_digit(self):
+        feed = io.StringIO(
+            "title,author,price_cents,isbn\n"
+            "Dune,Frank Herbert,1699,9780441013593\n"
+            "Typo,Frank Herbert,1699,9780441013594\n"
+        )
+        result = bulk_import(feed)
+        assert result["imported"] == 1
+        assert result["errors"] == [{"row": 2, "error": "Invalid ISBN: '9780441013594'"}]
+
+    def test_max_errors(self):
+        feed = io.StringIO("title,author,price_cents\n" + ",A,1\n" * 5)
+        result = bulk_import(feed, max_errors=2)
+        assert result["failed"] == 5
+        assert len(result["errors"]) == 2
+
+    def test_later_rows_replace_earlier(self):
+        create_book("Dune", "Frank Herbert", 999, isbn="9780441013593")
+        feed = io.StringIO("title,author,price_cents,isbn\nDune,Frank Herbert,1699,9780441013593\n")
+        bulk_import(feed)
+        assert len(list_books()) == 1
+        assert get_book("9780441013593")["price_cents"] == 1699
+
+    def test_ndjson(self):
+        lines = [
+            json.dumps({"title": "Dune", "author": "Frank Herbert", "price_cents": 1699}),
+            "",
+            "{not json",
+            json.dumps(["a list"]),
+            json.dumps({"title": "Emma", "author": "Jane Austen", "price_cents": "999"}),
+        ]
+        result = bulk_import(io.StringIO("\n".join(lines)), format="ndjson")
+        assert result["imported"] == 2
+        assert [e["row"] for e in result["errors"]] == [2, 3]
+
+    def test_onix(self):
+        result = bulk_import(io.BytesIO(ONIX_FEED.encode("utf-8")), format="onix")
+        assert result["imported"] == 1
+        assert result["errors"] == [{"row": 2, "error": "Invalid PriceAmount: 'lots'"}]
+        book = get_book("9780441013593")
+        assert (book["title"], book["author"], book["price_cents"], book["genre"]) == (
+            "Dune", "Frank Herbert", 1699, "FIC028000",
+        )
+
+    @pytest.mark.parametrize("amount", ["NaN", "Infinity", "-Infinity", "sNaN"])
+    def test_onix_non_finite_price_is_a_row_error(self, amount):
+        feed = ONIX_FEED.replace("<PriceAmount>lots</PriceAmount>", f"<PriceAmount>{amount}</PriceAmount>")
+        result = bulk_import(io.BytesIO(feed.encode("utf-8")), format="onix")
+        assert result["imported"] == 1
+        assert result["errors"] == [{"row": 2, "error": f"Invalid PriceAmount: {amount!r}"}]
+
+    def test_bad_format_and_header(self):
+        with pytest.raises(ValueError, match="Unknown feed format"):
+            bulk_import(io.StringIO(""), format="xlsx")
+        with pytest.raises(ValueError, match="missing columns: price_cents"):
+            bulk_import(io.StringIO("title,author\n"))
+
+
+class TestListingAndExport:
+    @pytest.fixture
+    def books(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        create_book("Emma", "Jane Austen", 999)
+        create_book("Ulysses", "James Joyce", 1499)
+
+    def test_projection(self, books):
+        assert list_books(fields=["key", "price_cents"]) == [
+            {"key": "9780441013593", "price_cents": 1699},
+            {"key": "emma", "price_cents": 999},
+            {"key": "ulysses", "price_cents": 1499},
+        ]
+
+    def test_unknown_field(self, books):
+        with pytest.raises(ValueError, match="Unknown field: rating"):
+            list_books(fields=["title", "rating"])
+
+    def test_cursor_pages(self, books):
+        first = list_books(fields=["title"], limit=2)
+        assert [b["title"] for b in first] == ["Dune", "Emma"]
+        rest = list_books(fields=["title"], limit=2, cursor=first[-1]["cursor"])
+        assert [b["title"] for b in rest] == ["Ulysses"]
+        assert list_books(limit=2, cursor=rest[-1]["cursor"]) == []
+
+    def test_replaced_book_keeps_position(self, books):
+        create_book("Dune", "Frank Herbert", 999, isbn="9780441013593")
+        assert [b["price_cents"] for b in list_books()] == [999, 999, 1499]
+
+    def test_iter_books_is_lazy(self, books):
+        books_iter = iter_books(fields=["title"])
+        assert next(books_iter) == {"title": "Dune"}
+        create_book("Emma", "Jane Austen", 1)
+        assert [b["title"] for b in books_iter] == ["Emma", "Ulysses"]
+
+    def test_export_ndjson(self, books):
+        out = io.StringIO()
+        assert export_ndjson(out, fields=["key", "title"]) == {"status": "exported", "books": 3}
+        lines = out.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == list_books(fields=["key", "title"])
+
+
+class TestSecondaryIndexes:
+    @pytest.fixture
+    def books(self):
+        rng = random.Random(17)
+        lines = ["title,author,price_cents,isbn,genre"]
+        for i in range(300):
+            genre = rng.choice(["FIC000000", "FIC028000", ""])
+            lines.append(f"Book {i},Author {rng.randrange(20)},{rng.randrange(500, 3000)},,{genre}")
+        bulk_import(io.StringIO("\n".join(lines) + "\n"))
+        return list_books()
+
+    def test_by_author_matches_scan(self, books):
+        expected = [b for b in books if b["author"] == "Author 3"]
+        assert books_by_author("Author 3") == expected
+        assert books_by_author("Nobody") == []
+
+    def test_by_genre_matches_scan(self, books):
+        expected = [b for b in books if b["genre"] == "FIC028000"]
+        assert expected
+        assert books_by_genre("FIC028000") == expected
+
+    def test_price_range_matches_scan(self, books):
+        expected = sorted(
+            (b for b in books if 1000 <= b["price_cents"] <= 2000), key=itemgetter("price_cents")
+        )
+        assert books_in_price_range(1000, 2000) == expected
+        assert books_in_price_range(2999 + 1) == []
+        assert len(books_in_price_range()) == len(books)
+
+    @pytest.mark.parametrize("query", [
+        lambda **kw: books_by_author("Author 5", **kw),
+        lambda **kw: books_by_genre("FIC000000", **kw),
+        lambda **kw: books_in_price_range(800, 2500, **kw),
+    ])
+    def test_cursor_walks_all_results(self, books, query):
+        expected = [b["title"] for b in query()]
+        seen, cursor = [], None
+        while page := query(limit=7, cursor=cursor):
+            seen += [b["title"] for b in page]
+            cursor = page[-1]["cursor"]
+        assert seen == expected
+
+    def test_replaced_book_is_reindexed(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        create_book("Dune", "F. Herbert", 999, isbn="9780441013593")
+        assert books_by_author("Frank Herbert") == []
+        assert [b["author"] for b in books_by_author("F. Herbert")] == ["F. Herbert"]
+        assert books_in_price_range(1000) == []
+        assert [b["price_cents"] for b in books_in_price_range(900, 1000)] == [999]
+
+    def test_price_index_split_blocks(self, monkeypatch):
+        monkeypatch.setattr("utils.field_index.BLOCK_SIZE", 4)
+        rng = random.Random(3)
+        expected = set()
+        for position in range(500):
+            pair = (rng.randrange(50), position)
+            _price_index.add(*pair)
+            expected.add(pair)
+            if rng.random() < 0.3:
+                victim = rng.choice(sorted(expected))
+                _price_index.remove(*victim)
+                expected.discard(victim)
+        assert len(_price_index._blocks) > 1
+        assert list(_price_index.range((10, -1), 30)) == sorted(p for p in expected if 10 <= p[0] <= 30)
+        assert len(_price_index) == len(expected)
+
+    def test_invalid_arguments(self, books):
+        with pytest.raises(ValueError, match="Limit"):
+            books_by_author("Author 1", limit=-1)
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            books_in_price_range(cursor="12")
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            books_by_genre("FIC000000", cursor="x")
+
+
+class TestAuthors:
+    def test_get_author(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        create_book("Dune Messiah", "Frank Herbert", 999)
+        create_book("Solaris", "Stanisław Lem", 1299, isbn="9780156027601")
+        author = get_author("Frank Herbert")
+        assert author["name"] == "Frank Herbert"
+        assert author["book_isbns"] == ["9780441013593"]
+        assert author["keys"] == ["9780441013593", "dune-messiah"]
+        assert get_author_by_isbn("9780156027601")["keys"] == ["9780156027601"]
+        assert get_author("Stanisław Lem")["id"] != author["id"]
+
+    def test_unknown_author_or_isbn_raises(self):
+        with pytest.raises(ValueError, match="Author not found"):
+            get_author("Nobody")
+        with pytest.raises(ValueError, match="ISBN not found"):
+            get_author_by_isbn("9780441013593")
+
+    def test_replaced_book_moves_between_authors(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        create_book("Dune", "F. Herbert", 1699, isbn="9780441013593")
+        assert get_author_by_isbn("9780441013593")["name"] == "F. Herbert"
+        with pytest.raises(ValueError, match="Author not found"):
+            get_author("Frank Herbert")
+        assert _authors.id_of("Frank Herbert") == 0
+
+    def test_names_are_interned(self):
+        bulk_import(io.StringIO("title,author,price_cents\n" + "".join(f"B{i},Ann Leckie,100\n" for i in range(50))))
+        assert len(_authors) == 1
+        assert _authors.count("Ann Leckie") == 50
+        assert _authors.name(_authors.intern("Ann " + "Leckie")) is _authors.name(0)
+
+    def test_use_store_rebuilds_registry(self):
+        create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        store = dict(_books)
+        _clear()
+        use_store(store)
+        try:
+            assert get_author_by_isbn("9780441013593")["keys"] == ["9780441013593"]
+        finally:
+            use_store(_books)
+
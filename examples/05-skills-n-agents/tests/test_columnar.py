@@ -0,0 +1,154 @@
+"""Tests for the columnar catalog store."""
+
+import io
+
+import pytest
+from api import catalog
+from api.columnar import BookRow, ColumnarStore
+from models.book import Book
+
+DUNE = Book("Dune", "Frank Herbert", 1699, isbn="9780441013593", genre="FIC028000")
+EMMA = Book("Emma", "Jane Austen", 999)
+
+
+class TestColumnarStore:
+    def test_round_trip(self):
+        store = ColumnarStore()
+        store["dune"] = DUNE
+        store["emma"] = EMMA
+        row = store["dune"]
+        assert isinstance(row, BookRow)
+        assert row == DUNE
+        assert (row.title, row.author, row.price_cents, row.isbn, row.genre) == (
+            "Dune", "Frank Herbert", 1699, "9780441013593", "FIC028000",
+        )
+        assert store["emma"].isbn is None
+        assert store["emma"].genre is None
+        assert row.price_display() == "$16.99"
+        assert list(store) == ["dune", "emma"]
+
+    def test_unicode_title_and_shared_author(self):
+        store = ColumnarStore()
+        store["a"] = Book("Straße ☕", "Ann", 1)
+        store["b"] = Book("Other", "Ann", 2)
+        assert store["a"].title == "Straße ☕"
+        assert store._authors == ["Ann"]
+
+    def test_isbn_that_does_not_pack(self):
+        store = ColumnarStore()
+        store["a"] = Book("A", "Ann", 1, isbn="978-0-441-01359-3")
+        store["b"] = Book("B", "Ann", 1, isbn="0123456789012")
+        assert store["a"].isbn == "978-0-441-01359-3"
+        assert store["b"].isbn == "0123456789012"
+        store["a"] = Book("A", "Ann", 1)
+        assert store["a"].isbn is None
+
+    def test_overwrite_and_delete(self):
+        store = ColumnarStore()
+        store["dune"] = DUNE
+        store["emma"] = EMMA
+        store["dune"] = EMMA
+        assert list(store) == ["dune", "emma"]
+        assert store["dune"] == EMMA
+        del store["dune"]
+        assert "dune" not in store
+        assert store.get("dune") is None
+        assert len(store) == 1
+
+    def test_many_keys_survive_resizing(self):
+        store = ColumnarStore()
+        for i in range(1000):
+            store[f"book-{i}"] = Book(f"Book {i}", "Ann", i, isbn=str(9780000000000 + i))
+            store[str(9780000000000 + i)] = Book(f"Book {i}", "Ann", i, isbn=str(9780000000000 + i))
+        for i in range(0, 1000, 2):
+            del store[f"book-{i}"]
+        assert len(store) == 1500
+        assert store["book-999"].price_cents == 999
+        assert "book-998" not in store
+        assert store["9780000000998"].title == "Book 998"
+        store["book-998"] = EMMA
+        assert store["book-998"] == EMMA
+        assert list(store)[:3] == ["9780000000000", "book-1", "9780000000001"]
+
+    def test_insert_delete_churn_reclaims_tombstones_and_rows(self):
+        store = ColumnarStore()
+        store["keep"] = Book("Keep", "Ann", 1, isbn="978-odd")
+        store["9780441013593"] = DUNE
+        for i in range(200):
+            store[f"churn-{i}"] = Book(f"Churn {i}", "Ann", i)
+            del store[f"churn-{i}"]
+        assert len(store._table) <= 16
+        assert store._count + store._tombstones <= len(store._table) // 2
+        assert len(store._live) < 10
+        assert list(store) == ["keep", "9780441013593"]
+        assert store["keep"].isbn == "978-odd"
+        assert store["9780441013593"] == DUNE
+        assert "churn-199" not in store
+
+    def test_repeated_updates_keep_title_bytes_bounded(self):
+        store = ColumnarStore()
+        for i in range(1000):
+            store[f"book-{i}"] = Book(f"Book number {i}", "Ann", i)
+        size = len(store._title_data)
+        for round in range(20):
+            for i in range(1000):
+                store[f"book-{i}"] = Book(f"Book number {i}", "Ann", i + round)
+        assert len(store._title_data) == size
+        for round in range(20):
+            for i in range(1000):
+                store[f"book-{i}"] = Book(f"Book number {i} {'x' * round}", "Ann", i)
+        assert len(store._title_data) <= 2 * sum(len(f"Book number {i} {'x' * 19}") for i in range(1000))
+        assert store["book-7"].title == f"Book number 7 {'x' * 19}"
+        store["book-7"] = Book("Short", "Ann", 1)
+        assert store["book-7"].title == "Short"
+        assert list(store)[:2] == ["book-0", "book-1"]
+
+    def test_too_many_genres_leaves_columns_aligned(self, monkeypatch):
+        monkeypatch.setattr("api.columnar._MAX_GENRE_ID", 2)
+        store = ColumnarStore()
+        store["a"] = Book("A", "Ann", 1, genre="FIC000000")
+        store["b"] = Book("B", "Ann", 1, genre="FIC028000")
+        with pytest.raises(ValueError, match="Too many distinct genres"):
+            store["c"] = Book("C", "Ann", 1, genre="BIO000000")
+        assert "c" not in store
+        assert len(store._prices) == len(store._genre_ids) == len(store._live) == 2
+        store["c"] = Book("C", "Ann", 1, genre="FIC000000")
+        assert store["c"].genre == "FIC000000"
+
+    def test_isbn_key_kept_when_isbn_changes(self):
+        store = ColumnarStore()
+        store["9780441013593"] = DUNE
+        store["9780441013593"] = EMMA
+        assert list(store) == ["9780441013593"]
+        assert store["9780441013593"] == EMMA
+
+    def test_bad_price_leaves_store_consistent(self):
+        store = ColumnarStore()
+        with pytest.raises(TypeError):
+            store["x"] = Book("X", "Ann", "free")
+        assert "x" not in store
+        store["y"] = EMMA
+        assert store["y"] == EMMA
+
+
+class TestCatalogOnColumnarStore:
+    @pytest.fixture(autouse=True)
+    def columnar_catalog(self):
+        original = catalog._books
+        catalog.use_store(ColumnarStore())
+        yield
+        catalog.use_store(original)
+
+    def test_catalog_operations(self):
+        catalog.create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        feed = io.StringIO("title,author,price_cents\nEmma,Jane Austen,999\n")
+        assert catalog.bulk_import(feed)["imported"] == 1
+        assert catalog.get_book("9780441013593")["price"] == "$16.99"
+        assert [b["title"] for b in catalog.list_books()] == ["Dune", "Emma"]
+        assert [b["title"] for b in catalog.search_books("austen", rank="relevance")] == ["Emma"]
+
+    def test_replacing_a_row_updates_indexes(self):
+        catalog.create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        catalog.create_book("Dune", "F. Herbert", 999, isbn="9780441013593")
+        assert catalog.books_by_author("Frank Herbert") == []
+        assert [b["price_cents"] for b in catalog.books_in_price_range(0)] == [999]
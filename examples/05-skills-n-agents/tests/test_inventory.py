@@ -1,15 +1,33 @@
 """Tests for the inventory API."""
 
+import threading
+
 import pytest
-from api.inventory import track_stock, check_availability, adjust_stock, _stock
+from api import inventory
+from api.inventory import (
+    track_stock,
+    check_availability,
+    adjust_stock,
+    adjust_stock_batch,
+    reserve_stock,
+    confirm_reservation,
+    release_reservation,
+    expire_reservations,
+    _stock,
+)
+
+
+def _clear():
+    for store in (_stock, inventory._reserved, inventory._reservations, inventory._expiry_heap):
+        store.clear()
 
 
 @pytest.fixture(autouse=True)
 def clear_stock():
     """Clear the in-memory stock store before each test."""
-    _stock.clear()
+    _clear()
     yield
-    _stock.clear()
+    _clear()
 
 
 class TestTrackStock:
@@ -51,3 +69,154 @@ class TestAdjustStock:
         track_stock("978-abc", 2)
         with pytest.raises(ValueError, match="Cannot remove"):
             adjust_stock("978-abc", -5)
+
+    def test_concurrent_decrements_do_not_oversell(self):
+        track_stock("978-abc", 1000)
+        sold = []
+
+        def worker():
+            for _ in range(300):
+                try:
+                    adjust_stock("978-abc", -1)
+                except ValueError:
+                    continue
+                sold.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(sold) == 1000
+        assert check_availability("978-abc")["quantity"] == 0
+
+
+class TestAdjustStockBatch:
+    def test_applies_all(self):
+        track_stock("978-a", 5)
+        track_stock("978-b", 2)
+        result = adjust_stock_batch([("978-a", -2), ("978-b", -1), ("978-a", -1), ("978-c", 4)])
+        assert result["status"] == "adjusted"
+        assert result["items"] == [
+            {"book_key": "978-a", "quantity": 2},
+            {"book_key": "978-b", "quantity": 1},
+            {"book_key": "978-c", "quantity": 4},
+        ]
+
+    def test_all_or_nothing(self):
+        track_stock("978-a", 5)
+        track_stock("978-b", 1)
+        with pytest.raises(ValueError, match="Cannot remove 2 copies of 978-b"):
+            adjust_stock_batch([("978-a", -3), ("978-b", -2)])
+        assert _stock == {"978-a": 5, "978-b": 1}
+
+    def test_concurrent_batches_stay_consistent(self):
+        keys = [f"978-{i}" for i in range(10)]
+        for key in keys:
+            track_stock(key, 500)
+
+        def worker(seed):
+            for i in range(200):
+                order = [(keys[(seed + i) % 10], -1), (keys[(seed * 3 + i) % 10], -1)]
+                adjust_stock_batch(order)
+                adjust_stock_batch([(key, -delta) for key, delta in order])
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(_stock[key] == 500 for key in keys)
+
+
+class TestReservations:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(inventory, "_clock", lambda: now[0])
+        return now
+
+    def test_reserve_and_confirm(self, clock):
+        track_stock("978-abc", 5)
+        held = reserve_stock("978-abc", 3)
+        assert held["status"] == "reserved"
+        assert check_availability("978-abc") == {
+            "book_key": "978-abc", "quantity": 5, "reserved": 3, "available": True,
+        }
+        result = confirm_reservation(held["reservation_id"])
+        assert result["quantity"] == 2
+        assert check_availability("978-abc")["reserved"] == 0
+        with pytest.raises(ValueError, match="Reservation not found"):
+            confirm_reservation(held["reservation_id"])
+
+    def test_release(self, clock):
+        track_stock("978-abc", 1)
+        held = reserve_stock("978-abc", 1)
+        assert check_availability("978-abc")["available"] is False
+        assert release_reservation(held["reservation_id"])["status"] == "released"
+        assert check_availability("978-abc") == {
+            "book_key": "978-abc", "quantity": 1, "reserved": 0, "available": True,
+        }
+
+    def test_cannot_overbook(self, clock):
+        track_stock("978-abc", 4)
+        reserve_stock("978-abc", 3)
+        with pytest.raises(ValueError, match="only 1 available"):
+            reserve_stock("978-abc", 2)
+        with pytest.raises(ValueError, match=r"\(3 reserved\)"):
+            adjust_stock("978-abc", -2)
+        with pytest.raises(ValueError, match="below the 3 reserved"):
+            track_stock("978-abc", 2)
+        assert adjust_stock("978-abc", -1)["quantity"] == 3
+
+    def test_expiry(self, clock):
+        track_stock("978-abc", 2)
+        first = reserve_stock("978-abc", 1, ttl=10)
+        second = reserve_stock("978-abc", 1, ttl=60)
+        release_reservation(second["reservation_id"])
+        clock[0] += 30
+        assert check_availability("978-abc")["reserved"] == 0
+        with pytest.raises(ValueError, match="Reservation not found"):
+            confirm_reservation(first["reservation_id"])
+        clock[0] += 60
+        assert expire_reservations() == 0
+        assert inventory._expiry_heap == []
+
+    def test_expired_hold_cannot_be_confirmed(self, clock):
+        track_stock("978-abc", 2)
+        held = reserve_stock("978-abc", 2, ttl=5)
+        clock[0] += 5
+        with pytest.raises(ValueError, match="Reservation expired"):
+            confirm_reservation(held["reservation_id"])
+        assert _stock["978-abc"] == 2
+        assert inventory._reserved == {}
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="Quantity must be positive"):
+            reserve_stock("978-abc", 0)
+        with pytest.raises(ValueError, match="TTL must be positive"):
+            reserve_stock("978-abc", 1, ttl=0)
+
+    def test_concurrent_checkouts_do_not_oversell(self):
+        track_stock("978-abc", 500)
+        confirmed = []
+
+        def worker():
+            for i in range(200):
+                try:
+                    held = reserve_stock("978-abc", 1)
+                except ValueError:
+                    continue
+                if i % 2:
+                    release_reservation(held["reservation_id"])
+                else:
+                    confirm_reservation(held["reservation_id"])
+                    confirmed.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _stock["978-abc"] == 500 - len(confirmed)
+        assert inventory._reserved == {}
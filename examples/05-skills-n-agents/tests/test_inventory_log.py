@@ -0,0 +1,101 @@
+"""Tests for the inventory event log and recovery."""
+
+import os
+import struct
+
+import pytest
+from api import inventory
+from api.inventory_log import ADJUST, BATCH, EVENTS_FILE, EventLog
+
+
+@pytest.fixture(autouse=True)
+def clear_stock():
+    inventory._stock.clear()
+    yield
+    inventory.use_event_log(None)
+    inventory._stock.clear()
+
+
+def events_size(directory) -> int:
+    return os.path.getsize(os.path.join(directory, EVENTS_FILE))
+
+
+class TestEventLog:
+    def test_recovers_stock(self, tmp_path):
+        log = EventLog(str(tmp_path))
+        inventory.use_event_log(log)
+        inventory.track_stock("978-a", 10)
+        inventory.adjust_stock("978-a", -3)
+        inventory.adjust_stock_batch([("978-a", -2), ("978-b", 5)])
+        held = inventory.reserve_stock("978-b", 2)
+        inventory.confirm_reservation(held["reservation_id"])
+        expected = dict(inventory._stock)
+        assert expected == {"978-a": 5, "978-b": 3}
+        log.close()
+
+        inventory._stock.clear()
+        reopened = EventLog(str(tmp_path))
+        assert reopened.events == 5
+        assert inventory.use_event_log(reopened) == {"status": "loaded", "books": 2}
+        assert inventory._stock == expected
+        reopened.close()
+
+    def test_rejected_changes_are_not_logged(self, tmp_path):
+        log = EventLog(str(tmp_path))
+        inventory.use_event_log(log)
+        inventory.track_stock("978-a", 1)
+        with pytest.raises(ValueError):
+            inventory.adjust_stock("978-a", -2)
+        with pytest.raises(ValueError):
+            inventory.adjust_stock_batch([("978-a", -1), ("978-b", -1)])
+        assert log.events == 1
+        log.close()
+
+    def test_snapshot_then_tail(self, tmp_path):
+        log = EventLog(str(tmp_path), snapshot_every=4)
+        for i in range(10):
+            log.record_adjust(f"978-{i % 3}", i)
+        log.record_set("978-0", 100)
+        log.close()
+        # The log keeps every event even after snapshots.
+        assert events_size(tmp_path) == 11 * 13
+
+        reopened = EventLog(str(tmp_path))
+        assert reopened._snapshot_events == 8
+        assert reopened.events == 11
+        assert reopened.stock() == {"978-0": 100, "978-1": 1 + 4 + 7, "978-2": 2 + 5 + 8}
+        reopened.close()
+
+    def test_torn_record_is_dropped(self, tmp_path):
+        log = EventLog(str(tmp_path))
+        log.record_set("978-a", 7)
+        log.close()
+        with open(tmp_path / EVENTS_FILE, "ab") as f:
+            f.write(b"\x02\x00\x00")
+
+        reopened = EventLog(str(tmp_path))
+        assert reopened.stock() == {"978-a": 7}
+        assert events_size(tmp_path) == 13
+        reopened.record_adjust("978-a", 1)
+        reopened.close()
+        assert EventLog(str(tmp_path)).stock() == {"978-a": 8}
+
+    def test_torn_batch_is_dropped(self, tmp_path):
+        log = EventLog(str(tmp_path))
+        log.record_batch({"978-a": 3, "978-b": 4})
+        log.close()
+        with open(tmp_path / EVENTS_FILE, "ab") as f:
+            f.write(struct.pack("<BIq", BATCH, 0, -3))
+
+        reopened = EventLog(str(tmp_path))
+        assert reopened.stock() == {"978-a": 3, "978-b": 4}
+        assert reopened.events == 2
+        assert events_size(tmp_path) == 2 * 13
+        reopened.close()
+
+    def test_batch_layout(self, tmp_path):
+        log = EventLog(str(tmp_path))
+        log.record_batch({"978-a": 1, "978-b": 2, "978-c": 3})
+        log.close()
+        data = (tmp_path / EVENTS_FILE).read_bytes()
+        assert [kind for kind, _, _ in struct.iter_unpack("<BIq", data)] == [BATCH, BATCH, ADJUST]
@@ -0,0 +1,47 @@
+"""Tests for price formatting."""
+
+from array import array
+
+import pytest
+from models.book import Book
+from utils.prices import PriceFormatter, format_price, format_prices
+
+
+class TestPriceFormatter:
+    def test_default_matches_historical_format(self):
+        for cents in (0, 5, 99, 100, 1499, 123456):
+            assert format_price(cents) == f"${cents // 100}.{cents % 100:02d}"
+        assert Book("Dune", "Frank Herbert", 1699).price_display() == "$16.99"
+
+    @pytest.mark.parametrize("currency, locale, expected", [
+        ("USD", "en_US", "$1,234,567.89"),
+        ("GBP", "en_GB", "£1,234,567.89"),
+        ("EUR", "de_DE", "1.234.567,89\u00a0€"),
+        ("EUR", "fr_FR", "1\u202f234\u202f567,89\u00a0€"),
+        ("JPY", "ja_JP", "¥123,456,789"),
+    ])
+    def test_locales(self, currency, locale, expected):
+        assert PriceFormatter(currency, locale).format(123456789) == expected
+
+    def test_negative(self):
+        assert PriceFormatter().format(-1999) == "-$19.99"
+
+    def test_format_many(self):
+        prices = array("q", [1499, 999, 1499, 0, 999])
+        assert format_prices(prices) == [format_price(p) for p in prices]
+        assert format_prices(iter([5, 5])) == ["$0.05", "$0.05"]
+
+    def test_format_many_beyond_cache(self, monkeypatch):
+        monkeypatch.setattr("utils.prices.CACHE_SIZE", 2)
+        formatter = PriceFormatter("EUR", "de_DE")
+        assert formatter.format_many([100, 200, 300, 100, 400]) == [
+            "1,00\u00a0€", "2,00\u00a0€", "3,00\u00a0€", "1,00\u00a0€", "4,00\u00a0€",
+        ]
+        assert len(formatter._cache) == 2
+        assert formatter.format(500) == "5,00\u00a0€"
+
+    def test_unknown_currency_or_locale(self):
+        with pytest.raises(ValueError, match="Unknown currency"):
+            PriceFormatter("XYZ")
+        with pytest.raises(ValueError, match="Unknown locale"):
+            PriceFormatter("USD", "xx_XX")
@@ -0,0 +1,77 @@
+"""Tests for the book and author serializers."""
+
+import io
+import json
+from dataclasses import asdict
+
+import pytest
+from api.catalog import _to_dict
+from models.author import Author
+from models.book import Book
+from utils.serializers import dump_author, dump_book, dump_books, write_books
+
+BOOKS = [
+    Book("Dune", "Frank Herbert", 1699, "9780441013593", "FIC028000"),
+    Book('The "Quoted" Title\n', "Stanisław Lem", 0),
+    Book("x" * 40, "Ёжик", 123456789, genre="FIC000000"),
+]
+
+
+def dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class TestJson:
+    def test_book_matches_to_dict(self):
+        for book in BOOKS:
+            assert dump_book(book) == dumps(_to_dict(book))
+
+    def test_author(self):
+        author = Author("Ursula K. Le Guin", 'Wrote "Earthsea"', ["9780547773742", "9780441478125"])
+        assert dump_author(author) == dumps(asdict(author))
+        assert json.loads(dump_author(Author("Anon"))) == {"name": "Anon", "bio": "", "book_isbns": []}
+
+    def test_dump_books(self):
+        assert dump_books(BOOKS) == dumps([_to_dict(book) for book in BOOKS])
+        assert dump_books([]) == b"[]"
+
+    def test_write_books_streams_batches(self, monkeypatch):
+        monkeypatch.setattr("utils.serializers.WRITE_BATCH_SIZE", 2)
+        out = io.BytesIO()
+        assert write_books(out, iter(BOOKS * 3)) == 9
+        assert json.loads(out.getvalue()) == [_to_dict(book) for book in BOOKS * 3]
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="Unknown serialization format"):
+            dump_book(BOOKS[0], format="xml")
+
+
+class TestMsgpack:
+    def test_book_bytes(self):
+        assert dump_book(Book("Dune", "Frank Herbert", 1699), format="msgpack") == (
+            b"\x86"
+            b"\xa5title\xa4Dune"
+            b"\xa6author\xadFrank Herbert"
+            b"\xa5price\xa6$16.99"
+            b"\xabprice_cents\xcd\x06\xa3"
+            b"\xa4isbn\xc0"
+            b"\xa5genre\xc0"
+        )
+
+    def test_author_bytes(self):
+        assert dump_author(Author("Lem", "", ["9780156027601"]), format="msgpack") == (
+            b"\x83\xa4name\xa3Lem\xa3bio\xa0\xaabook_isbns\x91\xad9780156027601"
+        )
+
+    def test_sizes(self):
+        packed = dump_book(Book("x" * 40, "a", -1_000_000), format="msgpack")
+        assert b"\xd9\x28" + b"x" * 40 in packed
+        assert b"\xd2\xff\xf0\xbd\xc0" in packed
+        assert dump_books([Book("t", "a", 1)] * 20, format="msgpack")[:3] == b"\xdc\x00\x14"
+
+    def test_matches_msgpack_package(self):
+        msgpack = pytest.importorskip("msgpack")
+        assert msgpack.unpackb(dump_books(BOOKS, format="msgpack")) == [_to_dict(book) for book in BOOKS]
+        out = io.BytesIO()
+        write_books(out, iter(BOOKS), format="msgpack")
+        assert msgpack.unpackb(out.getvalue()) == [_to_dict(book) for book in BOOKS]
@@ -0,0 +1,141 @@
+"""Tests for the persistent catalog storage backends."""
+
+import os
+
+import pytest
+from api import catalog
+from api.storage import SNAPSHOT_FILE, SQLiteStore, WALStore, WAL_FILE
+from models.book import Book
+
+DUNE = Book("Dune", "Frank Herbert", 1699, isbn="9780441013593", genre="FIC028000")
+EMMA = Book("Emma", "Jane Austen", 999)
+
+
+@pytest.fixture(params=["wal", "sqlite"])
+def open_store(request, tmp_path):
+    """Return a factory that (re)opens the same store, closing old handles."""
+    opened = []
+
+    def factory(**kwargs):
+        if request.param == "wal":
+            store = WALStore(str(tmp_path / "catalog"), **kwargs)
+        else:
+            store = SQLiteStore(str(tmp_path / "catalog.sqlite"))
+        opened.append(store)
+        return store
+
+    yield factory
+    for store in opened:
+        store.close()
+
+
+class TestStores:
+    def test_round_trip_across_reopen(self, open_store):
+        store = open_store()
+        store["dune"] = DUNE
+        store["emma"] = EMMA
+        store.close()
+        reopened = open_store()
+        assert reopened["dune"] == DUNE
+        assert list(reopened) == ["dune", "emma"]
+        assert len(reopened) == 2
+
+    def test_overwrite_keeps_position(self, open_store):
+        store = open_store()
+        store["dune"] = DUNE
+        store["emma"] = EMMA
+        store["dune"] = Book("Dune", "Frank Herbert", 999)
+        store.close()
+        reopened = open_store()
+        assert list(reopened) == ["dune", "emma"]
+        assert reopened["dune"].price_cents == 999
+
+    def test_delete(self, open_store):
+        store = open_store()
+        store["dune"] = DUNE
+        del store["dune"]
+        with pytest.raises(KeyError):
+            del store["dune"]
+        store.close()
+        assert "dune" not in open_store()
+
+    def test_missing_key(self, open_store):
+        store = open_store()
+        assert store.get("nope") is None
+        with pytest.raises(KeyError):
+            store["nope"]
+
+
+class TestWALStore:
+    def test_snapshot_compacts_log(self, tmp_path):
+        store = WALStore(str(tmp_path), snapshot_every=3)
+        for i in range(7):
+            store[f"k{i}"] = EMMA
+        store.close()
+        assert os.path.getsize(tmp_path / WAL_FILE) > 0  # one record since the last snapshot
+        assert len(WALStore(str(tmp_path))) == 7
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        store = WALStore(str(tmp_path), snapshot_every=0)
+        store["dune"] = DUNE
+        store.close()
+        with open(tmp_path / WAL_FILE, "ab") as f:
+            f.write(b'["emma","Em')
+        reopened = WALStore(str(tmp_path))
+        assert list(reopened) == ["dune"]
+        reopened["emma"] = EMMA
+        reopened.close()
+        assert list(WALStore(str(tmp_path))) == ["dune", "emma"]
+
+    def test_record_torn_before_its_newline_is_discarded(self, tmp_path):
+        store = WALStore(str(tmp_path), snapshot_every=0)
+        store["a"] = EMMA
+        store.close()
+        with open(tmp_path / WAL_FILE, "ab") as f:
+            f.write(b'["b","Emma","Jane Austen",999,null,null]')
+        reopened = WALStore(str(tmp_path))
+        assert list(reopened) == ["a"]
+        reopened["c"] = EMMA
+        reopened["d"] = EMMA
+        reopened.close()
+        assert list(WALStore(str(tmp_path))) == ["a", "c", "d"]
+
+    def test_snapshot_read_in_blocks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("api.storage.SNAPSHOT_READ_SIZE", 7)
+        store = WALStore(str(tmp_path), snapshot_every=0)
+        for i in range(5):
+            store[f"k{i}"] = Book(f"Title {i}\nwith a newline", "Ann", i)
+        store.snapshot()
+        store.close()
+        with open(tmp_path / SNAPSHOT_FILE, "rb+") as f:
+            f.truncate(os.path.getsize(tmp_path / SNAPSHOT_FILE) - 1)  # no final newline
+        reopened = WALStore(str(tmp_path))
+        assert list(reopened) == [f"k{i}" for i in range(5)]
+        assert reopened["k4"].title == "Title 4\nwith a newline"
+
+
+class TestCatalogUseStore:
+    @pytest.fixture(autouse=True)
+    def restore_store(self):
+        original = catalog._books
+        yield
+        catalog.use_store(original)
+
+    def test_catalog_survives_restart(self, tmp_path):
+        catalog.use_store(WALStore(str(tmp_path)))
+        catalog.create_book("Dune", "Frank Herbert", 1699, isbn="9780441013593")
+        catalog._books.close()
+
+        result = catalog.use_store(WALStore(str(tmp_path)))
+        assert result == {"status": "loaded", "books": 1}
+        assert catalog.get_book("9780441013593")["title"] == "Dune"
+        assert [b["title"] for b in catalog.search_books("herbert")] == ["Dune"]
+        catalog._books.close()
+
+    def test_sqlite_backend(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "books.sqlite"))
+        catalog.use_store(store)
+        catalog.create_book("Emma", "Jane Austen", 999)
+        assert [b["title"] for b in catalog.list_books()] == ["Emma"]
+        assert catalog.search_books("austen", limit=1)[0]["title"] == "Emma"
+        store.close()
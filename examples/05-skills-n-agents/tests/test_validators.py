@@ -0,0 +1,47 @@
+"""Tests for the batch ISBN validator."""
+
+import random
+
+from utils.validators import (
+    ISBN_BAD_CHECK_DIGIT,
+    ISBN_BAD_LENGTH,
+    ISBN_BAD_PREFIX,
+    ISBN_NOT_A_STRING,
+    ISBN_NOT_DIGITS,
+    ISBN_OK,
+    validate_isbn,
+    validate_isbns,
+)
+
+
+def check_digit_ok(isbn: str) -> bool:
+    return sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(isbn)) % 10 == 0
+
+
+class TestValidateIsbns:
+    def test_error_codes(self):
+        isbns = [
+            "9780441013593",
+            "9780441013594",
+            "97804410135x3",
+            "978044101359",
+            "9770441013593",
+            None,
+            "978044101359٣",
+        ]
+        mask, codes = validate_isbns(isbns)
+        assert mask == [True, False, False, False, False, False, False]
+        assert list(codes) == [
+            ISBN_OK, ISBN_BAD_CHECK_DIGIT, ISBN_NOT_DIGITS, ISBN_BAD_LENGTH,
+            ISBN_BAD_PREFIX, ISBN_NOT_A_STRING, ISBN_NOT_DIGITS,
+        ]
+
+    def test_empty(self):
+        assert validate_isbns([]) == ([], b"")
+
+    def test_matches_scalar_check(self):
+        rng = random.Random(21)
+        isbns = [rng.choice(["978", "979", "977"]) + f"{rng.randrange(10**10):010d}" for _ in range(5000)]
+        mask, _ = validate_isbns(isbns)
+        assert mask == [validate_isbn(isbn) and check_digit_ok(isbn) for isbn in isbns]
+        assert any(mask) and not all(mask)
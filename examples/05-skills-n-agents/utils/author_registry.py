@@ -0,0 +1,128 @@
+"""Registry of catalog authors with reverse indexes.
+
+Catalog books name their author as free text. The registry interns each
+distinct name once and gives it a small integer id, and the reverse
+indexes store those ids instead of repeating the name:
+
+- author → catalog positions (see ``TrigramIndex.position``), in a
+  ``HashIndex`` keyed by author id, so an author's books come out in
+  catalog order and page like ``books_by_author`` always has;
+- ISBN → author id, with ISBN-13s held as integers.
+
+Both lookups are a dict access. Ids are never reused: an author whose
+last book is replaced keeps their id and simply has no positions.
+"""
+
+import sys
+from collections.abc import Iterator
+
+from utils.field_index import HashIndex
+
+
+class AuthorRegistry:
+    """Interned author names with ISBN and catalog-position indexes."""
+
+    def __init__(self) -> None:
+        self._names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._positions = HashIndex()
+        self._isbn_authors: dict[int | str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        """Return the id of ``name``, registering it if it is new.
+
+        Args:
+            name: Author name, matched exactly.
+
+        Returns:
+            The author's integer id.
+        """
+        author_id = self._ids.get(name)
+        if author_id is None:
+            author_id = len(self._names)
+            name = sys.intern(name)
+            self._names.append(name)
+            self._ids[name] = author_id
+        return author_id
+
+    def id_of(self, name: str) -> int | None:
+        """Return the id of ``name``, or None if it was never registered."""
+        return self._ids.get(name)
+
+    def name(self, author_id: int) -> str:
+        """Return the name registered under ``author_id``.
+
+        Raises:
+            IndexError: If no author has that id.
+        """
+        return self._names[author_id]
+
+    def add(self, position: int, name: str, isbn: str | None = None) -> None:
+        """Record that the entry at ``position`` is by ``name``.
+
+        Args:
+            position: Catalog position of the entry.
+            name: Author name.
+            isbn: The entry's ISBN, if it has one.
+        """
+        author_id = self.intern(name)
+        self._positions.add(author_id, position)
+        if isbn is not None:
+            self._isbn_authors[_isbn_key(isbn)] = author_id
+
+    def remove(self, position: int, name: str, isbn: str | None = None) -> None:
+        """Forget an entry recorded by ``add``; unknown entries are ignored.
+
+        Args:
+            position: Catalog position of the entry.
+            name: Author name it was recorded with.
+            isbn: The ISBN it was recorded with, if any.
+        """
+        author_id = self._ids.get(name)
+        if author_id is None:
+            return
+        self._positions.remove(author_id, position)
+        if isbn is not None:
+            key = _isbn_key(isbn)
+            if self._isbn_authors.get(key) == author_id:
+                del self._isbn_authors[key]
+
+    def clear(self) -> None:
+        """Remove every author and entry."""
+        self._names.clear()
+        self._ids.clear()
+        self._positions.clear()
+        self._isbn_authors.clear()
+
+    def author_of(self, isbn: str) -> str | None:
+        """Return the name of the author of ``isbn``, or None if unknown."""
+        author_id = self._isbn_authors.get(_isbn_key(isbn))
+        return None if author_id is None else self._names[author_id]
+
+    def count(self, name: str) -> int:
+        """Return how many entries are by ``name``."""
+        author_id = self._ids.get(name)
+        return 0 if author_id is None else self._positions.count(author_id)
+
+    def lookup(self, name: str, after: int = -1) -> Iterator[int]:
+        """Yield positions of entries by ``name``, in catalog order.
+
+        Args:
+            name: Author name, matched exactly.
+            after: Only yield positions greater than this.
+
+        Returns:
+            Iterator of positions.
+        """
+        author_id = self._ids.get(name)
+        if author_id is None:
+            return iter(())
+        return self._positions.lookup(author_id, after)
+
+
+def _isbn_key(isbn: str) -> int | str:
+    """Hold ISBN-13s as integers; anything else is kept as given."""
+    return int(isbn) if len(isbn) == 13 and isbn.isascii() and isbn.isdigit() else isbn
@@ -0,0 +1,164 @@
+"""Streaming readers for publisher catalog feeds.
+
+Each reader takes an open stream and yields one tuple per record:
+``(row, title, author, price_cents, isbn, genre)``. ``row`` is the 1-based
+record number used in error reports. Field values are passed through as
+read, and checked later by the importer. A record that cannot be read at
+all is yielded as ``(row, error_message)`` instead.
+
+Supported formats:
+
+- ``csv``: a header row naming ``title``, ``author`` and ``price_cents``,
+  plus optional ``isbn`` and ``genre`` columns.
+- ``ndjson``: one JSON object per line with the same field names.
+- ``onix``: ONIX for Books 3.0 ``<Product>`` records (reference tags).
+  Prices are read from ``PriceAmount`` and converted to cents.
+"""
+
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from decimal import Decimal, InvalidOperation
+from typing import IO
+
+FEED_FORMATS = ("csv", "ndjson", "onix")
+FEED_FIELDS = ("title", "author", "price_cents", "isbn", "genre")
+REQUIRED_FIELDS = ("title", "author", "price_cents")
+
+# ONIX code list values
+_ONIX_ISBN13 = "15"
+_ONIX_BISAC = "10"
+
+
+def iter_feed(stream: IO, format: str) -> Iterator[tuple]:
+    """Yield raw records from a feed stream.
+
+    Args:
+        stream: Text or binary stream (binary input is read as UTF-8).
+        format: One of ``FEED_FORMATS``.
+
+    Returns:
+        Iterator of ``(row, title, author, price_cents, isbn, genre)``
+        tuples, or ``(row, error)`` for unreadable records.
+
+    Raises:
+        ValueError: If the format is unknown or a CSV header lacks a
+            required column.
+    """
+    if format == "csv":
+        return _iter_csv(_text_stream(stream))
+    if format == "ndjson":
+        return _iter_ndjson(stream)
+    if format == "onix":
+        return _iter_onix(stream)
+    raise ValueError(f"Unknown feed format: {format}")
+
+
+def _text_stream(stream: IO) -> IO[str]:
+    if isinstance(stream.read(0), bytes):
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    return stream
+
+
+def _iter_csv(stream: IO[str]) -> Iterator[tuple]:
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return iter(())
+    columns = [name.strip().lower() for name in header]
+    missing = [name for name in REQUIRED_FIELDS if name not in columns]
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+
+    positions = [columns.index(name) if name in columns else None for name in FEED_FIELDS]
+    width = len(columns)
+    return _csv_records(reader, positions, width)
+
+
+def _csv_records(reader, positions: list[int | None], width: int) -> Iterator[tuple]:
+    title_at, author_at, price_at, isbn_at, genre_at = positions
+    for row, fields in enumerate(reader, 1):
+        if len(fields) != width:
+            if not fields:
+                continue
+            yield row, f"Expected {width} columns, got {len(fields)}"
+            continue
+        yield (
+            row,
+            fields[title_at],
+            fields[author_at],
+            fields[price_at],
+            fields[isbn_at] or None if isbn_at is not None else None,
+            fields[genre_at] or None if genre_at is not None else None,
+        )
+
+
+def _iter_ndjson(stream: IO) -> Iterator[tuple]:
+    row = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object"
+            continue
+        get = record.get
+        yield row, get("title"), get("author"), get("price_cents"), get("isbn"), get("genre")
+
+
+def _iter_onix(stream: IO) -> Iterator[tuple]:
+    row = 0
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end" or _local_name(element.tag) != "Product":
+            continue
+        row += 1
+        yield _onix_product(row, element)
+        # Drop finished products so memory stays flat on large feeds.
+        root.clear()
+
+
+def _onix_product(row: int, product: ET.Element) -> tuple:
+    isbn = title = author = genre = None
+    price_cents = None
+    for element in product.iter():
+        tag = _local_name(element.tag)
+        if tag == "ProductIdentifier" and _child_text(element, "ProductIDType") == _ONIX_ISBN13:
+            isbn = _child_text(element, "IDValue")
+        elif tag == "TitleText" and title is None:
+            title = (element.text or "").strip()
+        elif tag == "PersonName" and author is None:
+            author = (element.text or "").strip()
+        elif tag == "Subject" and genre is None and _child_text(element, "SubjectSchemeIdentifier") == _ONIX_BISAC:
+            genre = _child_text(element, "SubjectCode")
+        elif tag == "PriceAmount" and price_cents is None:
+            try:
+                amount = Decimal((element.text or "").strip())
+            except InvalidOperation:
+                amount = None
+            # NaN and Infinity parse as Decimals but have no integer value.
+            if amount is None or not amount.is_finite():
+                return row, f"Invalid PriceAmount: {element.text!r}"
+            price_cents = int(amount * 100)
+    return row, title, author, price_cents, isbn, genre
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _child_text(element: ET.Element, name: str) -> str | None:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip()
+    return None
+
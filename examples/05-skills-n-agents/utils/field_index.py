@@ -0,0 +1,184 @@
+"""Secondary indexes over catalog fields.
+
+Both indexes store catalog positions (see ``TrigramIndex.position``) rather
+than keys, so results come out in catalog order and can be paged with the
+same position-based cursors as ``list_books``.
+
+- ``HashIndex`` maps each field value to the sorted positions holding it,
+  for exact-match lookups such as "all books by this author".
+- ``SortedIndex`` keeps ``(value, position)`` pairs in order, for range
+  lookups such as "books between $10 and $20".
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Hashable, Iterator
+from itertools import islice
+
+# Pairs per SortedIndex block before it is split in two
+BLOCK_SIZE = 1000
+
+
+class HashIndex:
+    """Exact-match index from a field value to catalog positions.
+
+    Positions for each value are kept sorted in an array. New catalog
+    entries always have the highest position, so adding one is an append.
+    """
+
+    def __init__(self) -> None:
+        self._positions: dict[Hashable, array] = {}
+
+    def add(self, value: Hashable, position: int) -> None:
+        """Record that the entry at ``position`` has ``value``.
+
+        Args:
+            value: Field value.
+            position: Catalog position of the entry.
+        """
+        positions = self._positions.get(value)
+        if positions is None:
+            self._positions[value] = array("i", (position,))
+        elif positions[-1] < position:
+            positions.append(position)
+        else:
+            at = bisect_left(positions, position)
+            if at == len(positions) or positions[at] != position:
+                positions.insert(at, position)
+
+    def remove(self, value: Hashable, position: int) -> None:
+        """Forget that the entry at ``position`` has ``value``; unknown pairs are ignored.
+
+        Args:
+            value: Field value.
+            position: Catalog position of the entry.
+        """
+        positions = self._positions.get(value)
+        if positions is None:
+            return
+        at = bisect_left(positions, position)
+        if at < len(positions) and positions[at] == position:
+            del positions[at]
+            if not positions:
+                del self._positions[value]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._positions.clear()
+
+    def count(self, value: Hashable) -> int:
+        """Return how many entries have ``value``."""
+        positions = self._positions.get(value)
+        return 0 if positions is None else len(positions)
+
+    def lookup(self, value: Hashable, after: int = -1) -> Iterator[int]:
+        """Yield positions of entries with ``value``, in catalog order.
+
+        Args:
+            value: Field value to match exactly.
+            after: Only yield positions greater than this.
+
+        Returns:
+            Iterator of positions.
+        """
+        positions = self._positions.get(value)
+        if positions is None:
+            return iter(())
+        return islice(positions, bisect_right(positions, after), None)
+
+
+class SortedIndex:
+    """Ordered index of ``(value, position)`` pairs for range lookups.
+
+    Pairs are kept in blocks of at most ``2 * BLOCK_SIZE`` sorted entries,
+    with each block's largest pair in a separate list, so an insert or
+    removal costs a binary search plus a shift within one block instead of
+    a shift of the whole index.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: list[list[tuple]] = []
+        self._maxes: list[tuple] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, value, position: int) -> None:
+        """Insert the pair ``(value, position)``.
+
+        Args:
+            value: Field value; values must be mutually comparable.
+            position: Catalog position of the entry.
+        """
+        pair = (value, position)
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([pair])
+            maxes.append(pair)
+        else:
+            i = bisect_left(maxes, pair)
+            if i == len(maxes):
+                i -= 1
+                blocks[i].append(pair)
+                maxes[i] = pair
+            else:
+                insort(blocks[i], pair)
+            block = blocks[i]
+            if len(block) > 2 * BLOCK_SIZE:
+                blocks.insert(i + 1, block[BLOCK_SIZE:])
+                del block[BLOCK_SIZE:]
+                maxes.insert(i, block[-1])
+        self._len += 1
+
+    def remove(self, value, position: int) -> None:
+        """Remove the pair ``(value, position)``; unknown pairs are ignored.
+
+        Args:
+            value: Field value.
+            position: Catalog position of the entry.
+        """
+        pair = (value, position)
+        maxes = self._maxes
+        i = bisect_left(maxes, pair)
+        if i == len(maxes):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, pair)
+        if block[j] != pair:
+            return
+        del block[j]
+        self._len -= 1
+        if block:
+            maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del maxes[i]
+
+    def clear(self) -> None:
+        """Remove every pair."""
+        self._blocks.clear()
+        self._maxes.clear()
+        self._len = 0
+
+    def range(self, low: tuple, high) -> Iterator[tuple]:
+        """Yield pairs from ``low`` (exclusive) up to values of ``high`` (inclusive).
+
+        Args:
+            low: Pair to start after; ``(value, -1)`` starts at ``value``.
+            high: Largest value to include, or None for no upper bound.
+
+        Returns:
+            Iterator of ``(value, position)`` pairs in order.
+        """
+        blocks = self._blocks
+        i = bisect_right(self._maxes, low)
+        if i == len(blocks):
+            return
+        j = bisect_right(blocks[i], low)
+        for block in blocks[i:]:
+            for pair in islice(block, j, None):
+                if high is not None and pair[0] > high:
+                    return
+                yield pair
+            j = 0
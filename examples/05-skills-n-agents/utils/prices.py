@@ -0,0 +1,109 @@
+"""Price formatting for single prices and whole columns of prices.
+
+Catalogs repeat a small number of distinct prices, so each
+``PriceFormatter`` caches the string it renders for every price it has
+seen. ``format_many`` renders each distinct price in a column once and
+then maps the whole column through the cache.
+
+Prices are integers in the currency's minor unit (cents for USD).
+"""
+
+from collections.abc import Iterable, Sequence
+
+# Currency code → (symbol, digits after the decimal separator)
+CURRENCIES = {
+    "USD": ("$", 2),
+    "EUR": ("€", 2),
+    "GBP": ("£", 2),
+    "JPY": ("¥", 0),
+}
+
+# Locale → (pattern, decimal separator, thousands separator)
+LOCALES = {
+    "en_US": ("{symbol}{amount}", ".", ","),
+    "en_GB": ("{symbol}{amount}", ".", ","),
+    "de_DE": ("{amount}\u00a0{symbol}", ",", "."),
+    "fr_FR": ("{amount}\u00a0{symbol}", ",", "\u202f"),
+    "ja_JP": ("{symbol}{amount}", ".", ","),
+}
+
+# Without a locale: "$1234.56", the catalog's historical format
+_PLAIN = ("{symbol}{amount}", ".", "")
+
+# Distinct prices cached per formatter
+CACHE_SIZE = 100_000
+
+
+class PriceFormatter:
+    """Formats prices for one currency and locale, caching each result.
+
+    Args:
+        currency: Code from ``CURRENCIES``.
+        locale: Name from ``LOCALES``, or None for the plain "$1234.56"
+            style with no thousands separator.
+
+    Raises:
+        ValueError: If the currency or locale is unknown.
+    """
+
+    def __init__(self, currency: str = "USD", locale: str | None = None) -> None:
+        if currency not in CURRENCIES:
+            raise ValueError(f"Unknown currency: {currency}")
+        if locale is not None and locale not in LOCALES:
+            raise ValueError(f"Unknown locale: {locale}")
+        self.currency = currency
+        self.locale = locale
+        self._symbol, self._digits = CURRENCIES[currency]
+        self._pattern, self._decimal, self._group = _PLAIN if locale is None else LOCALES[locale]
+        self._cache: dict[int, str] = {}
+
+    def format(self, price: int) -> str:
+        """Return the display string for one price.
+
+        Args:
+            price: Price in minor units.
+
+        Returns:
+            Formatted price, e.g. "$12.99".
+        """
+        text = self._cache.get(price)
+        if text is None:
+            text = self._render(price)
+            if len(self._cache) < CACHE_SIZE:
+                self._cache[price] = text
+        return text
+
+    def format_many(self, prices: Iterable[int]) -> list[str]:
+        """Return the display strings for a column of prices.
+
+        Args:
+            prices: Prices in minor units, e.g. a list or an ``array``.
+
+        Returns:
+            List of formatted prices, in the same order.
+        """
+        if not isinstance(prices, Sequence):
+            prices = list(prices)
+        cache = self._cache
+        overflow = {}
+        for price in set(prices).difference(cache):
+            if len(cache) < CACHE_SIZE:
+                cache[price] = self._render(price)
+            else:
+                overflow[price] = self._render(price)
+        if overflow:
+            return [cache[price] if price in cache else overflow[price] for price in prices]
+        return list(map(cache.__getitem__, prices))
+
+    def _render(self, price: int) -> str:
+        units, minor = divmod(abs(price), 10 ** self._digits)
+        whole = f"{units:,}".replace(",", self._group) if self._group else str(units)
+        amount = f"{whole}{self._decimal}{minor:0{self._digits}d}" if self._digits else whole
+        text = self._pattern.format(symbol=self._symbol, amount=amount)
+        return "-" + text if price < 0 else text
+
+
+# Formatter behind Book.price_display and catalog responses
+_default = PriceFormatter()
+format_price = _default.format
+format_prices = _default.format_many
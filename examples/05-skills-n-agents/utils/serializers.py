@@ -0,0 +1,230 @@
+"""JSON and MessagePack encoders for books and authors.
+
+The encoders read the model slots directly and fill precomputed
+templates, so no intermediate dict is built and nothing is looked up
+by field name at encode time. A book encodes to the same JSON as
+``json.dumps`` of the catalog's book dict with compact separators and
+``ensure_ascii=False``, and to the equivalent MessagePack map (the
+small subset of the format needed here is written by hand, so the
+``msgpack`` package is not required).
+
+Supported formats:
+
+- ``json``: UTF-8 JSON; ``write_books`` streams a JSON array.
+- ``msgpack``: MessagePack maps; ``write_books`` writes one array.
+"""
+
+from collections.abc import Iterable, Sized
+from itertools import islice
+from json.encoder import encode_basestring
+from typing import IO
+
+from models.author import Author
+from models.book import Book
+from utils.prices import CACHE_SIZE, format_price
+
+SERIALIZE_FORMATS = ("json", "msgpack")
+
+# Books encoded before each write by write_books
+WRITE_BATCH_SIZE = 1000
+
+_BOOK_JSON = '{"title":%s,"author":%s,"price":"%s","price_cents":%d,"isbn":%s,"genre":%s}'
+_AUTHOR_JSON = '{"name":%s,"bio":%s,"book_isbns":[%s]}'
+
+# Price cents → packed "price" and "price_cents" map entries
+_price_entries: dict[int, bytes] = {}
+
+
+def dump_book(book: Book, format: str = "json") -> bytes:
+    """Encode one book.
+
+    Args:
+        book: The book to encode.
+        format: One of ``SERIALIZE_FORMATS``.
+
+    Returns:
+        The encoded book dict (title, author, price, price_cents, isbn,
+        genre).
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if format == "json":
+        return book_json(book).encode()
+    if format == "msgpack":
+        return _book_msgpack(book)
+    raise ValueError(f"Unknown serialization format: {format}")
+
+
+def dump_author(author: Author, format: str = "json") -> bytes:
+    """Encode one author.
+
+    Args:
+        author: The author to encode.
+        format: One of ``SERIALIZE_FORMATS``.
+
+    Returns:
+        The encoded author dict (name, bio, book_isbns).
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if format == "json":
+        isbns = ",".join(map(encode_basestring, author.book_isbns))
+        return (_AUTHOR_JSON % (encode_basestring(author.name), encode_basestring(author.bio), isbns)).encode()
+    if format == "msgpack":
+        parts = [_AUTHOR_MAP, _NAME, _pack_str(author.name), _BIO, _pack_str(author.bio), _BOOK_ISBNS]
+        parts.append(_pack_array_header(len(author.book_isbns)))
+        parts.extend(map(_pack_str, author.book_isbns))
+        return b"".join(parts)
+    raise ValueError(f"Unknown serialization format: {format}")
+
+
+def dump_books(books: Iterable[Book], format: str = "json") -> bytes:
+    """Encode books as one array.
+
+    Args:
+        books: Books to encode, in order.
+        format: One of ``SERIALIZE_FORMATS``.
+
+    Returns:
+        The encoded array.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if format == "json":
+        return ("[" + ",".join(map(book_json, books)) + "]").encode()
+    if format == "msgpack":
+        books = books if isinstance(books, Sized) else list(books)
+        return _pack_array_header(len(books)) + b"".join(map(_book_msgpack, books))
+    raise ValueError(f"Unknown serialization format: {format}")
+
+
+def write_books(stream: IO[bytes], books: Iterable[Book], format: str = "json") -> int:
+    """Write books to ``stream`` as one array, in batches.
+
+    JSON output is streamed, so memory use does not grow with the number
+    of books. A MessagePack array starts with its length, so an iterator
+    that is not ``Sized`` is read into a list first.
+
+    Args:
+        stream: Binary stream to write to.
+        books: Books to encode, in order.
+        format: One of ``SERIALIZE_FORMATS``.
+
+    Returns:
+        Number of books written.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if format == "json":
+        books = iter(books)
+        stream.write(b"[")
+        written = 0
+        while batch := list(islice(books, WRITE_BATCH_SIZE)):
+            text = ",".join(map(book_json, batch))
+            stream.write((text if not written else "," + text).encode())
+            written += len(batch)
+        stream.write(b"]")
+        return written
+    if format == "msgpack":
+        books = books if isinstance(books, Sized) else list(books)
+        stream.write(_pack_array_header(len(books)))
+        books = iter(books)
+        written = 0
+        while batch := list(islice(books, WRITE_BATCH_SIZE)):
+            stream.write(b"".join(map(_book_msgpack, batch)))
+            written += len(batch)
+        return written
+    raise ValueError(f"Unknown serialization format: {format}")
+
+
+def book_json(book: Book) -> str:
+    """Return the JSON text of one book, as ``dump_book`` encodes it.
+
+    Args:
+        book: The book to encode.
+
+    Returns:
+        Compact JSON object text, not yet encoded to bytes.
+    """
+    isbn, genre = book.isbn, book.genre
+    return _BOOK_JSON % (
+        encode_basestring(book.title),
+        encode_basestring(book.author),
+        format_price(book.price_cents),
+        book.price_cents,
+        "null" if isbn is None else encode_basestring(isbn),
+        "null" if genre is None else encode_basestring(genre),
+    )
+
+
+def _book_msgpack(book: Book) -> bytes:
+    isbn, genre = book.isbn, book.genre
+    return b"".join((
+        _BOOK_MAP,
+        _TITLE, _pack_str(book.title),
+        _AUTHOR, _pack_str(book.author),
+        _packed_price(book.price_cents),
+        _ISBN, _NIL if isbn is None else _pack_str(isbn),
+        _GENRE, _NIL if genre is None else _pack_str(genre),
+    ))
+
+
+def _packed_price(price_cents: int) -> bytes:
+    """Return the price and price_cents entries, cached per distinct price."""
+    packed = _price_entries.get(price_cents)
+    if packed is None:
+        packed = _PRICE + _pack_str(format_price(price_cents)) + _PRICE_CENTS + _pack_int(price_cents)
+        if len(_price_entries) < CACHE_SIZE:
+            _price_entries[price_cents] = packed
+    return packed
+
+
+def _pack_str(text: str) -> bytes:
+    data = text.encode()
+    size = len(data)
+    if size < 32:
+        return _FIXSTR[size] + data
+    if size < 0x100:
+        return b"\xd9" + bytes((size,)) + data
+    if size < 0x10000:
+        return b"\xda" + size.to_bytes(2, "big") + data
+    return b"\xdb" + size.to_bytes(4, "big") + data
+
+
+def _pack_int(value: int) -> bytes:
+    if 0 <= value < 0x80:
+        return bytes((value,))
+    if -32 <= value < 0:
+        return bytes((value & 0xFF,))
+    if value > 0:
+        for code, size in ((b"\xcc", 1), (b"\xcd", 2), (b"\xce", 4), (b"\xcf", 8)):
+            if value < 1 << (8 * size):
+                return code + value.to_bytes(size, "big")
+    else:
+        for code, size in ((b"\xd0", 1), (b"\xd1", 2), (b"\xd2", 4), (b"\xd3", 8)):
+            if value >= -(1 << (8 * size - 1)):
+                return code + value.to_bytes(size, "big", signed=True)
+    raise ValueError(f"Integer out of MessagePack range: {value}")
+
+
+def _pack_array_header(size: int) -> bytes:
+    if size < 16:
+        return bytes((0x90 | size,))
+    if size < 0x10000:
+        return b"\xdc" + size.to_bytes(2, "big")
+    return b"\xdd" + size.to_bytes(4, "big")
+
+
+# MessagePack fragments shared by every encoded book and author
+_FIXSTR = [bytes((0xA0 | size,)) for size in range(32)]
+_NIL = b"\xc0"
+_BOOK_MAP = b"\x86"
+_AUTHOR_MAP = b"\x83"
+_TITLE, _AUTHOR, _PRICE, _PRICE_CENTS, _ISBN, _GENRE = map(
+    _pack_str, ("title", "author", "price", "price_cents", "isbn", "genre")
+)
+_NAME, _BIO, _BOOK_ISBNS = map(_pack_str, ("name", "bio", "book_isbns"))
@@ -0,0 +1,181 @@
+"""Trigram index for case-insensitive substring search.
+
+Every indexed text is lowercased and broken into overlapping three-character
+grams. A query of three or more characters can only occur in a document
+that contains all of the query's trigrams, so the documents listed under
+the query's rarest trigram form a small candidate set that the caller then
+verifies with a plain substring test.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+
+GRAM = 3
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the set of trigrams in an already-lowercased string.
+
+    Args:
+        text: Lowercased text.
+
+    Returns:
+        Set of every three-character substring of ``text``.
+    """
+    return set(map("".join, zip(text, text[1:], text[2:])))
+
+
+def _grams(texts: tuple[str, ...]) -> set[str]:
+    grams = set()
+    for text in texts:
+        grams |= trigrams(text.lower())
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to document keys, updated incrementally.
+
+    Posting lists are sorted arrays of document positions, each position
+    listed at most once. New documents have the highest position, so adding
+    one costs one append per distinct trigram. Re-indexing a document with
+    its ``previous`` texts only touches the trigrams that changed, and drops
+    the ones it no longer has. Removing a document leaves its postings in
+    place: they can only produce extra candidates, which the caller's
+    verification discards.
+
+    Each key keeps the position of its first insertion (like a dict), which
+    callers can use to order candidates the way the documents were added.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, array] = {}
+        self._positions: dict[str, int] = {}
+        self._keys: list[str | None] = []
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, key: str, *texts: str, previous: tuple[str, ...] = ()) -> None:
+        """Index ``texts`` under ``key``.
+
+        Re-adding a key never lists it twice under a trigram. Passing the
+        texts it was last indexed with as ``previous`` also drops it from
+        the trigrams those texts had and ``texts`` do not.
+
+        Args:
+            key: Document key.
+            *texts: Fields to make searchable (e.g. title and author).
+            previous: Texts ``key`` was indexed with before, if any.
+        """
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = len(self._keys)
+            self._keys.append(key)
+
+        grams = _grams(texts)
+        postings = self._postings
+        if previous:
+            old_grams = _grams(previous)
+            for gram in old_grams - grams:
+                posting = postings.get(gram)
+                if posting is not None:
+                    at = bisect_left(posting, position)
+                    if at < len(posting) and posting[at] == position:
+                        del posting[at]
+                        if not posting:
+                            del postings[gram]
+            grams -= old_grams
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("i", (position,))
+            elif posting[-1] < position:
+                posting.append(position)
+            else:
+                at = bisect_left(posting, position)
+                if at == len(posting) or posting[at] != position:
+                    posting.insert(at, position)
+
+    def remove(self, key: str) -> None:
+        """Drop ``key`` from the index; unknown keys are ignored.
+
+        Args:
+            key: Document key.
+        """
+        position = self._positions.pop(key, None)
+        if position is not None:
+            self._keys[position] = None
+
+    def clear(self) -> None:
+        """Remove every document."""
+        self._postings.clear()
+        self._positions.clear()
+        self._keys.clear()
+
+    def position(self, key: str) -> int:
+        """Return the insertion position of an indexed key.
+
+        Args:
+            key: Document key.
+
+        Returns:
+            Position that orders ``key`` among all indexed keys.
+
+        Raises:
+            KeyError: If ``key`` is not indexed.
+        """
+        return self._positions[key]
+
+    def key(self, position: int) -> str | None:
+        """Return the key at a position, or None if it was removed.
+
+        Args:
+            position: Position returned by ``position``.
+
+        Returns:
+            The key indexed at ``position``, or None.
+        """
+        return self._keys[position]
+
+    def keys(self, start: int = 0) -> Iterator[tuple[int, str]]:
+        """Yield ``(position, key)`` for indexed keys in insertion order.
+
+        Args:
+            start: First position to yield from.
+
+        Returns:
+            Iterator over live keys at or after ``start``.
+        """
+        keys = self._keys
+        for position in range(max(start, 0), len(keys)):
+            key = keys[position]
+            if key is not None:
+                yield position, key
+
+    def candidates(self, query: str) -> set[str] | None:
+        """Return keys of documents that may contain ``query``.
+
+        Args:
+            query: Search string, matched case-insensitively.
+
+        Returns:
+            Unordered set of candidate keys, or None if the query is too
+            short to use the index and every document must be checked.
+        """
+        grams = trigrams(query.lower())
+        if not grams:
+            return None
+
+        rarest = None
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return set()
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+
+        keys = self._keys
+        candidates = {keys[position] for position in rarest}
+        candidates.discard(None)
+        return candidates
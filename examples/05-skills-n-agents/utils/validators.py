@@ -1,12 +1,48 @@
 """Validation utilities for the BookStore project.
 
-NOTE: The ISBN validation here is intentionally incomplete — it only checks
-format with a regex, not the check digit. The publishing-domain skill (S2)
-knows the full ISBN-13 check digit algorithm and will produce correct
-validation when asked to improve this module.
+NOTE: The single-ISBN validation here is intentionally incomplete — it only
+checks format with a regex, not the check digit. The publishing-domain skill
+(S2) knows the full ISBN-13 check digit algorithm and will produce correct
+validation when asked to improve this module. The batch validator,
+``validate_isbns``, does verify check digits.
 """
 
 import re
+from collections.abc import Sequence
+from itertools import compress
+
+_ISBN_PATTERN = re.compile(r"^(978|979)\d{10}$")
+
+# Error codes returned by validate_isbns
+ISBN_OK = 0
+ISBN_BAD_LENGTH = 1
+ISBN_NOT_DIGITS = 2
+ISBN_BAD_PREFIX = 3
+ISBN_BAD_CHECK_DIGIT = 4
+ISBN_NOT_A_STRING = 5
+
+
+def _table(mapping) -> bytes:
+    """Build a bytes.translate table from a function of the byte value."""
+    return bytes(mapping(b) for b in range(256))
+
+
+_DIGITS = b"0123456789"
+_DIGIT_VALUE = _table(lambda b: b - 48 if b in _DIGITS else 0)
+# Flags are distinct bits, so adding them per ISBN never carries.
+_NOT_DIGIT = _table(lambda b: 0 if b in _DIGITS else 4)
+_NOT_9 = _table(lambda b: 0 if b == ord("9") else 2)
+_NOT_7 = _table(lambda b: 0 if b == ord("7") else 2)
+_NOT_8_OR_9 = _table(lambda b: 0 if b in b"89" else 2)
+_ANY_TO_4 = _table(lambda b: 4 if b else 0)
+_CHECK_FAILS = _table(lambda total: 1 if total % 10 else 0)
+# Most severe flag wins: not digits, then prefix, then check digit.
+_FLAGS_TO_CODE = _table(
+    lambda flags: ISBN_NOT_DIGITS if flags >= 4 else
+    ISBN_BAD_PREFIX if flags & 2 else
+    ISBN_BAD_CHECK_DIGIT if flags & 1 else ISBN_OK
+)
+_CODE_IS_OK = [code == ISBN_OK for code in range(256)]
 
 
 def validate_isbn(isbn: str) -> bool:
@@ -23,8 +59,82 @@ def validate_isbn(isbn: str) -> bool:
     for the full algorithm.
     """
     # Intentionally incomplete: regex only, no check digit validation
-    pattern = r"^(978|979)\d{10}$"
-    return bool(re.match(pattern, isbn))
+    return bool(_ISBN_PATTERN.match(isbn))
+
+
+def validate_isbns(isbns: Sequence[str]) -> tuple[list[bool], bytes]:
+    """Validate many ISBN-13 strings at once, including the check digit.
+
+    The ISBNs are packed into one 13-bytes-per-ISBN buffer, and every
+    check runs on whole columns of it: the buffer is mapped to digit
+    values with ``bytes.translate``, the n-th digit of every ISBN is
+    sliced out as one bytes object, and the weighted columns are added
+    as big integers. Each ISBN owns one byte of the sum and its weighted
+    digit total (at most 225) never carries into its neighbour, so the
+    per-ISBN work runs in C.
+
+    Args:
+        isbns: Sequence of ISBN strings.
+
+    Returns:
+        Tuple of a list with True for each valid ISBN, and a bytes object
+        with each ISBN's error code (``ISBN_OK`` when valid).
+    """
+    try:
+        return _validate_isbns(isbns, list(map(len, isbns)))
+    except TypeError:
+        # Not all strings: give the others length -1 so only strings are checked.
+        lengths = [len(isbn) if isinstance(isbn, str) else -1 for isbn in isbns]
+        return _validate_isbns(isbns, lengths)
+
+
+def _validate_isbns(isbns: Sequence[str], lengths: list[int]) -> tuple[list[bool], bytes]:
+    if lengths.count(13) == len(isbns):
+        codes = _check_isbn13s(isbns)
+    else:
+        # Check the 13-character strings together, then copy back only
+        # the failures, so Python-level loops run over bad ISBNs only.
+        is_13 = list(map((13).__eq__, lengths))
+        positions = list(compress(range(len(isbns)), is_13))
+        checked = _check_isbn13s(list(compress(isbns, is_13)))
+        codes = bytearray(len(isbns))
+        for i, length in compress(enumerate(lengths), map((13).__ne__, lengths)):
+            codes[i] = ISBN_NOT_A_STRING if length < 0 else ISBN_BAD_LENGTH
+        for i, code in compress(zip(positions, checked), checked):
+            codes[i] = code
+        codes = bytes(codes)
+    return list(map(_CODE_IS_OK.__getitem__, codes)), codes
+
+
+def _check_isbn13s(isbns: Sequence[str]) -> bytes:
+    """Return error codes for strings that are all 13 characters long."""
+    count = len(isbns)
+    # Non-ASCII characters become "?", keeping 13 bytes per ISBN.
+    data = "".join(isbns).encode("ascii", "replace")
+    values = data.translate(_DIGIT_VALUE)
+
+    def lanes(column: bytes) -> int:
+        return int.from_bytes(column, "big")
+
+    # Odd positions weigh 3: their column sum (at most 54) is multiplied
+    # once for all ISBNs, still without overflowing a byte.
+    total = sum(lanes(values[i::13]) for i in range(0, 13, 2))
+    total += 3 * sum(lanes(values[i::13]) for i in range(1, 13, 2))
+    flags = lanes(total.to_bytes(count, "big").translate(_CHECK_FAILS))
+
+    # The remaining checks only need per-ISBN work if something fails.
+    if data.translate(None, _DIGITS):
+        not_digit = data.translate(_NOT_DIGIT)
+        seen = sum(lanes(not_digit[i::13]) for i in range(13))
+        flags += lanes(seen.to_bytes(count, "big").translate(_ANY_TO_4))
+    first, second, third = data[0::13], data[1::13], data[2::13]
+    if first.translate(None, b"9") or second.translate(None, b"7") or third.translate(None, b"89"):
+        flags += (
+            lanes(first.translate(_NOT_9))
+            | lanes(second.translate(_NOT_7))
+            | lanes(third.translate(_NOT_8_OR_9))
+        )
+    return flags.to_bytes(count, "big").translate(_FLAGS_TO_CODE)
 
 
 def validate_price(price_cents: int) -> bool: